@@ -0,0 +1,73 @@
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, Iterable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from db import PassingStats, db  # noqa: E402
+from loader import CopyLoader, UpsertLoader  # noqa: E402
+
+
+class BenchPassingStats(PassingStats):
+    class Meta:
+        table_name = "bench_passing_stats"
+
+
+def synthetic_rows(count: int) -> Iterable[BenchPassingStats]:
+    rng = random.Random(count)
+    for i in range(count):
+        yield BenchPassingStats(
+            year=2000 + i % 24,
+            player=f"Player {i // 24}",
+            pass_yds=rng.randint(0, 5500),
+            yds_att=rng.uniform(4, 10),
+            att=rng.randint(0, 700),
+            cmp=rng.randint(0, 500),
+            cmp_pct=rng.uniform(40, 75),
+            td=rng.randint(0, 50),
+            int=rng.randint(0, 30),
+            rate=rng.uniform(40, 120),
+            first=rng.randint(0, 300),
+            first_pct=rng.uniform(20, 50),
+            twenty_plus=rng.randint(0, 80),
+            forty_plus=rng.randint(0, 20),
+            lng=rng.randint(0, 99),
+            sck=rng.randint(0, 60),
+            scky=rng.randint(0, 400),
+        )
+
+
+def bulk_create(rows: Iterable[BenchPassingStats]) -> int:
+    to_create = list(rows)
+    BenchPassingStats.bulk_create(to_create)
+    return len(to_create)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare bulk_create, chunked upserts and COPY")
+    parser.add_argument("-n", "--rows", type=int, default=100000, help="rows to load per loader")
+    args = parser.parse_args()
+
+    loaders: List[tuple[str, Callable[[Iterable[BenchPassingStats]], int]]] = [
+        ("bulk_create", bulk_create),
+        ("upsert", lambda rows: UpsertLoader().load(BenchPassingStats, rows)),
+        ("copy", lambda rows: CopyLoader().load(BenchPassingStats, rows)),
+    ]
+
+    db.execute_sql("CREATE TABLE IF NOT EXISTS bench_passing_stats (LIKE passing_stats INCLUDING ALL)")
+    try:
+        for name, load in loaders:
+            db.execute_sql("TRUNCATE bench_passing_stats")
+            start = time.perf_counter()
+            count = load(synthetic_rows(args.rows))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<12}{count:>10} rows {elapsed:>8.2f}s {count / elapsed:>12,.0f} rows/sec")
+    finally:
+        db.execute_sql("DROP TABLE IF EXISTS bench_passing_stats")
+
+
+if __name__ == "__main__":
+    main()
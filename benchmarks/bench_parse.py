@@ -0,0 +1,117 @@
+import argparse
+import os
+import sys
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from harness import page_schema  # noqa: E402
+from pages import site  # noqa: E402
+from parsing import CORES, PageParser, parse_player_page  # noqa: E402
+from synthetic import generate  # noqa: E402
+from tables import Schema  # noqa: E402
+
+
+def legacy_player(html: str) -> Dict[str, Any]:
+    # PlayerService.parse_player_info before the lxml parser, without the database side effects
+    soup = BeautifulSoup(html, features="html.parser")
+    name = soup.find("h1", class_="nfl-c-player-header__title").text
+    position = soup.find("span", class_="nfl-c-player-header__position").text.replace(" ", "")
+    active = soup.find(
+        "h3",
+        class_="nfl-c-player-header__roster-status "
+        + "nfl-c-player-header__roster-status--act nfl-u-hide-empty",
+    )
+    data = {}
+    for section in ("physical-data", "career-data"):
+        for val in soup.find("ul", class_=f"d3-o-list nfl-c-player-info__{section}").find_all(
+            "li", class_="d3-o-list__item"
+        ):
+            value = val.find("div", class_="nfl-c-player-info__value").text
+            if value != "":
+                data[val.find("div", class_="nfl-c-player-info__key").text] = value
+    active = active is not None and active.text == "active"
+    team = None
+    if active:
+        team = (
+            soup.find("div", class_="nfl-c-player-header__team nfl-u-hide-empty")
+            .find("a", class_="nfl-o-cta--link")
+            .text
+        )
+    height = data.get("Height")
+    return {
+        "name": name,
+        "position": position,
+        "active": active,
+        "team": team,
+        "height": None if height is None else int(height.split("-")[0]) * 12 + int(height.split("-")[1]),
+        "weight": int(data["Weight"]) if "Weight" in data else None,
+        "experience": int(data["Experience"]) if "Experience" in data else None,
+        "college": data.get("College"),
+        "age": int(data["Age"]) if "Age" in data else None,
+        "hometown": data.get("Hometown"),
+    }
+
+
+def split_pages(pages: Dict[str, str]) -> Tuple[List[Tuple[str, Schema]], List[str]]:
+    tables, players = [], []
+    for url, html in pages.items():
+        schema = page_schema(url)
+        if schema is not None:
+            tables.append((html, schema))
+        elif url.startswith("/players/"):
+            players.append(html)
+    return tables, players
+
+
+def parse_all(
+    parser: PageParser, threads: int, tables: List[Tuple[str, Schema]], players: List[str]
+) -> int:
+    # job threads submit table pages one at a time, player pages go over in batches, as in the ETL
+    with ThreadPoolExecutor(threads) as pool:
+        rows = sum(pool.map(lambda page: len(parser.table(*page)), tables))
+    return rows + len(parser.players(players))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Parse throughput of the synthetic site by number of parse processes"
+    )
+    parser.add_argument("-s", "--scale", type=int, default=1, help="synthetic dataset multiplier")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", help=f"default: 0 1 2 4 ... {CORES}")
+    parser.add_argument("-n", "--number", type=int, default=20, help="parses per player page timing")
+    args = parser.parse_args()
+
+    # tests/test_parsing.py checks the two parsers agree, this only times them
+    tables, players = split_pages(site(generate(args.scale)))
+    sample = players[0]
+    old = timeit.timeit(lambda: legacy_player(sample), number=args.number) / args.number * 1000
+    new = timeit.timeit(lambda: parse_player_page(sample), number=args.number) / args.number * 1000
+    print(f"player page     bs4 {old:.2f} ms  lxml {new:.2f} ms  {old / new:.1f}x")
+
+    counts = args.workers or sorted({0, CORES} | {2**i for i in range(8) if 2**i < CORES})
+    pages = len(tables) + len(players)
+    print(f"{len(tables)} table and {len(players)} player pages on {CORES} cores")
+    print(f"{'workers':<10}{'seconds':>10}{'pages/sec':>12}{'speedup':>9}")
+    baseline: Optional[float] = None
+    for workers in counts:
+        page_parser = PageParser(workers)
+        try:
+            # starting the processes is paid once per scrape, keep it out of the timing
+            parse_all(page_parser, max(workers, 1), tables[:workers], players[:workers])
+            start = time.perf_counter()
+            parse_all(page_parser, max(workers, 1) * 2, tables, players)
+            seconds = time.perf_counter() - start
+        finally:
+            page_parser.close()
+        baseline = baseline or seconds
+        print(f"{workers:<10}{seconds:>10.2f}{pages / seconds:>12,.0f}{baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
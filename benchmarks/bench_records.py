@@ -0,0 +1,109 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from categories import CATEGORIES  # noqa: E402
+from db import ActiveStats  # noqa: E402
+from harness import page_schema  # noqa: E402
+from loader import chunks, row_values, unique_values  # noqa: E402
+from pages import site  # noqa: E402
+from peewee import Model  # noqa: E402
+from records import Records  # noqa: E402
+from synthetic import generate  # noqa: E402
+from tables import GAMELOG, Table, extract_table  # noqa: E402
+
+MODELS = {category.schema.name: category.model for category in CATEGORIES.values()}
+MODELS[GAMELOG.name] = ActiveStats
+
+Parsed = List[Tuple[Type[Model], Table, Dict[str, Any]]]
+
+
+def parse_site(scale: int) -> Parsed:
+    data = generate(scale)
+    parsed = []
+    for url, html in site(data).items():
+        schema = page_schema(url)
+        if schema is None:
+            continue
+        # the values of the constants don't matter here, only that every row carries them
+        constants = {"name": url, "season": data.season} if schema is GAMELOG else {"year": data.season}
+        parsed.append((MODELS[schema.name], extract_table(html, schema), constants))
+    return parsed
+
+
+def as_models(parsed: Parsed) -> List[Any]:
+    # what the ETL built before, one Model instance per scraped row
+    return [
+        (model, [model(**constants, **row) for row in table.rows()])
+        for model, table, constants in parsed
+    ]
+
+
+def as_records(parsed: Parsed) -> List[Any]:
+    return [(model, Records(model, table.columns, constants)) for model, table, constants in parsed]
+
+
+def to_db_rows(batches: List[Any]) -> int:
+    # everything a loader does before the database sees the rows
+    total = 0
+    for model, rows in batches:
+        for chunk in chunks(row_values(model, rows), 1000):
+            total += len(unique_values(model, chunk))
+    return total
+
+
+def best(stage: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    seconds, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = stage()
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, result
+
+
+def retained(build: Callable[[], Any]) -> Tuple[int, int]:
+    # bytes still held by the built rows, and the peak while building them
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current - before, peak - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare Model instances and Records for holding and loading scraped rows"
+    )
+    parser.add_argument("-s", "--scale", type=int, default=1, help="synthetic dataset multiplier")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per measurement, best is kept")
+    args = parser.parse_args()
+
+    parsed = parse_site(args.scale)
+    rows = sum(len(table) for _, table, _ in parsed)
+    print(f"{rows} rows from {len(parsed)} pages")
+    print(
+        f"{'path':<10}{'build s':>10}{'load prep s':>13}{'rows/sec':>14}{'held MB':>10}{'peak MB':>10}"
+    )
+    for label, build in (("models", as_models), ("records", as_records)):
+        build_seconds, batches = best(lambda: build(parsed), args.repeat)
+        prep_seconds, total = best(lambda: to_db_rows(batches), args.repeat)
+        assert total <= rows
+        held, peak = retained(lambda: build(parsed))
+        rate = rows / (build_seconds + prep_seconds)
+        print(
+            f"{label:<10}{build_seconds:>10.3f}{prep_seconds:>13.3f}{rate:>14,.0f}"
+            f"{held / 2**20:>10.1f}{peak / 2**20:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import timeit
+from io import StringIO
+from typing import Any, List
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from tables import (  # noqa: E402
+    DEFENSE_PASSING,
+    FIELD_GOALS,
+    GAMELOG,
+    PASSING,
+    RECEIVING,
+    RUSHING,
+    Schema,
+    extract_table,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+SCHEMAS = {
+    schema.name: schema
+    for schema in [PASSING, RUSHING, RECEIVING, FIELD_GOALS, DEFENSE_PASSING, GAMELOG]
+}
+
+
+def legacy(html: str) -> List[List[Any]]:
+    soup = BeautifulSoup(html, features="html.parser")
+    table = soup.find("table")
+    [
+        player["href"]
+        for player in table.find_all("a", href=True, class_="d3-o-player-fullname nfl-o-cta--link")
+    ]
+    soup.find("a", href=True, class_="nfl-o-table-pagination__next")
+    return pd.read_html(StringIO(str(table)))[0].values.tolist()  # type: ignore
+
+
+def single_pass(html: str, schema: Schema) -> List[List[Any]]:
+    table = extract_table(html, schema)
+    return [list(row.values()) for row in table.rows()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the lxml table extractor with bs4 + pd.read_html"
+    )
+    parser.add_argument("-n", "--number", type=int, default=50, help="parses per fixture")
+    args = parser.parse_args()
+
+    print(f"{'fixture':<18}{'rows':>6}{'legacy ms':>12}{'lxml ms':>10}{'speedup':>9}")
+    for name, schema in SCHEMAS.items():
+        with open(os.path.join(FIXTURES, name + ".html"), encoding="utf-8") as f:
+            html = f.read()
+        rows = single_pass(html, schema)
+        assert len(rows) == len(legacy(html)), f"row count mismatch for {name}"
+
+        old = timeit.timeit(lambda: legacy(html), number=args.number) / args.number * 1000
+        new = timeit.timeit(lambda: single_pass(html, schema), number=args.number) / args.number * 1000
+        print(f"{name:<18}{len(rows):>6}{old:>12.2f}{new:>10.2f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
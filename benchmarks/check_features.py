@@ -0,0 +1,101 @@
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from columns import PREDICTION_COLUMNS, TRAINING_COLUMNS  # noqa: E402
+from daos import Dao  # noqa: E402
+from db import db  # noqa: E402
+from features import FeatureBuilder, to_matrix, write_parquet  # noqa: E402
+from seasons import last_completed_season  # noqa: E402
+
+
+def sorted_rows(frame: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    matrix = to_matrix(frame, columns)
+    return matrix[np.lexsort(matrix.T[::-1])] if len(matrix) else matrix
+
+
+def same_rows(expected: pd.DataFrame, actual: pd.DataFrame, columns: List[str]) -> bool:
+    # row order differs between SQL and pandas, compare as sorted multisets
+    if not set(columns) <= set(expected.columns) & set(actual.columns) or len(expected) != len(actual):
+        return False
+    expected_rows = sorted_rows(expected, columns)
+    actual_rows = sorted_rows(actual, columns)
+    return bool(np.allclose(expected_rows, actual_rows, rtol=1e-5, equal_nan=True))
+
+
+def sql_training_frame() -> pd.DataFrame:
+    with db.execute_sql("SELECT * FROM public.nfl_features()") as cursor:
+        columns = [column[0] for column in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+
+def dao_prediction_frame(dao: Dao, builder_frame: pd.DataFrame, year: int) -> pd.DataFrame:
+    # the features PassingPredictor.predict sends to pgml.predict, one Dao lookup per grid row
+    rows = []
+    for name, opponent, is_home_game in builder_frame[["name", "opponent", "is_home_game"]].itertuples(
+        index=False
+    ):
+        player_info = dao.get_player_info(name, year)
+        active_stats = dao.get_player_active_stats(name, year)
+        defense_stats = dao.get_defense_stats(opponent, year)
+        rows.append(
+            {
+                "age": player_info["age"],
+                "experience": player_info["experience"],
+                "pass_attempts": active_stats["pass_attempts"],
+                "pass_completions": active_stats["pass_completions"],
+                "pass_avg": active_stats["pass_avg"],
+                "rating": active_stats["rating"],
+                "is_home": 1 if is_home_game else 0,
+                "is_away": 0 if is_home_game else 1,
+                "avg_pass_att_against": defense_stats["avg_pass_att_against"],
+                "avg_completions_against": defense_stats["avg_completions_against"],
+                "avg_yds_att_against": defense_stats["avg_yds_att_against"],
+                "avg_sacks": defense_stats["avg_sacks"],
+            }
+        )
+    return pd.DataFrame.from_records(rows, columns=PREDICTION_COLUMNS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check FeatureBuilder against the SQL feature paths")
+    parser.add_argument(
+        "-y", "--year", type=int, default=last_completed_season(), help="prediction season"
+    )
+    parser.add_argument("-o", "--parquet", help="also write the training features to this parquet file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    expected = sql_training_frame()
+    sql_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    builder = FeatureBuilder.load()
+    training = builder.training_frame()
+    prediction = builder.prediction_frame(args.year)
+    builder_elapsed = time.perf_counter() - start
+
+    assert list(expected.columns) == TRAINING_COLUMNS, f"Unexpected columns: {list(expected.columns)}"
+    assert same_rows(expected, training, TRAINING_COLUMNS), "Training features differ from SQL"
+    print(f"training    {len(training):>8} rows match nfl_features() (sql {sql_elapsed:.2f}s)")
+
+    start = time.perf_counter()
+    reference = dao_prediction_frame(Dao(), prediction, args.year)
+    dao_elapsed = time.perf_counter() - start
+    assert same_rows(reference, prediction, PREDICTION_COLUMNS), "Prediction features differ from Dao"
+    print(f"prediction  {len(prediction):>8} rows match Dao lookups (dao {dao_elapsed:.2f}s)")
+    print(f"builder     {builder_elapsed:.2f}s for both matrices")
+
+    if args.parquet:
+        write_parquet(training, args.parquet)
+
+
+if __name__ == "__main__":
+    main()
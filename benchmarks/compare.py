@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict
+
+DEFAULT_THRESHOLD: float = 0.1
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmarks/harness.py results")
+    parser.add_argument("baseline", help="results of the old commit")
+    parser.add_argument("candidate", help="results of the new commit")
+    parser.add_argument(
+        "-t", "--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.1 is 10%%"
+    )
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    assert baseline["scale"] == candidate["scale"], "Results were run at different scales"
+
+    print(f"{'stage':<16}{'baseline s':>12}{'candidate s':>13}{'change':>9}")
+    regressions = []
+    for stage, new in candidate["stages"].items():
+        old = baseline["stages"].get(stage)
+        if old is None or old["seconds"] <= 0:
+            print(f"{stage:<16}{'-':>12}{new['seconds']:>13.3f}{'new':>9}")
+            continue
+        change = new["seconds"] / old["seconds"] - 1
+        regressed = change > args.threshold
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{stage:<16}{old['seconds']:>12.3f}{new['seconds']:>13.3f}{change:>+9.1%}{flag}")
+        if new["rows"] != old["rows"]:
+            print(f"{'':<16}rows changed from {old['rows']} to {new['rows']}")
+        if regressed:
+            regressions.append(stage)
+
+    print(f"\n{baseline.get('commit')} -> {candidate.get('commit')}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from backends import LocalBackend, PgmlBackend, PredictorBackend  # noqa: E402
+from categories import CATEGORIES  # noqa: E402
+from daos import Dao  # noqa: E402
+from db import ActiveStats, PassingRun, db  # noqa: E402
+from db.migrations import migrate  # noqa: E402
+from feature_cache import feature_cache  # noqa: E402
+from feature_store import FeatureStore  # noqa: E402
+from features import FeatureBuilder  # noqa: E402
+from fetcher import Fetcher  # noqa: E402
+from loader import make_loader  # noqa: E402
+from metrics import metrics  # noqa: E402
+from nfl import NFLStatsEtl  # noqa: E402
+from pages import path, site  # noqa: E402
+from predict import PassingPredictor  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+from synthetic import Dataset, generate  # noqa: E402
+from tables import GAMELOG, Schema, extract_table  # noqa: E402
+
+OFFLINE_STAGES: List[str] = ["generate", "render", "parse", "fetch_parse", "feature_build"]
+DB_STAGES: List[str] = ["scrape", "db_load", "training_table", "feature_load", "train", "predict"]
+
+# emptied before the scrape and load stages, children first
+TABLES: List[str] = [
+    "passing_run",
+    "feature_rows",
+    "feature_hashes",
+    "etl_state",
+    "active_stats",
+    "passing_stats",
+    "rushing_stats",
+    "receiving_stats",
+    "field_goal_stats",
+    "defense_passing_stats",
+    "players",
+]
+
+
+@dataclass
+class StageResult:
+    seconds: float
+    rows: int
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+
+def timed(stage: Callable[[], int], repeat: int = 1) -> StageResult:
+    # best of repeat, the minimum is the least noisy estimate on a shared machine
+    best: Optional[StageResult] = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = stage()
+        result = StageResult(time.perf_counter() - start, rows)
+        if best is None or result.seconds < best.seconds:
+            best = result
+    assert best is not None
+    return best
+
+
+def page_schema(url: str) -> Optional[Schema]:
+    if url.endswith("/stats/"):
+        return GAMELOG
+    for category in CATEGORIES.values():
+        # listing urls are <category path>/<year>/...
+        if url.startswith(path(category, 0).split("/0/")[0] + "/"):
+            return category.schema
+    return None
+
+
+def parse_pages(pages: Dict[str, str]) -> int:
+    rows = 0
+    for url, html in pages.items():
+        schema = page_schema(url)
+        if schema is not None:
+            rows += len(extract_table(html, schema))
+    return rows
+
+
+def fetch_parse(server: StubServer, pages: Dict[str, str]) -> int:
+    urls = [url for url in pages if page_schema(url) is not None]
+    fetcher = Fetcher()
+    try:
+        bodies = fetcher.get_all(server.root_url + url for url in urls)
+    finally:
+        fetcher.close()
+    schemas = [page_schema(url) for url in urls]
+    return sum(len(extract_table(html, schema)) for html, schema in zip(bodies, schemas) if schema)
+
+
+def feature_build(builder: FeatureBuilder, season: int) -> int:
+    return len(builder.training_frame()) + len(builder.prediction_frame(season))
+
+
+def truncate() -> None:
+    db.execute_sql("TRUNCATE " + ", ".join(f"public.{table}" for table in TABLES))
+    feature_cache.clear()
+
+
+def scrape(server: StubServer, data: Dataset) -> int:
+    truncate()
+    metrics.reset()
+    etl = NFLStatsEtl(
+        cache_dir=None, requests_per_second=None, metrics_dir=None, root_url=server.root_url
+    )
+    try:
+        etl.run(data.years[0], data.season + 1, gamelogs=True)
+    finally:
+        etl.fetcher.close()
+    return int(sum(metrics.counters.get("nfl_rows_total", {}).values()))
+
+
+def db_load(data: Dataset, loader: str) -> int:
+    truncate()
+    for season in {row["season"] for row in data.rows(ActiveStats)}:
+        ActiveStats.ensure_partition(season)
+    load = make_loader(loader, None)
+    return sum(load.load(model, data.records(model)) for model in data.tables)
+
+
+def train(backend: PredictorBackend) -> int:
+    backend.train()
+    return 0
+
+
+def predict(backend: PredictorBackend) -> int:
+    before = PassingRun.select().count()
+    PassingPredictor(Dao(), backend).run(batch=True)
+    return PassingRun.select().count() - before
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the scrape, load, feature and predict stages")
+    parser.add_argument("-s", "--scale", type=int, default=1, help="synthetic dataset multiplier")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3, help="runs per offline stage, best is kept"
+    )
+    parser.add_argument(
+        "--dsn",
+        help="scratch database for the database stages, its tables are truncated, e.g. "
+        "postgres://postgres@localhost:5433/bench",
+    )
+    parser.add_argument("--loader", default="copy", help="loader for the db_load stage")
+    parser.add_argument("--backend", choices=["local", "pgml"], default="local")
+    parser.add_argument("--stages", nargs="+", choices=OFFLINE_STAGES + DB_STAGES, help="default: all")
+    parser.add_argument("-o", "--output", help="write results as JSON, for benchmarks/compare.py")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    stages = args.stages or OFFLINE_STAGES + (DB_STAGES if args.dsn else [])
+    assert args.dsn or not set(stages) & set(DB_STAGES), "Database stages need --dsn"
+
+    results: Dict[str, StageResult] = {}
+    data = generate(args.scale)
+    pages = site(data)
+    builder = data.feature_builder()
+    offline: Dict[str, Callable[[], int]] = {
+        "generate": lambda: len(generate(args.scale)),
+        "render": lambda: len(site(data)),
+        "parse": lambda: parse_pages(pages),
+        "feature_build": lambda: feature_build(builder, data.season),
+    }
+
+    with StubServer(pages) as server, tempfile.TemporaryDirectory() as model_dir:
+        offline["fetch_parse"] = lambda: fetch_parse(server, pages)
+        for stage in OFFLINE_STAGES:
+            if stage in stages:
+                results[stage] = timed(offline[stage], args.repeat)
+
+        if args.dsn:
+            db.configure(args.dsn)
+            migrate()
+            backend = LocalBackend(model_dir) if args.backend == "local" else PgmlBackend(Dao())
+            online: Dict[str, Callable[[], int]] = {
+                "scrape": lambda: scrape(server, data),
+                "db_load": lambda: db_load(data, args.loader),
+                "training_table": lambda: FeatureStore().refresh().inserted,
+                "feature_load": lambda: len(FeatureBuilder.load().training_frame()),
+                "train": lambda: train(backend),
+                "predict": lambda: predict(backend),
+            }
+            # each stage reads what the one before it wrote, so they run once and in order
+            for stage in DB_STAGES:
+                if stage in stages:
+                    results[stage] = timed(online[stage])
+
+    for stage, result in results.items():
+        rate = result.rows_per_second
+        print(f"{stage:<16}{result.rows:>10} rows {result.seconds:>9.3f}s {rate:>14,.0f} rows/sec")
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "scale": args.scale,
+            "rows": len(data),
+            "pages": len(pages),
+            "stages": {stage: result.to_json() for stage, result in results.items()},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
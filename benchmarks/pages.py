@@ -0,0 +1,196 @@
+import html
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from categories import CATEGORIES, DEFENSE, StatCategory  # noqa: E402
+from db import ActiveStats, PlayerInfo  # noqa: E402
+from synthetic import Dataset  # noqa: E402
+
+PAGE_SIZE: int = 25
+
+HEAD = (
+    '<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8"><title>{title}</title></head>\n'
+    '<body><main><section class="d3-l-grid--outer">\n'
+    '<div class="d3-o-table--horizontal-scroll">\n'
+    '<table class="d3-o-table d3-o-table--detailed d3-o-player-stats--detailed d3-o-table--sortable">\n'
+)
+TAIL = "</tbody>\n</table>\n</div>\n{pagination}\n</section></main></body></html>\n"
+
+GAMELOG_HEADERS: List[str] = [
+    "WK", "OPP", "RESULT", "COMP", "ATT", "YDS", "AVG", "TD", "INT", "SCK", "SCKY", "RATE",
+    "ATT", "YDS", "AVG", "TD", "FUM", "LOST",
+]  # fmt: skip
+
+
+def cell(value: Any) -> str:
+    return "<td>" + ("" if value is None else html.escape(str(value))) + "</td>"
+
+
+def table_page(
+    title: str, headers: Iterable[str], rows: Iterable[str], next_url: Optional[str] = None
+) -> str:
+    pagination = ""
+    if next_url is not None:
+        pagination = (
+            '<div class="nfl-o-table-pagination"><a class="nfl-o-table-pagination__next" '
+            f'href="{html.escape(next_url)}" title="Next">Next Page</a></div>'
+        )
+    return (
+        HEAD.format(title=html.escape(title))
+        + "<thead><tr>"
+        + "".join(f"<th>{html.escape(header)}</th>" for header in headers)
+        + "</tr></thead><tbody>"
+        + "\n".join(rows)
+        + "\n"
+        + TAIL.format(pagination=pagination)
+    )
+
+
+def player_cell(name: str, slug: str) -> str:
+    return (
+        '<td>\n<div class="d3-o-player-fullname nfl-o-cta--link">\n'
+        f'<a href="/players/{slug}/" class="d3-o-player-fullname nfl-o-cta--link">'
+        f"{html.escape(name)}</a>\n"
+        "</div>\n</td>"
+    )
+
+
+def team_cell(team: str) -> str:
+    # the scraper halves the cell text, the page repeats the name in full and short form
+    return (
+        '<td>\n<div class="d3-o-club-info">\n'
+        f'<div class="d3-o-club-fullname">{html.escape(team)}</div>\n'
+        f'<div class="d3-o-club-shortname">{html.escape(team)}</div>\n'
+        "</div>\n</td>"
+    )
+
+
+def path(category: StatCategory, year: int) -> str:
+    return category.url("", year)
+
+
+def listing_pages(
+    data: Dataset, category: StatCategory, year: int, page_size: int = PAGE_SIZE
+) -> Dict[str, str]:
+    slugs = {player["name"]: player["slug"] for player in data.rows(PlayerInfo)}
+    rows = [row for row in data.rows(category.model) if row["year"] == year]
+    fields = category.schema.fields[1:]
+
+    pages = {}
+    for start in range(0, max(len(rows), 1), page_size):
+        chunk = rows[start : start + page_size]
+        next_url = None
+        if start + page_size < len(rows):
+            next_url = f"{path(category, year)}?aftercursor={start + page_size}"
+        url = path(category, year) if start == 0 else f"{path(category, year)}?aftercursor={start}"
+        pages[url] = table_page(
+            f"NFL {category.name} stats",
+            ["Player"] + fields,
+            (
+                "<tr>"
+                + player_cell(row["player"], slugs[row["player"]])
+                + "".join(cell(row[name]) for name in fields)
+                + "</tr>"
+                for row in chunk
+            ),
+            next_url,
+        )
+    return pages
+
+
+def defense_page(data: Dataset, category: StatCategory, year: int) -> str:
+    fields = category.schema.fields[1:]
+    return table_page(
+        f"NFL team {category.side} {category.name} stats",
+        ["Team"] + fields,
+        (
+            "<tr>" + team_cell(row["team"]) + "".join(cell(row[name]) for name in fields) + "</tr>"
+            for row in data.rows(category.model)
+            if row["year"] == year
+        ),
+    )
+
+
+def gamelog_page(name: str, games: List[Dict[str, Any]]) -> str:
+    rows = []
+    for game in games:
+        opponent = game["opponent"] if game["home"] else "@" + game["opponent"]
+        values = [game["week"], opponent, f"{game['game_result']} 24-17"] + [
+            game[column]
+            for column in (
+                "pass_completions", "pass_attempts", "pass_yards", "pass_avg", "pass_touchdowns",
+                "interceptions", "sacks", "sack_yards", "rating", "rush_attempts", "rush_yards",
+                "rush_avg", "rush_touchdowns", "fumbles", "fumbles_lost",
+            )
+        ]  # fmt: skip
+        rows.append("<tr>" + "".join(cell(value) for value in values) + "</tr>")
+    return table_page(f"{name} Stats", GAMELOG_HEADERS, rows)
+
+
+def info_item(key: str, value: Any) -> str:
+    return (
+        '<li class="d3-o-list__item">'
+        f'<div class="nfl-c-player-info__key">{key}</div>'
+        f'<div class="nfl-c-player-info__value">{"" if value is None else html.escape(str(value))}</div>'
+        "</li>"
+    )
+
+
+def player_page(player: Dict[str, Any]) -> str:
+    height = player["height"]
+    status = "active" if player["active"] else ""
+    team = ""
+    if player["active"]:
+        team = (
+            '<div class="nfl-c-player-header__team nfl-u-hide-empty">'
+            f'<a class="nfl-o-cta--link" href="/teams/">{html.escape(player["team"])}</a></div>'
+        )
+    return (
+        '<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+        f'<title>{html.escape(player["name"])}</title></head>\n<body><main>\n'
+        '<div class="nfl-c-player-header">\n'
+        f'<h1 class="nfl-c-player-header__title">{html.escape(player["name"])}</h1>\n'
+        f'<span class="nfl-c-player-header__position">{player["position"]}</span>\n'
+        '<h3 class="nfl-c-player-header__roster-status nfl-c-player-header__roster-status--act '
+        f'nfl-u-hide-empty">{status}</h3>\n'
+        f"{team}\n</div>\n"
+        '<ul class="d3-o-list nfl-c-player-info__physical-data">'
+        + info_item("Height", None if height is None else f"{height // 12}-{height % 12}")
+        + info_item("Weight", player["weight"])
+        + info_item("Arms", player["arms"])
+        + info_item("Hands", player["hands"])
+        + "</ul>\n"
+        '<ul class="d3-o-list nfl-c-player-info__career-data">'
+        + info_item("Experience", player["experience"])
+        + info_item("College", player["college"])
+        + info_item("Hometown", player["hometown"])
+        + info_item("Age", player["age"])
+        + "</ul>\n</main></body></html>\n"
+    )
+
+
+def site(data: Dataset, page_size: int = PAGE_SIZE) -> Dict[str, str]:
+    # every page a scrape of the dataset requests, keyed by path and query
+    pages: Dict[str, str] = {}
+    for category in CATEGORIES.values():
+        for year in data.years:
+            if category.side == DEFENSE:
+                pages[path(category, year)] = defense_page(data, category, year)
+            else:
+                pages.update(listing_pages(data, category, year, page_size))
+
+    games: Dict[str, List[Dict[str, Any]]] = {}
+    for game in data.rows(ActiveStats):
+        # a player's /stats/ page lists the games of the current season
+        if game["season"] == data.season:
+            games.setdefault(game["name"], []).append(game)
+    for player in data.rows(PlayerInfo):
+        url = f"/players/{player['slug']}/"
+        pages[url] = player_page(player)
+        if player["name"] in games:
+            # the scraper appends /stats/ to a player url that already ends in a slash
+            pages[url + "/stats/"] = gamelog_page(player["name"], games[player["name"]])
+    return pages
@@ -0,0 +1,58 @@
+import argparse
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+from pages import site
+from synthetic import generate
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: "StubServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        body = self.server.pages.get(self.path)
+        data = (body or "Not Found").encode("utf-8")
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug(format % args)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pages: Dict[str, str], host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), StubHandler)
+        self.pages = pages
+        self.thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+
+    @property
+    def root_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic nfl.com for scraping")
+    parser.add_argument("-s", "--scale", type=int, default=1, help="synthetic dataset multiplier")
+    parser.add_argument("-p", "--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pages = site(generate(args.scale))
+    server = StubServer(pages, port=args.port)
+    logging.info(f"Serving {len(pages)} pages on {server.root_url}")
+    server.serve_forever()
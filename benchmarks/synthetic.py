@@ -0,0 +1,286 @@
+import os
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Type
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fantasy"))
+
+from db import (  # noqa: E402
+    ActiveStats,
+    DefensePassingStats,
+    EtlState,
+    FieldGoalStats,
+    PassingRun,
+    PassingStats,
+    PlayerInfo,
+    ReceivingStats,
+    RushingStats,
+)
+from features import FeatureBuilder  # noqa: E402
+from peewee import Model  # noqa: E402
+from records import Records  # noqa: E402
+from seasons import last_completed_season  # noqa: E402
+
+TEAMS: List[str] = [
+    "Cardinals", "Falcons", "Ravens", "Bills", "Panthers", "Bears", "Bengals", "Browns",
+    "Cowboys", "Broncos", "Lions", "Packers", "Texans", "Colts", "Jaguars", "Chiefs",
+    "Raiders", "Chargers", "Rams", "Dolphins", "Vikings", "Patriots", "Saints", "Giants",
+    "Jets", "Eagles", "Steelers", "49ers", "Seahawks", "Buccaneers", "Titans", "Commanders",
+]  # fmt: skip
+FIRST_NAMES: List[str] = [
+    "Patrick",
+    "Josh",
+    "Justin",
+    "Lamar",
+    "Joe",
+    "Jalen",
+    "Tua",
+    "Dak",
+    "Kirk",
+    "Derek",
+]
+LAST_NAMES: List[str] = [
+    "Mahomes",
+    "Allen",
+    "Herbert",
+    "Jackson",
+    "Burrow",
+    "Hurts",
+    "Cousins",
+    "Carr",
+    "Smith",
+]
+
+# share of the generated players by position
+POSITIONS: List[str] = ["QB"] + ["RB"] * 3 + ["WR"] * 6 + ["TE"] * 3 + ["K"] * 1 + ["LB"] * 6
+PLAYERS_PER_SCALE: int = 2000
+SEASONS_PER_SCALE: int = 5
+WEEKS: int = 17
+
+
+@dataclass
+class Dataset:
+    scale: int
+    season: int
+    tables: Dict[Type[Model], List[Dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def years(self) -> List[int]:
+        return sorted({row["year"] for row in self.tables[DefensePassingStats]})
+
+    def rows(self, model: Type[Model]) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(model, [])
+
+    def models(self, model: Type[Model]) -> List[Model]:
+        return [model(**row) for row in self.rows(model)]
+
+    def records(self, model: Type[Model]) -> Records:
+        return Records.from_dicts(model, self.rows(model))
+
+    def players(self, position: str) -> List[Dict[str, Any]]:
+        return [player for player in self.rows(PlayerInfo) if player["position"] == position]
+
+    def feature_builder(self) -> FeatureBuilder:
+        return FeatureBuilder(
+            active=pd.DataFrame.from_records(self.rows(ActiveStats)),
+            players=pd.DataFrame.from_records(self.rows(PlayerInfo)),
+            defense=pd.DataFrame.from_records(self.rows(DefensePassingStats)),
+            passing=pd.DataFrame.from_records(self.rows(PassingStats)),
+        )
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.tables.values())
+
+
+def player_name(i: int) -> str:
+    return (
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]} {i}"
+    )
+
+
+def slugify(name: str) -> str:
+    return name.lower().replace(" ", "-")
+
+
+def generate(scale: int = 1, season: int = last_completed_season(), predictions: bool = True) -> Dataset:
+    rng = random.Random(scale)
+    data = Dataset(scale, season)
+    years = list(range(season - SEASONS_PER_SCALE * scale + 1, season + 1))
+
+    for i in range(PLAYERS_PER_SCALE * scale):
+        name = player_name(i)
+        data.rows(PlayerInfo).append(
+            {
+                "slug": slugify(name),
+                "name": name,
+                "position": POSITIONS[i % len(POSITIONS)],
+                "active": i % 2 == 0,
+                "team": TEAMS[i % len(TEAMS)] if i % 2 == 0 else None,
+                "height": rng.randint(68, 80),
+                "weight": rng.randint(170, 330),
+                "arms": None,
+                "hands": None,
+                "experience": rng.randint(1, 18),
+                "college": "State",
+                "age": rng.randint(21, 40),
+                "hometown": None,
+            }
+        )
+
+    qbs = data.players("QB")
+    for player in qbs:
+        if not player["active"]:
+            continue
+        for week in range(1, WEEKS + 1):
+            attempts = rng.randint(15, 50)
+            completions = rng.randint(attempts // 3, attempts)
+            yards = rng.randint(80, 450)
+            data.rows(ActiveStats).append(
+                {
+                    "name": player["name"],
+                    "season": season,
+                    "week": week,
+                    "opponent": TEAMS[(week + len(player["name"])) % len(TEAMS)],
+                    "home": week % 2 == 0,
+                    "game_result": rng.choice(["W", "L"]),
+                    "pass_completions": completions,
+                    "pass_attempts": attempts,
+                    "pass_yards": yards,
+                    "pass_avg": round(yards / attempts, 1),
+                    "pass_touchdowns": rng.randint(0, 5),
+                    "interceptions": rng.randint(0, 3),
+                    "sacks": rng.randint(0, 6),
+                    "sack_yards": rng.randint(0, 40),
+                    "rating": round(rng.uniform(40, 150), 1),
+                    "rush_attempts": rng.randint(0, 10),
+                    "rush_yards": rng.randint(0, 80),
+                    "rush_avg": rng.randint(0, 8),
+                    "rush_touchdowns": rng.randint(0, 1),
+                    "fumbles": rng.randint(0, 2),
+                    "fumbles_lost": rng.randint(0, 1),
+                }
+            )
+
+    for year in years:
+        for team in TEAMS:
+            attempts = rng.randint(450, 650)
+            completions = rng.randint(280, 420)
+            data.rows(DefensePassingStats).append(
+                {
+                    "team": team,
+                    "year": year,
+                    "attempts": attempts,
+                    "completions": completions,
+                    "completion_percentage": round(100 * completions / attempts, 1),
+                    "yds_att": round(rng.uniform(5, 8), 1),
+                    "yards": rng.randint(2800, 4500),
+                    "touchdowns": rng.randint(10, 35),
+                    "interceptions": rng.randint(5, 20),
+                    "first_downs": rng.randint(150, 260),
+                    "first_down_percentage": round(rng.uniform(30, 45), 1),
+                    "sacks": rng.randint(20, 60),
+                }
+            )
+        for player in qbs:
+            data.rows(PassingStats).append(
+                {
+                    "year": year,
+                    "player": player["name"],
+                    "pass_yds": rng.randint(200, 5200),
+                    "yds_att": round(rng.uniform(5, 9), 1),
+                    "att": rng.randint(50, 650),
+                    "cmp": rng.randint(30, 450),
+                    "cmp_pct": round(rng.uniform(55, 72), 1),
+                    "td": rng.randint(0, 45),
+                    "int": rng.randint(0, 20),
+                    "rate": round(rng.uniform(60, 115), 1),
+                    "first": rng.randint(10, 280),
+                    "first_pct": round(rng.uniform(25, 45), 1),
+                    "twenty_plus": rng.randint(0, 70),
+                    "forty_plus": rng.randint(0, 15),
+                    "lng": rng.randint(20, 99),
+                    "sck": rng.randint(5, 60),
+                    "scky": rng.randint(30, 400),
+                }
+            )
+        for player in data.players("RB") + qbs:
+            data.rows(RushingStats).append(
+                {
+                    "year": year,
+                    "player": player["name"],
+                    "rush_yds": rng.randint(0, 1800),
+                    "att": rng.randint(1, 350),
+                    "td": rng.randint(0, 18),
+                    "twenty_plus": rng.randint(0, 15),
+                    "forty_plus": rng.randint(0, 5),
+                    "lng": rng.randint(1, 90),
+                    "rush_first": rng.randint(0, 90),
+                    "rush_first_pct": round(rng.uniform(10, 35), 1),
+                    "rush_fum": rng.randint(0, 6),
+                }
+            )
+        for player in data.players("WR") + data.players("TE"):
+            data.rows(ReceivingStats).append(
+                {
+                    "year": year,
+                    "player": player["name"],
+                    "rec": rng.randint(0, 130),
+                    "yds": rng.randint(0, 1800),
+                    "td": rng.randint(0, 15),
+                    "twenty_plus": rng.randint(0, 30),
+                    "forty_plus": rng.randint(0, 8),
+                    "lng": rng.randint(5, 95),
+                    "rec_first": rng.randint(0, 90),
+                    "first_pct": round(rng.uniform(40, 80), 1),
+                    "rec_fum": rng.randint(0, 3),
+                    "rec_yac_r": rng.randint(0, 9),
+                    "tgts": rng.randint(0, 180),
+                }
+            )
+        for player in data.players("K"):
+            data.rows(FieldGoalStats).append(
+                {
+                    "year": year,
+                    "player": player["name"],
+                    "fgm": rng.randint(10, 40),
+                    "att": rng.randint(12, 45),
+                    "fg_pct": round(rng.uniform(70, 100), 1),
+                    "one_nineteen_a_m": "0/0",
+                    "twenty_twentynine_a_m": f"{rng.randint(0, 9)}/9",
+                    "thirty_thirtynine_a_m": f"{rng.randint(0, 12)}/12",
+                    "forty_fortynine_a_m": f"{rng.randint(0, 10)}/10",
+                    "fifty_fiftynine_a_m": f"{rng.randint(0, 6)}/6",
+                    "sixty_plus_a_m": "0/0",
+                    "lng": rng.randint(40, 66),
+                    "fg_blk": rng.randint(0, 2),
+                }
+            )
+        for category in ("passing", "rushing", "receiving", "field-goals"):
+            data.rows(EtlState).append(
+                {
+                    "category": category,
+                    "key": "0",
+                    "year": year,
+                    "next_url": None,
+                    "completed_at": datetime.now(),
+                }
+            )
+
+    if predictions:
+        for player in qbs[: len(qbs) // 2]:
+            for team in TEAMS:
+                for is_home_game in (True, False):
+                    data.rows(PassingRun).append(
+                        {
+                            "name": player["name"],
+                            "opponent": team,
+                            "is_home_game": is_home_game,
+                            "year": season,
+                            "passing_yards": round(rng.uniform(120, 380), 1),
+                        }
+                    )
+    return data
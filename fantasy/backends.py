@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from columns import LABEL, PREDICTION_COLUMNS, TRAINING_COLUMNS
+from daos import Dao
+from db import db
+
+PROJECT_NAME: str = "nfl_passing_yards"
+DEFAULT_MODEL_DIR: str = os.path.join(os.path.expanduser("~"), ".cache", "fantasy-ml", "models")
+DEFAULT_ALPHA: float = 1.0
+
+# training columns line up one to one with the prediction array once the label is dropped
+FEATURE_COLUMNS = [column for column in TRAINING_COLUMNS if column != LABEL]
+
+# the arrays the local model is saved as, by name
+WEIGHTS: Tuple[str, ...] = ("mean", "scale", "coef", "intercept")
+
+# one matchup per row in PREDICTION_COLUMNS order, and the passing yards predicted for each
+Features = npt.NDArray[np.float32]
+Predictions = npt.NDArray[np.float64]
+
+
+class PredictorBackend(Protocol):
+    def train(self, force: bool = False) -> None: ...
+
+    def predict(self, features: Features) -> Predictions: ...
+
+    def version(self) -> Optional[str]: ...
+
+
+@dataclass
+class PgmlBackend:
+    dao: Dao
+
+    def train(self, force: bool = False) -> None:
+        self.dao.train_passing_yds(force)
+
+    def predict(self, features: Features) -> Predictions:
+        if not len(features):
+            return np.empty(0)
+        values = ", ".join(["(%s, %s::FLOAT4[])"] * len(features))
+        params: List[Any] = [PROJECT_NAME]
+        for i, row in enumerate(features.tolist()):
+            params += [i, row]
+        with db.execute_sql(
+            sql=f"SELECT pgml.predict(%s::TEXT, f) FROM (VALUES {values}) AS v (i, f) ORDER BY i",
+            params=params,
+        ) as cursor:
+            return np.array([row[0] for row in cursor.fetchall()], dtype=np.float64)
+
+    def version(self) -> Optional[str]:
+        with db.execute_sql(
+            sql="SELECT id FROM pgml.deployed_models WHERE name = %s",
+            params=[PROJECT_NAME],
+        ) as cursor:
+            row = cursor.fetchone()
+        # nothing is deployed until the first training run
+        return None if row is None else str(row[0])
+
+
+@dataclass
+class LocalBackend:
+    path: str
+    alpha: float
+
+    def __init__(self, model_dir: str = DEFAULT_MODEL_DIR, alpha: float = DEFAULT_ALPHA) -> None:
+        self.path = os.path.join(model_dir, PROJECT_NAME + ".npz")
+        self.alpha = alpha
+        self.model: Optional[Dict[str, npt.NDArray[np.float64]]] = None
+
+    def train(self, force: bool = False) -> None:  # fitting is cheap, it always retrains
+        # pandas is only needed to train, predicting works from the saved arrays
+        from features import FeatureBuilder, to_matrix
+
+        frame = FeatureBuilder.load().training_frame()
+        assert len(frame), "No training rows, load active_stats and defense_passing_stats first"
+        features = to_matrix(frame, FEATURE_COLUMNS).astype(np.float64)
+        target = frame[LABEL].to_numpy(dtype=np.float64)
+
+        # ridge regression on standardized features, closed form
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0)
+        scale[scale == 0] = 1.0
+        scaled = (features - mean) / scale
+        intercept = target.mean()
+        gram = scaled.T @ scaled + self.alpha * np.eye(scaled.shape[1])
+        coef = np.linalg.solve(gram, scaled.T @ (target - intercept))
+
+        residuals = scaled @ coef + intercept - target
+        logging.info(
+            f"Trained {PROJECT_NAME} on {len(frame)} rows, rmse {np.sqrt(np.mean(residuals**2)):.2f}"
+        )
+
+        self.model = {"mean": mean, "scale": scale, "coef": coef, "intercept": np.array(intercept)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp.npz"
+        np.savez(
+            tmp,
+            columns=np.array(FEATURE_COLUMNS),
+            mean=mean,
+            scale=scale,
+            coef=coef,
+            intercept=intercept,
+        )
+        os.replace(tmp, self.path)
+        logging.info(f"Saved {PROJECT_NAME} model to {self.path}")
+
+    def load(self) -> Dict[str, npt.NDArray[np.float64]]:
+        if self.model is None:
+            assert os.path.exists(self.path), f"No model at {self.path}, train the local backend first"
+            with np.load(self.path) as artifact:
+                assert len(artifact["columns"]) == len(PREDICTION_COLUMNS), f"Stale model at {self.path}"
+                self.model = {key: artifact[key].astype(np.float64) for key in WEIGHTS}
+        return self.model
+
+    def predict(self, features: Features) -> Predictions:
+        model = self.load()
+        scaled = (features.astype(np.float64) - model["mean"]) / model["scale"]
+        predictions: Predictions = scaled @ model["coef"] + float(model["intercept"])
+        return predictions
+
+    def version(self) -> Optional[str]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+
+BACKENDS: Dict[str, Callable[[Dao], PredictorBackend]] = {
+    "pgml": PgmlBackend,
+    "local": lambda dao: LocalBackend(),
+}
+
+
+def make_backend(name: str, dao: Dao) -> PredictorBackend:
+    assert name in BACKENDS, f"Unknown backend: {name!r}, expected one of {sorted(BACKENDS)}"
+    return BACKENDS[name](dao)
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import Dict, Final, Mapping, Tuple, Type
+
+from db import DefensePassingStats, FieldGoalStats, PassingStats, ReceivingStats, RushingStats
+from peewee import Model
+from tables import DEFENSE_PASSING, FIELD_GOALS, PASSING, RECEIVING, RUSHING, Schema
+
+PLAYER: Final[str] = "player"
+DEFENSE: Final[str] = "defense"
+
+# (side, nfl.com category name)
+CategoryKey = Tuple[str, str]
+
+PLAYER_SORT_KEYS: Final[Mapping[str, str]] = {
+    "passing": "passingyards",
+    "rushing": "rushingyards",
+    "receiving": "receivingreceptions",
+    "fumbles": "defensiveforcedfumble",
+    "tackles": "defensivecombinetackles",
+    "interceptions": "defensiveinterceptions",
+    "field-goals": "kickingfgmade",
+    "kickoffs": "kickofftotal",
+    "kickoff-returns": "kickreturnsaverageyards",
+    "punts": "puntingaverageyards",
+    "punt-returns": "puntreturnsaverageyards",
+}
+
+
+@dataclass(frozen=True)
+class StatCategory:
+    side: str
+    name: str
+    schema: Schema
+    model: Type[Model]
+
+    @property
+    def key(self) -> str:
+        name: str = self.schema.name
+        return name
+
+    def url(self, root_url: str, year: int) -> str:
+        if self.side == PLAYER:
+            return (
+                root_url
+                + "/stats/player-stats/category/"
+                + self.name
+                + "/"
+                + str(year)
+                + "/reg/all/"
+                + PLAYER_SORT_KEYS[self.name]
+                + "/desc"
+            )
+        return (
+            root_url + "/stats/team-stats/" + self.side + "/" + self.name + "/" + str(year) + "/reg/all"
+        )
+
+
+CATEGORIES: Dict[CategoryKey, StatCategory] = {}
+
+
+def register(category: StatCategory) -> StatCategory:
+    key: CategoryKey = (category.side, category.name)
+    CATEGORIES[key] = category
+    return category
+
+
+register(StatCategory(PLAYER, "passing", PASSING, PassingStats))
+register(StatCategory(PLAYER, "rushing", RUSHING, RushingStats))
+register(StatCategory(PLAYER, "receiving", RECEIVING, ReceivingStats))
+register(StatCategory(PLAYER, "field-goals", FIELD_GOALS, FieldGoalStats))
+register(StatCategory(DEFENSE, "passing", DEFENSE_PASSING, DefensePassingStats))
@@ -0,0 +1,38 @@
+from typing import List
+
+# same names and order as the table returned by public.nfl_features()
+TRAINING_COLUMNS: List[str] = [
+    "age",
+    "experience",
+    "pass_attempts",
+    "pass_completions",
+    "pass_yards",
+    "pass_avg",
+    "rating",
+    "is_home",
+    "is_away",
+    "def_avg_pass_att",
+    "dev_avg_completions",
+    "def_yds_att",
+    "def_avg_sacks",
+]
+LABEL: str = "pass_yards"
+
+# same order as the ARRAY passed to pgml.predict in PassingPredictor.predict
+PREDICTION_COLUMNS: List[str] = [
+    "age",
+    "experience",
+    "pass_attempts",
+    "pass_completions",
+    "pass_avg",
+    "rating",
+    "is_home",
+    "is_away",
+    "avg_pass_att_against",
+    "avg_completions_against",
+    "avg_yds_att_against",
+    "avg_sacks",
+]
+PREDICTION_KEYS: List[str] = ["name", "opponent", "is_home_game"]
+
+INT_COLUMNS: List[str] = ["age", "experience", "is_home", "is_away"]
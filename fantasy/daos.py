@@ -1,8 +1,11 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, cast
 
 from db import ActiveStats, DefensePassingStats, PassingRun, PassingStats, PlayerInfo, db
-from peewee import ModelSelect, fn
+from feature_cache import DEFENSE, INFO, MISSING, PLAYER, Features, feature_cache
+from feature_store import FeatureStore
+from peewee import ModelSelect, chunked, fn
+from seasons import last_completed_season
 
 NUM_GAMES: float = 17.0
 
@@ -29,6 +32,122 @@ class Dao:
         )
         return self.parse_passing_run(query)
 
+    def save_predictions(self, year: int, predictions: List[Tuple[str, str, bool, float]]) -> None:
+        rows = [
+            {
+                "name": name,
+                "opponent": opponent,
+                "is_home_game": is_home_game,
+                "year": year,
+                "passing_yards": passing_yards,
+            }
+            for name, opponent, is_home_game, passing_yards in predictions
+        ]
+        with db.atomic():
+            for chunk in chunked(rows, 1000):
+                PassingRun.insert_many(chunk).execute()
+
+    def delete_predictions(self, year: int) -> int:
+        return int(PassingRun.delete().where(PassingRun.year == year).execute())
+
+    def get_prediction_keys(self, year: int) -> Set[Tuple[str, str, bool]]:
+        query = PassingRun.select(PassingRun.name, PassingRun.opponent, PassingRun.is_home_game).where(
+            PassingRun.year == year
+        )
+        return {(row.name, row.opponent, row.is_home_game) for row in query}
+
+    def predict_passing_yds_batch(
+        self, year: int, persist: bool, names: Optional[List[str]] = None
+    ) -> List[Tuple[str, str, bool, float]]:
+        # one statement builds every QB x defense x home/away feature row, scores it and saves it
+        grid = """
+            WITH info AS (
+                SELECT DISTINCT ON (p.name)
+                    p.name,
+                    p.age - (date_part('year', CURRENT_DATE)::INT4 - 1 - %(year)s) AS age,
+                    p.experience - (date_part('year', CURRENT_DATE)::INT4 - 1 - %(year)s) AS experience
+                FROM players p
+                WHERE p.position = 'QB' AND p.active
+                AND (%(names)s::VARCHAR[] IS NULL OR p.name = ANY(%(names)s::VARCHAR[]))
+                ORDER BY p.name
+            ), active AS (
+                SELECT
+                    a.name,
+                    AVG(a.pass_attempts) AS pass_attempts,
+                    AVG(a.pass_completions) AS pass_completions,
+                    AVG(a.pass_avg) AS pass_avg
+                FROM active_stats a
+                JOIN info USING (name)
+                WHERE a.season = %(year)s
+                GROUP BY a.name
+            ), rating AS (
+                SELECT DISTINCT ON (ps.player) ps.player AS name, ps.rate AS rating
+                FROM passing_stats ps
+                WHERE ps.year = %(year)s
+                ORDER BY ps.player
+            ), defense AS (
+                SELECT
+                    d.team AS opponent,
+                    d.attempts / %(num_games)s AS avg_pass_att_against,
+                    d.completions / %(num_games)s AS avg_completions_against,
+                    d.yds_att AS avg_yds_att_against,
+                    d.sacks / %(num_games)s AS avg_sacks
+                FROM defense_passing_stats d
+                WHERE d.year = %(year)s
+            ), grid AS (
+                SELECT i.name, d.opponent, h.is_home_game, i.age, i.experience, a.pass_attempts,
+                    a.pass_completions, a.pass_avg, r.rating, d.avg_pass_att_against,
+                    d.avg_completions_against, d.avg_yds_att_against, d.avg_sacks
+                FROM info i
+                JOIN active a USING (name)
+                JOIN rating r USING (name)
+                CROSS JOIN defense d
+                CROSS JOIN (VALUES (TRUE), (FALSE)) AS h (is_home_game)
+                WHERE NOT (%(persist)s AND EXISTS (
+                    SELECT 1 FROM passing_run pr
+                    WHERE pr.name = i.name
+                    AND pr.opponent = d.opponent
+                    AND pr.is_home_game = h.is_home_game
+                    AND pr.year = %(year)s
+                ))
+            ), scored AS (
+                SELECT name, opponent, is_home_game, pgml.predict(
+                    'nfl_passing_yards'::TEXT,
+                    ARRAY[
+                        age::INT4,
+                        experience::INT4,
+                        pass_attempts::FLOAT4,
+                        pass_completions::FLOAT4,
+                        pass_avg::FLOAT4,
+                        rating::FLOAT4,
+                        CASE WHEN is_home_game THEN 1 ELSE 0 END::INT4,
+                        CASE WHEN is_home_game THEN 0 ELSE 1 END::INT4,
+                        avg_pass_att_against::FLOAT4,
+                        avg_completions_against::FLOAT4,
+                        avg_yds_att_against::FLOAT4,
+                        avg_sacks::FLOAT4
+                    ]
+                ) AS passing_yards
+                FROM grid
+            )
+        """
+        if persist:
+            sql = (
+                grid
+                + """
+                INSERT INTO passing_run (name, opponent, is_home_game, year, passing_yards)
+                SELECT name, opponent, is_home_game, %(year)s, passing_yards FROM scored
+                RETURNING name, opponent, is_home_game, passing_yards
+            """
+            )
+        else:
+            sql = grid + "SELECT name, opponent, is_home_game, passing_yards FROM scored"
+
+        with db.atomic():
+            params = {"year": year, "persist": persist, "num_games": NUM_GAMES, "names": names}
+            with db.execute_sql(sql=sql, params=params) as cursor:
+                return [(name, opponent, home, float(yards)) for name, opponent, home, yards in cursor]
+
     def parse_passing_run(self, query: ModelSelect) -> float | None:
         rows = [row for row in query]
         if not rows:
@@ -38,94 +157,115 @@ class Dao:
 
     # def get_predictions():
 
-    def train_passing_yds(self) -> None:
-        db.execute_sql(
-            sql="""
-                DROP TABLE IF EXISTS public.nfl_features;
-                CREATE TABLE public.features AS SELECT * FROM public.nfl_features();
-            """
-        )
+    def train_passing_yds(self, force: bool = False) -> None:
+        # the features view reads the incrementally refreshed feature_rows table; the refreshed hashes
+        # commit together with the trained model, a failed training run leaves them stale and is retried
+        with db.atomic():
+            refresh = FeatureStore().refresh()
+            if not refresh.changed and not force:
+                logging.info("Features unchanged since the last refresh, skipping training")
+                return
 
-        with db.execute_sql(
-            sql="""SELECT * FROM pgml.train(
-                    project_name => 'nfl_passing_yards',
-                    task => 'regression',
-                    relation_name => 'features',
-                    y_column_name => 'pass_yards',
-                    algorithm => 'lightgbm'
-                );"""
-        ) as cursor:
-            print(f"{cursor.fetchall()[0]}")
+            with db.execute_sql(
+                sql="""SELECT * FROM pgml.train(
+                        project_name => 'nfl_passing_yards',
+                        task => 'regression',
+                        relation_name => 'features',
+                        y_column_name => 'pass_yards',
+                        algorithm => 'lightgbm'
+                    );"""
+            ) as cursor:
+                print(f"{cursor.fetchall()[0]}")
 
     def get_player_info(self, name: str, year: int) -> Dict[str, Any]:
-        now = datetime.now().year
-        diff = now - 1 - year
-        query = PlayerInfo.select().where(PlayerInfo.name == name).limit(1)
-        return {
-            "name": query[0].name,
+        info = feature_cache.get(INFO, name, year)
+        if info is None:
+            info = self.load_player_info(name, year)
+        if info is MISSING:
+            raise IndexError(f"No player info for {name}")
+        return info
+
+    def load_player_info(self, name: str, year: int) -> Features:
+        player = PlayerInfo.select().where(PlayerInfo.name == name).first()
+        if player is None:
+            feature_cache.put_missing(INFO, year, name)
+            return MISSING
+
+        # ages and experience are as of the last completed season, rolled back to the one predicted
+        diff = last_completed_season() - year
+        info: Dict[str, Any] = {
+            "name": player.name,
             "year": year,
-            "age": int(query[0].age) - diff,
-            "experience": int(query[0].experience) - diff,
+            "age": int(player.age) - diff,
+            "experience": int(player.experience) - diff,
         }
+        feature_cache.put_all(INFO, year, {name: info})
+        return info
 
     def get_player_active_stats(self, name: str, year: int) -> Dict[str, Any]:
-        return {
-            "name": name,
-            "year": year,
-            "pass_attempts": float(
-                ActiveStats.select(fn.AVG(ActiveStats.pass_attempts))
-                .where(ActiveStats.name == name)
-                .scalar()
-            ),
-            "pass_completions": float(
-                ActiveStats.select(fn.AVG(ActiveStats.pass_completions))
-                .where(ActiveStats.name == name)
-                .scalar()
-            ),
-            "pass_avg": float(
-                ActiveStats.select(fn.AVG(ActiveStats.pass_avg)).where(ActiveStats.name == name).scalar()
-            ),
-            "rating": float(
-                PassingStats.select(PassingStats.rate)
-                .where(PassingStats.player == name)
-                .where(PassingStats.year == year)
-                .limit(1)
-                .scalar()
-            ),
-        }
+        stats = feature_cache.get(PLAYER, name, year)
+        if stats is None:
+            stats = self.load_player_active_stats(year).get(name)
+            if stats is None:
+                feature_cache.put_missing(PLAYER, year, name)
+        assert stats is not None and stats is not MISSING, f"No active stats for {name} in {year}"
+        return stats
 
-    def get_defense_stats(self, team: str, year: int) -> Dict[str, Any]:
-        return {
-            "team": team,
-            "year": year,
-            "avg_pass_att_against": float(
-                DefensePassingStats.select(DefensePassingStats.attempts)
-                .where(DefensePassingStats.team == team)
-                .where(DefensePassingStats.year == year)
-                .scalar()
-            )
-            / NUM_GAMES,
-            "avg_completions_against": float(
-                DefensePassingStats.select(DefensePassingStats.completions)
-                .where(DefensePassingStats.team == team)
-                .where(DefensePassingStats.year == year)
-                .scalar()
+    def load_player_active_stats(self, year: int) -> Dict[str, Dict[str, Any]]:
+        query = (
+            ActiveStats.select(
+                ActiveStats.name,
+                fn.AVG(ActiveStats.pass_attempts).alias("pass_attempts"),
+                fn.AVG(ActiveStats.pass_completions).alias("pass_completions"),
+                fn.AVG(ActiveStats.pass_avg).alias("pass_avg"),
+                fn.MAX(PassingStats.rate).alias("rating"),
             )
-            / NUM_GAMES,
-            "avg_yds_att_against": float(
-                DefensePassingStats.select(DefensePassingStats.yds_att)
-                .where(DefensePassingStats.team == team)
-                .where(DefensePassingStats.year == year)
-                .scalar()
-            ),
-            "avg_sacks": float(
-                DefensePassingStats.select(DefensePassingStats.sacks)
-                .where(DefensePassingStats.team == team)
-                .where(DefensePassingStats.year == year)
-                .scalar()
+            .join(
+                PassingStats,
+                on=(PassingStats.player == ActiveStats.name) & (PassingStats.year == year),
             )
-            / NUM_GAMES,
+            .where(ActiveStats.season == year)
+            .group_by(ActiveStats.name)
+        )
+        rows = cast(Iterable[Dict[str, Any]], query.dicts())
+        stats = {
+            row["name"]: {
+                "name": row["name"],
+                "year": year,
+                "pass_attempts": float(row["pass_attempts"]),
+                "pass_completions": float(row["pass_completions"]),
+                "pass_avg": float(row["pass_avg"]),
+                "rating": float(row["rating"]),
+            }
+            for row in rows
+        }
+        feature_cache.put_all(PLAYER, year, stats)
+        return stats
+
+    def get_defense_stats(self, team: str, year: int) -> Dict[str, Any]:
+        stats = feature_cache.get(DEFENSE, team, year)
+        if stats is None:
+            stats = self.load_defense_stats(year).get(team)
+            if stats is None:
+                feature_cache.put_missing(DEFENSE, year, team)
+        assert stats is not None and stats is not MISSING, f"No defense stats for {team} in {year}"
+        return stats
+
+    def load_defense_stats(self, year: int) -> Dict[str, Dict[str, Any]]:
+        query = DefensePassingStats.select().where(DefensePassingStats.year == year)
+        stats = {
+            row.team: {
+                "team": row.team,
+                "year": year,
+                "avg_pass_att_against": float(row.attempts) / NUM_GAMES,
+                "avg_completions_against": float(row.completions) / NUM_GAMES,
+                "avg_yds_att_against": float(row.yds_att),
+                "avg_sacks": float(row.sacks) / NUM_GAMES,
+            }
+            for row in query
         }
+        feature_cache.put_all(DEFENSE, year, stats)
+        return stats
 
     def get_player_names(self) -> List[str]:
         query = (
@@ -137,7 +277,7 @@ class Dao:
 
     def get_team_names(self) -> List[str]:
         query = DefensePassingStats.select(DefensePassingStats.team).where(
-            DefensePassingStats.year == datetime.now().year - 1
+            DefensePassingStats.year == last_completed_season()
         )
         return [team.team for team in query]
 
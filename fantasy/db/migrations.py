@@ -0,0 +1,522 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Sequence, Tuple
+
+from db import db
+from seasons import current_season
+
+# table -> (primary key constraint, key columns), matching the CompositeKeys on the models
+PRIMARY_KEYS: List[Tuple[str, str, Sequence[str]]] = [
+    ("players", "players_pkey", ("name", "position")),
+    # active_stats is only keyed by season_game_logs, once every game log has a season: deduping it on
+    # (name, week) here would keep the last season of each week and drop the others
+    ("defense_passing_stats", "defense_passing_stats_pkey", ("team", "year")),
+    ("passing_stats", "passing_stats_pkey", ("year", "player")),
+    ("rushing_stats", "rushing_stats_pkey", ("year", "player")),
+    ("receiving_stats", "receiving_stats_pkey", ("year", "player")),
+    ("field_goal_stats", "field_goal_stats_pkey", ("year", "player")),
+    ("passing_run", "passing_run_pkey", ("year", "name", "opponent", "is_home_game")),
+]
+
+INDEXES: List[str] = [
+    "CREATE INDEX IF NOT EXISTS players_position_idx ON public.players (position, active)",
+    'CREATE INDEX IF NOT EXISTS defense_passing_stats_year_idx ON public.defense_passing_stats ("year")',
+]
+
+# The DDL below is each relation as the migration that creates it left it, schema.sql only describes
+# the latest version. Never edit a released one: a database part way through the history needs the
+# DDL of its next migration, not today's. Change the schema in a new migration instead.
+
+ETL_STATE_V3 = """
+CREATE TABLE public.etl_state (
+    category varchar NOT NULL,
+    "key" varchar NOT NULL,
+    "year" integer NOT NULL,
+    next_url varchar,
+    completed_at timestamp NOT NULL,
+    CONSTRAINT etl_state_pkey PRIMARY KEY (category, "key", "year")
+);
+"""
+
+NFL_FEATURE_ROWS_V4 = """
+CREATE VIEW public.nfl_feature_rows AS
+    WITH stats AS (
+        SELECT
+            "as".name,
+            "as".week,
+            "as".opponent,
+            "as".home,
+            "as".pass_completions,
+            "as".pass_attempts,
+            "as".pass_yards,
+            "as".pass_avg,
+            "as".rating
+        FROM public.active_stats "as"
+        WHERE "as".pass_attempts > 0
+    ), info AS (
+        SELECT
+            p.name,
+            p.experience,
+            p.age
+        FROM public.players p
+        WHERE NOT (
+            p.name IS NULL OR p.experience IS NULL OR p.age IS NULL
+        )
+        AND "position" = 'QB'
+    ), defense AS (
+        SELECT
+            team AS opponent,
+            attempts::float / 17::float AS def_avg_pass_att,
+            completions::float / 17::float AS def_avg_completions,
+            yds_att AS def_yds_att,
+            sacks::float / 17::float AS def_avg_sacks
+        FROM public.defense_passing_stats
+        WHERE "year" = (date_part('year', CURRENT_DATE) - 1)
+    )
+    SELECT
+        s.name,
+        s.week,
+        s.opponent,
+        i.age::INT4 AS age,
+        i.experience::INT4 AS experience,
+        s.pass_attempts::FLOAT4 AS pass_attempts,
+        s.pass_completions::FLOAT4 AS pass_completions,
+        s.pass_yards::FLOAT4 AS pass_yards,
+        s.pass_avg::FLOAT4 AS pass_avg,
+        s.rating::FLOAT4 AS rating,
+        CASE WHEN s.home IS TRUE THEN 1 ELSE 0 END AS is_home,
+        CASE WHEN s.home IS TRUE THEN 0 ELSE 1 END AS is_away,
+        d.def_avg_pass_att::FLOAT4 AS def_avg_pass_att,
+        d.def_avg_completions::FLOAT4 AS dev_avg_completions,
+        d.def_yds_att::FLOAT4 AS def_yds_att,
+        d.def_avg_sacks::FLOAT4 AS def_avg_sacks
+    FROM stats s
+    JOIN info i USING ("name")
+    JOIN defense d USING ("opponent");
+"""
+
+NFL_FEATURES_V4 = """
+CREATE FUNCTION public.nfl_features()
+RETURNS TABLE(
+    age INT4,
+    experience INT4,
+    pass_attempts FLOAT4,
+    pass_completions FLOAT4,
+    pass_yards FLOAT4,
+    pass_avg FLOAT4,
+    rating FLOAT4,
+    is_home INT4,
+    is_away INT4,
+    def_avg_pass_att FLOAT4,
+    dev_avg_completions FLOAT4,
+    def_yds_att FLOAT4,
+    def_avg_sacks FLOAT4
+)
+LANGUAGE plpgsql STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        r.age,
+        r.experience,
+        r.pass_attempts,
+        r.pass_completions,
+        r.pass_yards,
+        r.pass_avg,
+        r.rating,
+        r.is_home,
+        r.is_away,
+        r.def_avg_pass_att,
+        r.dev_avg_completions,
+        r.def_yds_att,
+        r.def_avg_sacks
+    FROM public.nfl_feature_rows r;
+END
+$$;
+"""
+
+FEATURE_ROWS_V4 = """
+CREATE TABLE public.feature_rows (
+    name varchar NOT NULL,
+    week integer NOT NULL,
+    opponent varchar NOT NULL,
+    age INT4,
+    experience INT4,
+    pass_attempts FLOAT4,
+    pass_completions FLOAT4,
+    pass_yards FLOAT4,
+    pass_avg FLOAT4,
+    rating FLOAT4,
+    is_home INT4,
+    is_away INT4,
+    def_avg_pass_att FLOAT4,
+    dev_avg_completions FLOAT4,
+    def_yds_att FLOAT4,
+    def_avg_sacks FLOAT4,
+    CONSTRAINT feature_rows_pkey PRIMARY KEY (name, week)
+);
+
+CREATE INDEX feature_rows_opponent_idx ON public.feature_rows (opponent);
+"""
+
+FEATURE_HASHES_V4 = """
+CREATE TABLE public.feature_hashes (
+    entity varchar NOT NULL,
+    "key" varchar NOT NULL,
+    hash varchar NOT NULL,
+    refreshed_at timestamp NOT NULL,
+    CONSTRAINT feature_hashes_pkey PRIMARY KEY (entity, "key")
+);
+"""
+
+FEATURES_V4 = """
+CREATE VIEW public.features AS
+    SELECT
+        age,
+        experience,
+        pass_attempts,
+        pass_completions,
+        pass_yards,
+        pass_avg,
+        rating,
+        is_home,
+        is_away,
+        def_avg_pass_att,
+        dev_avg_completions,
+        def_yds_att,
+        def_avg_sacks
+    FROM public.feature_rows;
+"""
+
+PIPELINE_STATE_V5 = """
+CREATE TABLE public.pipeline_state (
+    stage varchar NOT NULL,
+    fingerprint varchar,
+    seconds double precision NOT NULL,
+    completed_at timestamp NOT NULL,
+    CONSTRAINT pipeline_state_pkey PRIMARY KEY (stage)
+);
+"""
+
+ACTIVE_STATS_V6 = """
+CREATE TABLE public.active_stats (
+    name varchar NOT NULL,
+    season integer NOT NULL,
+    week integer NOT NULL,
+    opponent varchar,
+    home boolean,
+    game_result varchar,
+    pass_completions integer,
+    pass_attempts integer,
+    pass_yards integer,
+    pass_avg float,
+    pass_touchdowns integer,
+    interceptions integer,
+    sacks integer,
+    sack_yards integer,
+    rating float,
+    rush_attempts integer,
+    rush_yards integer,
+    rush_avg integer,
+    rush_touchdowns integer,
+    fumbles integer,
+    fumbles_lost integer,
+    CONSTRAINT active_stats_pkey PRIMARY KEY (name, season, week)
+) PARTITION BY LIST (season);
+"""
+
+# the game log columns of active_stats before it had a season
+GAME_LOG_COLUMNS_V6: List[str] = [
+    "name",
+    "week",
+    "opponent",
+    "home",
+    "game_result",
+    "pass_completions",
+    "pass_attempts",
+    "pass_yards",
+    "pass_avg",
+    "pass_touchdowns",
+    "interceptions",
+    "sacks",
+    "sack_yards",
+    "rating",
+    "rush_attempts",
+    "rush_yards",
+    "rush_avg",
+    "rush_touchdowns",
+    "fumbles",
+    "fumbles_lost",
+]
+
+NFL_FEATURE_ROWS_V6 = """
+CREATE VIEW public.nfl_feature_rows AS
+    WITH stats AS (
+        SELECT
+            "as".name,
+            "as".season,
+            "as".week,
+            "as".opponent,
+            "as".home,
+            "as".pass_completions,
+            "as".pass_attempts,
+            "as".pass_yards,
+            "as".pass_avg,
+            "as".rating
+        FROM public.active_stats "as"
+        WHERE "as".pass_attempts > 0
+    ), info AS (
+        SELECT
+            p.name,
+            p.experience,
+            p.age
+        FROM public.players p
+        WHERE NOT (
+            p.name IS NULL OR p.experience IS NULL OR p.age IS NULL
+        )
+        AND "position" = 'QB'
+    ), defense AS (
+        SELECT
+            team AS opponent,
+            "year" AS season,
+            attempts::float / 17::float AS def_avg_pass_att,
+            completions::float / 17::float AS def_avg_completions,
+            yds_att AS def_yds_att,
+            sacks::float / 17::float AS def_avg_sacks
+        FROM public.defense_passing_stats
+    )
+    SELECT
+        s.name,
+        s.season,
+        s.week,
+        s.opponent,
+        i.age::INT4 AS age,
+        i.experience::INT4 AS experience,
+        s.pass_attempts::FLOAT4 AS pass_attempts,
+        s.pass_completions::FLOAT4 AS pass_completions,
+        s.pass_yards::FLOAT4 AS pass_yards,
+        s.pass_avg::FLOAT4 AS pass_avg,
+        s.rating::FLOAT4 AS rating,
+        CASE WHEN s.home IS TRUE THEN 1 ELSE 0 END AS is_home,
+        CASE WHEN s.home IS TRUE THEN 0 ELSE 1 END AS is_away,
+        d.def_avg_pass_att::FLOAT4 AS def_avg_pass_att,
+        d.def_avg_completions::FLOAT4 AS dev_avg_completions,
+        d.def_yds_att::FLOAT4 AS def_yds_att,
+        d.def_avg_sacks::FLOAT4 AS def_avg_sacks
+    FROM stats s
+    JOIN info i USING ("name")
+    JOIN defense d USING ("opponent", "season");
+"""
+
+FEATURE_ROWS_V6 = """
+CREATE TABLE public.feature_rows (
+    name varchar NOT NULL,
+    season integer NOT NULL,
+    week integer NOT NULL,
+    opponent varchar NOT NULL,
+    age INT4,
+    experience INT4,
+    pass_attempts FLOAT4,
+    pass_completions FLOAT4,
+    pass_yards FLOAT4,
+    pass_avg FLOAT4,
+    rating FLOAT4,
+    is_home INT4,
+    is_away INT4,
+    def_avg_pass_att FLOAT4,
+    dev_avg_completions FLOAT4,
+    def_yds_att FLOAT4,
+    def_avg_sacks FLOAT4,
+    CONSTRAINT feature_rows_pkey PRIMARY KEY (name, season, week)
+);
+
+CREATE INDEX feature_rows_opponent_idx ON public.feature_rows (opponent);
+"""
+
+
+def relation_kind(name: str) -> str:
+    query = "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)"
+    with db.execute_sql(query, [f"public.{name}"]) as cursor:
+        row = cursor.fetchone()
+    return "" if row is None else row[0]
+
+
+def add_primary_key(table: str, constraint: str, columns: Sequence[str]) -> None:
+    with db.execute_sql("SELECT 1 FROM pg_constraint WHERE conname = %s", [constraint]) as cursor:
+        if cursor.fetchone() is not None:
+            return
+
+    quoted = [f'"{column}"' for column in columns]
+    # keys can't hold nulls or duplicates, keep the most recently written copy of each row
+    db.execute_sql(f"DELETE FROM public.{table} WHERE " + " OR ".join(f"{c} IS NULL" for c in quoted))
+    with db.execute_sql(
+        f"DELETE FROM public.{table} a USING public.{table} b WHERE a.ctid < b.ctid AND "
+        + " AND ".join(f"a.{c} = b.{c}" for c in quoted)
+    ) as cursor:
+        if cursor.rowcount:
+            logging.info(f"Removed {cursor.rowcount} duplicate rows from {table}")
+    db.execute_sql(
+        f"ALTER TABLE public.{table} ADD CONSTRAINT {constraint} PRIMARY KEY ({', '.join(quoted)})"
+    )
+    logging.info(f"Added {constraint} on {table}")
+
+
+def create_missing(name: str, ddl: str) -> None:
+    if not relation_kind(name):
+        db.execute_sql(ddl)
+
+
+def primary_keys() -> None:
+    for table, constraint, columns in PRIMARY_KEYS:
+        add_primary_key(table, constraint, columns)
+
+
+def indexes() -> None:
+    for index in INDEXES:
+        db.execute_sql(index)
+
+
+def scrape_state() -> None:
+    db.execute_sql("ALTER TABLE public.players ADD COLUMN IF NOT EXISTS slug varchar")
+    create_missing("etl_state", ETL_STATE_V3)
+
+
+def feature_store() -> None:
+    # train_passing_yds used to leave a plain features table behind
+    if relation_kind("features") == "r":
+        db.execute_sql("DROP TABLE public.features")
+    create_missing("nfl_feature_rows", NFL_FEATURE_ROWS_V4)
+    db.execute_sql("DROP FUNCTION IF EXISTS public.nfl_features()")
+    db.execute_sql(NFL_FEATURES_V4)
+    create_missing("feature_rows", FEATURE_ROWS_V4)
+    create_missing("feature_hashes", FEATURE_HASHES_V4)
+    create_missing("features", FEATURES_V4)
+
+
+def pipeline_state() -> None:
+    create_missing("pipeline_state", PIPELINE_STATE_V5)
+
+
+def etl_state_year_index() -> None:
+    # resume points read every page of one category and season, the primary key leads with the page
+    db.execute_sql(
+        'CREATE INDEX IF NOT EXISTS etl_state_year_idx ON public.etl_state (category, "year")'
+    )
+
+
+def season_game_logs() -> None:
+    # active_stats was keyed by (name, week), so every season's game logs overwrote the last one's
+    if relation_kind("active_stats") == "p":
+        return
+    db.execute_sql("DROP VIEW IF EXISTS public.features")
+    db.execute_sql("DROP VIEW IF EXISTS public.nfl_feature_rows")
+    db.execute_sql("DROP TABLE IF EXISTS public.feature_rows")
+    db.execute_sql("ALTER TABLE public.active_stats RENAME TO active_stats_unpartitioned")
+    db.execute_sql(
+        "ALTER INDEX IF EXISTS public.active_stats_pkey RENAME TO active_stats_unpartitioned_pkey"
+    )
+    db.execute_sql(ACTIVE_STATS_V6)
+
+    # every scrape used to append the player's game logs again, identical copies are the same game
+    with db.execute_sql(
+        "DELETE FROM public.active_stats_unpartitioned a USING public.active_stats_unpartitioned b "
+        "WHERE a.ctid < b.ctid AND a.name = b.name AND a.week = b.week AND a IS NOT DISTINCT FROM b"
+    ) as cursor:
+        if cursor.rowcount:
+            logging.info(f"Removed {cursor.rowcount} repeated game logs from active_stats")
+
+    # logs were only scraped for the season running at the time and appended in order: the latest
+    # copy of a week belongs to the season of the player's gamelog watermark, each older one to the
+    # season before
+    db.execute_sql(
+        sql="""
+            CREATE TEMP TABLE game_log_seasons ON COMMIT DROP AS
+            WITH latest AS (
+                SELECT a.name, coalesce(max(e.year), %s) AS season
+                FROM (SELECT DISTINCT name FROM public.active_stats_unpartitioned) a
+                LEFT JOIN public.players p ON p.name = a.name AND p.slug IS NOT NULL
+                LEFT JOIN public.etl_state e ON e.category = 'gamelog' AND e.key = p.slug
+                GROUP BY a.name
+            )
+            SELECT
+                (
+                    l.season + 1 - row_number() OVER (PARTITION BY a.name, a.week ORDER BY a.ctid DESC)
+                )::integer AS season,
+                a.*
+            FROM public.active_stats_unpartitioned a
+            JOIN latest l USING (name)
+        """,
+        params=[current_season()],
+    )
+    with db.execute_sql("SELECT DISTINCT season FROM game_log_seasons") as cursor:
+        seasons = [row[0] for row in cursor.fetchall()]
+    for season in seasons:
+        db.execute_sql(
+            f"CREATE TABLE IF NOT EXISTS public.active_stats_{int(season)} "
+            f"PARTITION OF public.active_stats FOR VALUES IN ({int(season)})"
+        )
+    columns = ", ".join(f'"{column}"' for column in GAME_LOG_COLUMNS_V6)
+    with db.execute_sql(
+        f"INSERT INTO public.active_stats (season, {columns}) "
+        f"SELECT season, {columns} FROM game_log_seasons"
+    ) as cursor:
+        logging.info(f"Moved {cursor.rowcount} game logs into {len(seasons)} season partitions")
+    db.execute_sql("DROP TABLE public.active_stats_unpartitioned")
+
+    # feature rows are keyed by season now, rebuild all of them on the next refresh
+    create_missing("nfl_feature_rows", NFL_FEATURE_ROWS_V6)
+    create_missing("feature_rows", FEATURE_ROWS_V6)
+    create_missing("features", FEATURES_V4)
+    db.execute_sql("TRUNCATE public.feature_hashes")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[], None]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "primary_keys", primary_keys),
+    Migration(2, "indexes", indexes),
+    Migration(3, "scrape_state", scrape_state),
+    Migration(4, "feature_store", feature_store),
+    Migration(5, "pipeline_state", pipeline_state),
+    Migration(6, "season_game_logs", season_game_logs),
+    Migration(7, "etl_state_year_index", etl_state_year_index),
+]
+
+
+def applied_versions() -> List[int]:
+    db.execute_sql(sql="""
+            CREATE TABLE IF NOT EXISTS public.schema_migrations (
+                version integer PRIMARY KEY,
+                name varchar NOT NULL,
+                applied_at timestamp NOT NULL DEFAULT now()
+            )
+        """)
+    with db.execute_sql("SELECT version FROM public.schema_migrations ORDER BY version") as cursor:
+        return [row[0] for row in cursor.fetchall()]
+
+
+def migrate() -> List[int]:
+    applied = set(applied_versions())
+    done = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        with db.atomic():
+            migration.apply()
+            db.execute_sql(
+                "INSERT INTO public.schema_migrations (version, name) VALUES (%s, %s)",
+                [migration.version, migration.name],
+            )
+        logging.info(f"Applied migration {migration.version} {migration.name}")
+        done.append(migration.version)
+    return done
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate()
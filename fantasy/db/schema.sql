@@ -28,6 +28,7 @@ SET default_table_access_method = heap;
 --
 
 CREATE TABLE public.players (
+    slug varchar,
     "name" varchar NOT NULL,
     position varchar NOT NULL,
     active boolean,
@@ -39,15 +40,19 @@ CREATE TABLE public.players (
     experience integer,
     college varchar,
     age integer,
-    hometown varchar
+    hometown varchar,
+    CONSTRAINT players_pkey PRIMARY KEY ("name", position)
 );
 
+CREATE INDEX players_position_idx ON public.players (position, active);
+
 --
 -- Name: active_stats; Type: TABLE; Schema: public;
 --
 
 CREATE TABLE public.active_stats (
     name varchar NOT NULL,
+    season integer NOT NULL,
     week integer NOT NULL,
     opponent varchar,
     home boolean,
@@ -66,8 +71,9 @@ CREATE TABLE public.active_stats (
     rush_avg integer,
     rush_touchdowns integer,
     fumbles integer,
-    fumbles_lost integer
-);
+    fumbles_lost integer,
+    CONSTRAINT active_stats_pkey PRIMARY KEY (name, season, week)
+) PARTITION BY LIST (season);
 
 --
 -- Name: defense_stats; Type: TABLE; Schema: public;
@@ -85,9 +91,12 @@ CREATE TABLE public.defense_passing_stats (
     interceptions integer,
     first_downs integer,
     first_down_percentage float,
-    sacks integer
+    sacks integer,
+    CONSTRAINT defense_passing_stats_pkey PRIMARY KEY (team, "year")
 );
 
+CREATE INDEX defense_passing_stats_year_idx ON public.defense_passing_stats ("year");
+
 --
 -- Name: passing_stats; Type: TABLE; Schema: public;
 --
@@ -109,7 +118,8 @@ CREATE TABLE public.passing_stats (
     forty_plus integer,
     lng integer,
     sck integer,
-    scky integer
+    scky integer,
+    CONSTRAINT passing_stats_pkey PRIMARY KEY ("year", player)
 );
 
 --
@@ -127,7 +137,8 @@ CREATE TABLE public.rushing_stats (
     lng integer,
     rush_first integer,
     rush_first_pct float,
-    rush_fum integer
+    rush_fum integer,
+    CONSTRAINT rushing_stats_pkey PRIMARY KEY ("year", player)
 );
 
 --
@@ -147,7 +158,8 @@ CREATE TABLE public.receiving_stats (
     first_pct float,
     rec_fum integer,
     rec_yac_r integer,
-    tgts integer
+    tgts integer,
+    CONSTRAINT receiving_stats_pkey PRIMARY KEY ("year", player)
 );
 
 --
@@ -167,7 +179,8 @@ CREATE TABLE public.field_goal_stats (
     fifty_fiftynine_a_m varchar,
     sixty_plus_a_m varchar,
     lng integer,
-    fg_blk integer
+    fg_blk integer,
+    CONSTRAINT field_goal_stats_pkey PRIMARY KEY ("year", player)
 );
 
 --
@@ -179,47 +192,54 @@ CREATE TABLE public.passing_run (
     opponent varchar NOT NULL,
     is_home_game boolean NOT NULL,
     year integer NOT NULL,
-    passing_yards float NOT NULL
+    passing_yards float NOT NULL,
+    CONSTRAINT passing_run_pkey PRIMARY KEY ("year", name, opponent, is_home_game)
 );
 
-CREATE FUNCTION public.nfl_features()
-RETURNS TABLE(
-    age INT4,
-    experience INT4,
-    pass_attempts FLOAT4,
-    pass_completions FLOAT4,
-    pass_yards FLOAT4,
-    pass_avg FLOAT4,
-    rating FLOAT4,
-    is_home INT4,
-    is_away INT4,
-    def_avg_pass_att FLOAT4,
-    dev_avg_completions FLOAT4,
-    def_yds_att FLOAT4,
-    def_avg_sacks FLOAT4
-)
-LANGUAGE plpgsql STABLE
-AS $$
-BEGIN
-	RETURN QUERY
+--
+-- Name: etl_state; Type: TABLE; Schema: public;
+--
+
+CREATE TABLE public.etl_state (
+    category varchar NOT NULL,
+    "key" varchar NOT NULL,
+    "year" integer NOT NULL,
+    next_url varchar,
+    completed_at timestamp NOT NULL,
+    CONSTRAINT etl_state_pkey PRIMARY KEY (category, "key", "year")
+);
+
+--
+-- Name: etl_state_year_idx; Type: INDEX; Schema: public;
+--
+
+CREATE INDEX etl_state_year_idx ON public.etl_state (category, "year");
+
+--
+-- Name: nfl_feature_rows; Type: VIEW; Schema: public;
+--
+
+CREATE VIEW public.nfl_feature_rows AS
     WITH stats AS (
         SELECT
-            name,
-            opponent,
-            home,
+            "as".name,
+            "as".season,
+            "as".week,
+            "as".opponent,
+            "as".home,
             "as".pass_completions,
             "as".pass_attempts,
             "as".pass_yards,
             "as".pass_avg,
             "as".rating
-        FROM active_stats "as"
+        FROM public.active_stats "as"
         WHERE "as".pass_attempts > 0
     ), info AS (
         SELECT
             p.name,
             p.experience,
             p.age
-        FROM players p
+        FROM public.players p
         WHERE NOT (
             p.name IS NULL OR p.experience IS NULL OR p.age IS NULL
         )
@@ -227,33 +247,149 @@ BEGIN
     ), defense AS (
         SELECT
             team AS opponent,
+            "year" AS season,
             attempts::float / 17::float AS def_avg_pass_att,
             completions::float / 17::float AS def_avg_completions,
             yds_att AS def_yds_att,
             sacks::float / 17::float AS def_avg_sacks
-        FROM defense_passing_stats
-        WHERE "year" = (date_part('year', CURRENT_DATE) - 1)
+        FROM public.defense_passing_stats
     )
     SELECT
-        i.age::INT4,
-        i.experience::INT4,
-        s.pass_attempts::FLOAT4,
-        s.pass_completions::FLOAT4,
-        s.pass_yards::FLOAT4,
-        s.pass_avg::FLOAT4,
-        s.rating::FLOAT4,
+        s.name,
+        s.season,
+        s.week,
+        s.opponent,
+        i.age::INT4 AS age,
+        i.experience::INT4 AS experience,
+        s.pass_attempts::FLOAT4 AS pass_attempts,
+        s.pass_completions::FLOAT4 AS pass_completions,
+        s.pass_yards::FLOAT4 AS pass_yards,
+        s.pass_avg::FLOAT4 AS pass_avg,
+        s.rating::FLOAT4 AS rating,
         CASE WHEN s.home IS TRUE THEN 1 ELSE 0 END AS is_home,
         CASE WHEN s.home IS TRUE THEN 0 ELSE 1 END AS is_away,
-        d.def_avg_pass_att::FLOAT4,
-        d.def_avg_completions::FLOAT4,
-        d.def_yds_att::FLOAT4,
-        d.def_avg_sacks::FLOAT4
+        d.def_avg_pass_att::FLOAT4 AS def_avg_pass_att,
+        d.def_avg_completions::FLOAT4 AS dev_avg_completions,
+        d.def_yds_att::FLOAT4 AS def_yds_att,
+        d.def_avg_sacks::FLOAT4 AS def_avg_sacks
     FROM stats s
     JOIN info i USING ("name")
-    JOIN defense d USING ("opponent");
+    JOIN defense d USING ("opponent", "season");
+
+--
+-- Name: nfl_features; Type: FUNCTION; Schema: public;
+--
+
+CREATE FUNCTION public.nfl_features()
+RETURNS TABLE(
+    age INT4,
+    experience INT4,
+    pass_attempts FLOAT4,
+    pass_completions FLOAT4,
+    pass_yards FLOAT4,
+    pass_avg FLOAT4,
+    rating FLOAT4,
+    is_home INT4,
+    is_away INT4,
+    def_avg_pass_att FLOAT4,
+    dev_avg_completions FLOAT4,
+    def_yds_att FLOAT4,
+    def_avg_sacks FLOAT4
+)
+LANGUAGE plpgsql STABLE
+AS $$
+BEGIN
+	RETURN QUERY
+    SELECT
+        r.age,
+        r.experience,
+        r.pass_attempts,
+        r.pass_completions,
+        r.pass_yards,
+        r.pass_avg,
+        r.rating,
+        r.is_home,
+        r.is_away,
+        r.def_avg_pass_att,
+        r.dev_avg_completions,
+        r.def_yds_att,
+        r.def_avg_sacks
+    FROM public.nfl_feature_rows r;
 END
 $$;
 
+--
+-- Name: feature_rows; Type: TABLE; Schema: public;
+--
+
+CREATE TABLE public.feature_rows (
+    name varchar NOT NULL,
+    season integer NOT NULL,
+    week integer NOT NULL,
+    opponent varchar NOT NULL,
+    age INT4,
+    experience INT4,
+    pass_attempts FLOAT4,
+    pass_completions FLOAT4,
+    pass_yards FLOAT4,
+    pass_avg FLOAT4,
+    rating FLOAT4,
+    is_home INT4,
+    is_away INT4,
+    def_avg_pass_att FLOAT4,
+    dev_avg_completions FLOAT4,
+    def_yds_att FLOAT4,
+    def_avg_sacks FLOAT4,
+    CONSTRAINT feature_rows_pkey PRIMARY KEY (name, season, week)
+);
+
+CREATE INDEX feature_rows_opponent_idx ON public.feature_rows (opponent);
+
+--
+-- Name: feature_hashes; Type: TABLE; Schema: public;
+--
+
+CREATE TABLE public.feature_hashes (
+    entity varchar NOT NULL,
+    "key" varchar NOT NULL,
+    hash varchar NOT NULL,
+    refreshed_at timestamp NOT NULL,
+    CONSTRAINT feature_hashes_pkey PRIMARY KEY (entity, "key")
+);
+
+--
+-- Name: features; Type: VIEW; Schema: public;
+--
+
+CREATE VIEW public.features AS
+    SELECT
+        age,
+        experience,
+        pass_attempts,
+        pass_completions,
+        pass_yards,
+        pass_avg,
+        rating,
+        is_home,
+        is_away,
+        def_avg_pass_att,
+        dev_avg_completions,
+        def_yds_att,
+        def_avg_sacks
+    FROM public.feature_rows;
+
+--
+-- Name: pipeline_state; Type: TABLE; Schema: public;
+--
+
+CREATE TABLE public.pipeline_state (
+    stage varchar NOT NULL,
+    fingerprint varchar,
+    seconds double precision NOT NULL,
+    completed_at timestamp NOT NULL,
+    CONSTRAINT pipeline_state_pkey PRIMARY KEY (stage)
+);
+
 --
 -- PostgreSQL database dump complete
 --
\ No newline at end of file
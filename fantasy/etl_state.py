@@ -0,0 +1,59 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from db import EtlState
+from seasons import current_season
+
+DEFAULT_CURRENT_TTL: timedelta = timedelta(hours=12)
+
+
+@dataclass
+class Watermarks:
+    season: int
+    current_ttl: timedelta
+
+    def __init__(
+        self, season: Optional[int] = None, current_ttl: timedelta = DEFAULT_CURRENT_TTL
+    ) -> None:
+        self.season = current_season() if season is None else season
+        self.current_ttl = current_ttl
+
+    def is_final(self, year: int) -> bool:
+        return year < self.season
+
+    def is_fresh(self, state: EtlState) -> bool:
+        # finished seasons never change, the current one is refetched once its units go stale
+        return self.is_final(state.year) or state.completed_at >= datetime.now() - self.current_ttl
+
+    def is_done(self, category: str, key: str, year: int) -> bool:
+        state = EtlState.get_or_none(
+            (EtlState.category == category) & (EtlState.key == key) & (EtlState.year == year)
+        )
+        return state is not None and self.is_fresh(state)
+
+    def resume_point(self, category: str, year: int) -> Tuple[int, Optional[str], bool]:
+        query = EtlState.select().where(EtlState.category == category).where(EtlState.year == year)
+        pages = {int(state.key): state for state in query if self.is_fresh(state)}
+
+        page = 0
+        while page in pages:
+            page += 1
+        if page == 0:
+            return 0, None, False
+
+        last = pages[page - 1]
+        if last.next_url is None:
+            logging.info(f"Skipping NFL {year} {category}, all {page} pages already loaded")
+            return page, None, True
+        logging.info(f"Resuming NFL {year} {category} at page {page}")
+        return page, last.next_url, False
+
+    def complete(self, category: str, key: str, year: int, next_url: Optional[str] = None) -> None:
+        EtlState.insert(
+            category=category, key=key, year=year, next_url=next_url, completed_at=datetime.now()
+        ).on_conflict(
+            conflict_target=[EtlState.category, EtlState.key, EtlState.year],
+            preserve=[EtlState.next_url, EtlState.completed_at],
+        ).execute()
@@ -1,14 +1,30 @@
-from daos import Dao
-from nfl import NFLStatsEtl
+from typing import TYPE_CHECKING, Any
 
+if TYPE_CHECKING:
+    from daos import Dao
+    from nfl import NFLStatsEtl
+    from predict import PassingPredictor
 
+
+# imports are deferred so a predict or train run never loads the scraping stack
 class MainFactory:
-    def nfl_etl(self) -> NFLStatsEtl:
-        return NFLStatsEtl()
+    def nfl_etl(self, **kwargs: Any) -> "NFLStatsEtl":
+        from nfl import NFLStatsEtl
+
+        return NFLStatsEtl(**kwargs)
+
+    def dao(self) -> "Dao":
+        from daos import Dao
 
-    def dao(self) -> Dao:
         return Dao()
 
+    def predictor(self, backend: str = "pgml") -> "PassingPredictor":
+        from backends import make_backend
+        from predict import PassingPredictor
+
+        dao = self.dao()
+        return PassingPredictor(dao, make_backend(backend, dao))
+
 
 def main_factory() -> MainFactory:
     return MainFactory()
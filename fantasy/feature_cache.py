@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, Final, Literal, Mapping, Optional, Tuple, Union
+
+DEFAULT_MAX_ENTRIES: int = 4096
+# loads in other processes, e.g. the nightly ETL while a prediction server runs, can't invalidate this
+# process's cache, entries older than this are reloaded
+DEFAULT_TTL: float = 15 * 60
+
+PLAYER: str = "player"
+DEFENSE: str = "defense"
+INFO: str = "info"
+
+# tables whose writes make cached features of an entity stale
+TABLE_ENTITIES: Dict[str, Tuple[str, ...]] = {
+    "players": (INFO,),
+    "active_stats": (PLAYER,),
+    "passing_stats": (PLAYER,),
+    "defense_passing_stats": (DEFENSE,),
+}
+
+
+class Missing(Enum):
+    MISSING = "missing"
+
+
+# cached for a name its load found no rows for, until the table is written or the entry expires,
+# so lookups of unknown players and teams don't go back to the database every time
+MISSING: Final = Missing.MISSING
+
+Key = Tuple[str, str, int]
+Features = Union[Dict[str, Any], Literal[Missing.MISSING]]
+
+
+class FeatureCache:
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: Optional[float] = DEFAULT_TTL
+    ) -> None:
+        # a ttl of None keeps entries until their tables are written in this process
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # key -> (monotonic time it was loaded, features)
+        self.entries: "OrderedDict[Key, Tuple[float, Features]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, entity: str, name: str, year: int) -> Optional[Features]:
+        key = (entity, name, year)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put_all(self, entity: str, year: int, features: Mapping[str, Features]) -> None:
+        loaded_at = time.monotonic()
+        with self.lock:
+            for name, values in features.items():
+                key = (entity, name, year)
+                self.entries[key] = (loaded_at, values)
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def put_missing(self, entity: str, year: int, name: str) -> None:
+        self.put_all(entity, year, {name: MISSING})
+
+    def invalidate(self, table: str) -> None:
+        entities = TABLE_ENTITIES.get(table, ())
+        if not entities:
+            return
+        with self.lock:
+            for key in [key for key in self.entries if key[0] in entities]:
+                del self.entries[key]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+feature_cache = FeatureCache()
@@ -0,0 +1,100 @@
+import logging
+from dataclasses import dataclass
+
+from db import db
+
+PLAYER: str = "player"
+TEAM: str = "team"
+
+
+@dataclass
+class RefreshResult:
+    players: int = 0
+    teams: int = 0
+    deleted: int = 0
+    inserted: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.players > 0 or self.teams > 0
+
+
+class FeatureStore:
+    def refresh(self) -> RefreshResult:
+        result = RefreshResult()
+        with db.atomic():
+            # a QB's features depend on its player row and game logs, an opponent's on its defense rows,
+            # every game is paired with the defense of its own season
+            db.execute_sql(
+                sql="""
+                    CREATE TEMP TABLE feature_changes ON COMMIT DROP AS
+                    WITH current AS (
+                        SELECT
+                            %(player)s::VARCHAR AS entity,
+                            p.name AS "key",
+                            md5(
+                                p.age::TEXT || ':' || p.experience::TEXT || ':'
+                                || coalesce(string_agg(a::TEXT, ',' ORDER BY a.season, a.week), '')
+                            ) AS hash
+                        FROM public.players p
+                        LEFT JOIN public.active_stats a USING (name)
+                        WHERE p.position = 'QB' AND p.age IS NOT NULL AND p.experience IS NOT NULL
+                        GROUP BY p.name, p.age, p.experience
+                        UNION ALL
+                        SELECT %(team)s::VARCHAR, d.team, md5(string_agg(d::TEXT, ',' ORDER BY d.year))
+                        FROM public.defense_passing_stats d
+                        GROUP BY d.team
+                    )
+                    SELECT
+                        coalesce(c.entity, h.entity) AS entity,
+                        coalesce(c.key, h.key) AS "key",
+                        c.hash
+                    FROM current c
+                    FULL JOIN public.feature_hashes h ON h.entity = c.entity AND h.key = c.key
+                    WHERE c.hash IS DISTINCT FROM h.hash
+                """,
+                params={"player": PLAYER, "team": TEAM},
+            )
+            query = "SELECT entity, count(*) FROM feature_changes GROUP BY entity"
+            with db.execute_sql(sql=query) as cursor:
+                counts = dict(cursor.fetchall())
+            result.players = counts.get(PLAYER, 0)
+            result.teams = counts.get(TEAM, 0)
+            if not result.changed:
+                logging.info("Feature store is up to date")
+                return result
+
+            with db.execute_sql(
+                sql="""
+                    DELETE FROM public.feature_rows f
+                    USING feature_changes c
+                    WHERE (c.entity = %(player)s AND f.name = c.key)
+                    OR (c.entity = %(team)s AND f.opponent = c.key)
+                """,
+                params={"player": PLAYER, "team": TEAM},
+            ) as cursor:
+                result.deleted = cursor.rowcount
+            with db.execute_sql(
+                sql="""
+                    INSERT INTO public.feature_rows
+                    SELECT r.* FROM public.nfl_feature_rows r
+                    WHERE r.name IN (SELECT "key" FROM feature_changes WHERE entity = %(player)s)
+                    OR r.opponent IN (SELECT "key" FROM feature_changes WHERE entity = %(team)s)
+                """,
+                params={"player": PLAYER, "team": TEAM},
+            ) as cursor:
+                result.inserted = cursor.rowcount
+            db.execute_sql(sql="""
+                    DELETE FROM public.feature_hashes h
+                    USING feature_changes c
+                    WHERE h.entity = c.entity AND h.key = c.key;
+
+                    INSERT INTO public.feature_hashes (entity, "key", hash, refreshed_at)
+                    SELECT entity, "key", hash, now() FROM feature_changes WHERE hash IS NOT NULL;
+                """)
+
+        logging.info(
+            f"Refreshed features for {result.players} players and {result.teams} teams, "
+            f"{result.deleted} rows removed, {result.inserted} rows written"
+        )
+        return result
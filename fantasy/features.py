@@ -0,0 +1,170 @@
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from columns import INT_COLUMNS, PREDICTION_COLUMNS, PREDICTION_KEYS, TRAINING_COLUMNS
+from daos import NUM_GAMES
+from db import ActiveStats, DefensePassingStats, PassingStats, PlayerInfo
+from seasons import last_completed_season
+
+
+def to_matrix(frame: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    return np.ascontiguousarray(frame[columns].to_numpy(dtype=np.float32))
+
+
+def cast_columns(frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    # mirror the INT4 / FLOAT4 casts done in SQL
+    types = {column: np.int32 if column in INT_COLUMNS else np.float32 for column in columns}
+    return frame.astype(types)
+
+
+@dataclass
+class FeatureBuilder:
+    active: pd.DataFrame
+    players: pd.DataFrame
+    defense: pd.DataFrame
+    passing: pd.DataFrame
+
+    @classmethod
+    def load(cls, years: Optional[List[int]] = None) -> "FeatureBuilder":
+        defense = DefensePassingStats.select(
+            DefensePassingStats.team,
+            DefensePassingStats.year,
+            DefensePassingStats.attempts,
+            DefensePassingStats.completions,
+            DefensePassingStats.yds_att,
+            DefensePassingStats.sacks,
+        )
+        passing = PassingStats.select(PassingStats.player, PassingStats.year, PassingStats.rate)
+        active = ActiveStats.select(
+            ActiveStats.name,
+            ActiveStats.season,
+            ActiveStats.opponent,
+            ActiveStats.home,
+            ActiveStats.pass_completions,
+            ActiveStats.pass_attempts,
+            ActiveStats.pass_yards,
+            ActiveStats.pass_avg,
+            ActiveStats.rating,
+        )
+        if years is not None:
+            defense = defense.where(DefensePassingStats.year.in_(years))
+            passing = passing.where(PassingStats.year.in_(years))
+            active = active.where(ActiveStats.season.in_(years))
+
+        builder = cls(
+            active=pd.DataFrame.from_records(
+                list(active.dicts()),
+                columns=[
+                    "name",
+                    "season",
+                    "opponent",
+                    "home",
+                    "pass_completions",
+                    "pass_attempts",
+                    "pass_yards",
+                    "pass_avg",
+                    "rating",
+                ],
+            ),
+            players=pd.DataFrame.from_records(
+                list(
+                    PlayerInfo.select(
+                        PlayerInfo.name,
+                        PlayerInfo.position,
+                        PlayerInfo.active,
+                        PlayerInfo.experience,
+                        PlayerInfo.age,
+                    ).dicts()
+                ),
+                columns=["name", "position", "active", "experience", "age"],
+            ),
+            defense=pd.DataFrame.from_records(
+                list(defense.dicts()),
+                columns=["team", "year", "attempts", "completions", "yds_att", "sacks"],
+            ),
+            passing=pd.DataFrame.from_records(list(passing.dicts()), columns=["player", "year", "rate"]),
+        )
+        logging.info(
+            f"Loaded {len(builder.active)} game logs, {len(builder.players)} players and "
+            f"{len(builder.defense)} defenses for feature building"
+        )
+        return builder
+
+    def defense_averages(self, year: Optional[int] = None) -> pd.DataFrame:
+        defense = self.defense if year is None else self.defense[self.defense["year"] == year]
+        return pd.DataFrame(
+            {
+                "opponent": defense["team"],
+                "season": defense["year"],
+                "avg_pass_att_against": defense["attempts"].astype(float) / NUM_GAMES,
+                "avg_completions_against": defense["completions"].astype(float) / NUM_GAMES,
+                "avg_yds_att_against": defense["yds_att"].astype(float),
+                "avg_sacks": defense["sacks"].astype(float) / NUM_GAMES,
+            }
+        )
+
+    def training_frame(self) -> pd.DataFrame:
+        stats = self.active[self.active["pass_attempts"] > 0]
+        info = self.players[self.players["position"] == "QB"]
+        info = info.dropna(subset=["name", "experience", "age"])
+        # every game is paired with the defense of its own season
+        defense = self.defense_averages().rename(
+            columns={
+                "avg_pass_att_against": "def_avg_pass_att",
+                "avg_completions_against": "dev_avg_completions",
+                "avg_yds_att_against": "def_yds_att",
+                "avg_sacks": "def_avg_sacks",
+            }
+        )
+
+        frame = stats.merge(info[["name", "experience", "age"]], on="name").merge(
+            defense, on=["opponent", "season"]
+        )
+        home = frame["home"].fillna(False).astype(bool)
+        frame["is_home"] = home.astype(int)
+        frame["is_away"] = (~home).astype(int)
+        return cast_columns(frame[TRAINING_COLUMNS].reset_index(drop=True), TRAINING_COLUMNS)
+
+    def prediction_frame(self, year: int) -> pd.DataFrame:
+        diff = last_completed_season() - year
+        qbs = self.players[(self.players["position"] == "QB") & self.players["active"].fillna(False)]
+        info = qbs.drop_duplicates("name")[["name", "age", "experience"]].assign(
+            age=lambda df: df["age"] - diff, experience=lambda df: df["experience"] - diff
+        )
+        active = (
+            self.active[self.active["season"] == year]
+            .groupby("name")[["pass_attempts", "pass_completions", "pass_avg"]]
+            .mean()
+            .reset_index()
+        )
+        passing = self.passing[self.passing["year"] == year]
+        rating = passing.drop_duplicates("player")[["player", "rate"]].rename(
+            columns={"player": "name", "rate": "rating"}
+        )
+        home = pd.DataFrame({"is_home_game": [True, False]})
+
+        frame = (
+            info.merge(active, on="name")
+            .merge(rating, on="name")
+            .merge(self.defense_averages(year), how="cross")
+            .merge(home, how="cross")
+        )
+        frame["is_home"] = frame["is_home_game"].astype(int)
+        frame["is_away"] = (~frame["is_home_game"]).astype(int)
+        frame = frame[PREDICTION_KEYS + PREDICTION_COLUMNS].reset_index(drop=True)
+        return cast_columns(frame, PREDICTION_COLUMNS)
+
+    def training_matrix(self) -> np.ndarray:
+        return to_matrix(self.training_frame(), TRAINING_COLUMNS)
+
+    def prediction_matrix(self, year: int) -> np.ndarray:
+        return to_matrix(self.prediction_frame(year), PREDICTION_COLUMNS)
+
+
+def write_parquet(frame: pd.DataFrame, path: str) -> None:
+    # needs pyarrow or fastparquet installed alongside pandas
+    frame.to_parquet(path, index=False)
+    logging.info(f"Wrote {len(frame)} feature rows to {path}")
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from http_cache import CachedResponse, CacheMissError, ResponseCache, classify
+from metrics import metrics
+from requests.adapters import HTTPAdapter
+
+DEFAULT_MAX_PER_HOST: int = 8
+DEFAULT_REQUESTS_PER_SECOND: float = 10.0
+
+
+class RateLimiter:
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class Fetcher:
+    max_per_host: int
+    session: requests.Session
+    cache: Optional[ResponseCache]
+    requests_per_second: Optional[float]
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        cache: Optional[ResponseCache] = None,
+        requests_per_second: Optional[float] = None,
+    ) -> None:
+        self.max_per_host = max_per_host
+        self.cache = cache
+        self.requests_per_second = requests_per_second
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_per_host, pool_maxsize=max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_per_host, thread_name_prefix="fetch")
+        self.host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self.host_rates: Dict[str, RateLimiter] = {}
+        self.lock = threading.Lock()
+
+    def host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+                if self.requests_per_second is not None:
+                    self.host_rates[host] = RateLimiter(self.requests_per_second)
+            limit, rate = self.host_limits[host], self.host_rates.get(host)
+        if rate is not None:
+            rate.acquire()
+        return limit
+
+    def request(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        page, season = classify(url)
+        with self.host_limit(url):
+            with metrics.timer("nfl_request_seconds", page=page, season=season):
+                resp = self.session.get(url, headers=headers)
+        source = "revalidated" if resp.status_code == 304 else "network"
+        metrics.inc("nfl_requests_total", page=page, season=season, source=source)
+        metrics.inc("nfl_response_bytes_total", len(resp.content), page=page, season=season)
+        return resp
+
+    def get(self, url: str) -> str:
+        if self.cache is None:
+            resp = self.request(url, {})
+            assert resp.ok, f"Request error: {resp.status_code!r} - {resp.content!r}"
+            return resp.text
+
+        entry: Optional[CachedResponse] = self.cache.load(url)
+        if entry is not None and (self.cache.cache_only or self.cache.is_fresh(entry)):
+            page, season = classify(url)
+            metrics.inc("nfl_requests_total", page=page, season=season, source="cache")
+            body: str = entry.body
+            return body
+        if self.cache.cache_only:
+            raise CacheMissError(f"No cached response for: {url}")
+
+        resp = self.request(url, self.cache.validators(entry))
+        if resp.status_code == 304 and entry is not None:
+            self.cache.touch(entry)
+            body = entry.body
+            return body
+        assert resp.ok, f"Request error: {resp.status_code!r} - {resp.content!r}"
+        self.cache.store(url, resp.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return resp.text
+
+    def get_all(self, urls: Iterable[str]) -> List[str]:
+        urls = list(urls)
+        logging.debug(f"Fetching {len(urls)} pages with up to {self.max_per_host} per host")
+        return list(self.executor.map(self.get, urls))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.session.close()
@@ -0,0 +1,65 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Set, Tuple
+
+from db import ActiveStats, db
+from loader import Loader
+from records import Records
+
+
+@dataclass
+class GameLogStore:
+    latest: Dict[str, Tuple[int, int]]
+    partitions: Set[int]
+    loaded: bool
+
+    def __init__(self) -> None:
+        self.latest = {}
+        self.partitions = set()
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        # the latest (season, week) loaded for every player, one index scan per season partition
+        query = """
+            SELECT DISTINCT ON (name) name, season, week
+            FROM public.active_stats
+            ORDER BY name, season DESC, week DESC
+        """
+        with db.execute_sql(sql=query) as cursor:
+            rows = cursor.fetchall()
+        with self.lock:
+            self.latest = {name: (season, week) for name, season, week in rows}
+            self.loaded = True
+        logging.info(f"Loaded the latest game log week of {len(rows)} players")
+
+    def ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    def latest_week(self, name: str, season: int) -> int:
+        # 0 when nothing of the season is loaded yet, so every week of it is new
+        self.ensure_loaded()
+        with self.lock:
+            loaded_season, week = self.latest.get(name, (season, 0))
+        return week if loaded_season == season else 0
+
+    def ensure_partition(self, season: int) -> None:
+        with self.lock:
+            if season not in self.partitions:
+                ActiveStats.ensure_partition(season)
+                self.partitions.add(season)
+
+    def append(self, loader: Loader, name: str, season: int, stats: Records) -> int:
+        # weeks up to the latest loaded one are already stored, only later games are written
+        latest = self.latest_week(name, season)
+        new = stats.take([i for i, week in enumerate(stats.column("week")) if week > latest])
+        if not len(new):
+            return 0
+        self.ensure_partition(season)
+        loader.load(ActiveStats, new)
+        with self.lock:
+            self.latest[name] = (season, max(new.column("week")))
+        logging.info(f"Appended {len(new)} games of {name} after {season} week {latest}")
+        return len(new)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from seasons import current_season
+
+DEFAULT_CACHE_DIR: str = os.path.join(os.path.expanduser("~"), ".cache", "fantasy-ml", "http")
+DEFAULT_PLAYER_TTL: float = 24 * 60 * 60
+
+LISTING_URL = re.compile(r"/stats/(?:player|team)-stats/.*?/(\d{4})/")
+# player urls end in a slash and the scraper appends "/stats/", so real game log urls hold "//stats/"
+GAMELOG_URL = re.compile(r"/players/[^/]+/+stats/")
+PLAYER_URL = re.compile(r"/players/[^/]+/?$")
+
+
+def classify(url: str) -> Tuple[str, Optional[int]]:
+    listing = LISTING_URL.search(url)
+    if listing is not None:
+        return "listing", int(listing.group(1))
+    if GAMELOG_URL.search(url) is not None:
+        return "gamelog", None
+    if PLAYER_URL.search(url) is not None:
+        return "player", None
+    return "other", None
+
+
+class CacheMissError(Exception):
+    pass
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+@dataclass
+class ResponseCache:
+    directory: Path
+    cache_only: bool
+    player_ttl: float
+    season: int
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        cache_only: bool = False,
+        player_ttl: float = DEFAULT_PLAYER_TTL,
+        season: Optional[int] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.cache_only = cache_only
+        self.player_ttl = player_ttl
+        self.season = current_season() if season is None else season
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, url: str) -> Path:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.directory / key[:2] / (key + ".json")
+
+    def ttl(self, url: str) -> Optional[float]:
+        # None never expires, 0 always revalidates
+        page, season = classify(url)
+        if page == "listing":
+            return None if season is not None and season < self.season else 0
+        if page == "player":
+            return self.player_ttl
+        return 0
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        ttl = self.ttl(entry.url)
+        return ttl is None or time.time() - entry.fetched_at < ttl
+
+    def load(self, url: str) -> Optional[CachedResponse]:
+        path = self.path(url)
+        if not path.exists():
+            return None
+        with path.open(encoding="utf-8") as f:
+            return CachedResponse(**json.load(f))
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.write(CachedResponse(url, body, etag, last_modified, time.time()))
+
+    def touch(self, entry: CachedResponse) -> None:
+        entry.fetched_at = time.time()
+        self.write(entry)
+
+    def write(self, entry: CachedResponse) -> None:
+        path = self.path(entry.url)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(asdict(entry), f)
+        os.replace(tmp, path)
+
+    def validators(self, entry: Optional[CachedResponse]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+        if headers:
+            logging.debug(f"Revalidating cached response for: {entry.url}")
+        return headers
@@ -0,0 +1,164 @@
+import csv
+import io
+import logging
+from dataclasses import dataclass
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from db import db
+from feature_cache import feature_cache
+from peewee import CompositeKey, Field, Model
+from records import Records
+
+DEFAULT_CHUNK_SIZE: int = 1000
+DEFAULT_COPY_CHUNK_SIZE: int = 50000
+COPY_NULL: str = "\\N"
+
+Rows = Union[Records, Iterable[Model]]
+# one row's values in the model's field order
+Row = Tuple[Any, ...]
+T = TypeVar("T")
+
+
+class Loader(Protocol):
+    def load(self, model: Type[Model], rows: Rows) -> int: ...
+
+
+def key_names(model: Type[Model]) -> List[str]:
+    # the conflict target of the upserts
+    primary_key = model._meta.primary_key
+    assert isinstance(primary_key, CompositeKey), f"{model.__name__} has no composite primary key"
+    return list(primary_key.field_names)
+
+
+def key_fields(model: Type[Model]) -> List[Field]:
+    return [model._meta.fields[name] for name in key_names(model)]
+
+
+def update_fields(model: Type[Model]) -> List[Field]:
+    keys = key_names(model)
+    return [field for field in model._meta.sorted_fields if field.name not in keys]
+
+
+def chunks(rows: Iterable[T], size: int) -> Iterator[List[T]]:
+    # peewee's chunked pads every chunk to full size first, a 25 row page paid for 1000
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def row_values(model: Type[Model], rows: Rows) -> Iterator[Row]:
+    # records already are value tuples in field order, model instances are unpacked
+    if isinstance(rows, Records):
+        assert rows.model is model, f"Can't load {rows.model.__name__} records into {model.__name__}"
+        return iter(rows)
+    names = [field.name for field in model._meta.sorted_fields]
+    return (tuple(row.__data__.get(name) for name in names) for row in rows)
+
+
+def unique_values(model: Type[Model], values: List[Row]) -> List[Row]:
+    # postgres refuses to update the same row twice in one statement, last one wins
+    names = [field.name for field in model._meta.sorted_fields]
+    keys = [names.index(key) for key in key_names(model)]
+    unique: Dict[Row, Row] = {tuple(row[i] for i in keys): row for row in values}
+    return list(unique.values())
+
+
+@dataclass
+class UpsertLoader:
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    def load(self, model: Type[Model], rows: Rows) -> int:
+        keys = key_fields(model)
+        fields = model._meta.sorted_fields
+        updates = update_fields(model)
+
+        total = 0
+        for chunk in chunks(row_values(model, rows), self.chunk_size):
+            values = unique_values(model, chunk)
+            with db.atomic():
+                model.insert_many(values, fields=fields).on_conflict(
+                    conflict_target=keys, preserve=updates
+                ).as_rowcount().execute()
+            total += len(values)
+
+        feature_cache.invalidate(model._meta.table_name)
+        logging.info(f"Upserted {total} rows into {model._meta.table_name}")
+        return total
+
+
+@dataclass
+class CopyLoader:
+    chunk_size: int = DEFAULT_COPY_CHUNK_SIZE
+
+    def load(self, model: Type[Model], rows: Rows) -> int:
+        table = model._meta.table_name
+        staging = table + "_staging"
+        fields = model._meta.sorted_fields
+        columns = ", ".join(f'"{field.column_name}"' for field in fields)
+        keys = ", ".join(f'"{field.column_name}"' for field in key_fields(model))
+        updates = ", ".join(
+            f'"{field.column_name}" = EXCLUDED."{field.column_name}"' for field in update_fields(model)
+        )
+
+        total = 0
+        for chunk in chunks(row_values(model, rows), self.chunk_size):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for values in unique_values(model, chunk):
+                writer.writerow(
+                    COPY_NULL if value is None else field.db_value(value)
+                    for field, value in zip(fields, values)
+                )
+                total += 1
+            buffer.seek(0)
+
+            with db.atomic():
+                cursor = db.cursor()
+                cursor.execute(
+                    f'CREATE TEMP TABLE IF NOT EXISTS "{staging}" (LIKE "{table}") ON COMMIT DELETE ROWS'
+                )
+                cursor.copy_expert(
+                    f"COPY \"{staging}\" ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                    buffer,
+                )
+                cursor.execute(
+                    f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "{staging}" '
+                    f"ON CONFLICT ({keys}) DO UPDATE SET {updates}"
+                )
+                # inside a caller's transaction this is a savepoint and the commit that empties the
+                # staging table is still to come, the next chunk must not merge these rows again
+                cursor.execute(f'TRUNCATE "{staging}"')
+
+        feature_cache.invalidate(table)
+        logging.info(f"Copied {total} rows into {table}")
+        return total
+
+
+class LoaderFactory(Protocol):
+    # a loader class, its chunk size defaults to the one that suits it
+    def __call__(self, chunk_size: int = ...) -> Loader: ...
+
+
+LOADERS: Dict[str, LoaderFactory] = {"upsert": UpsertLoader, "copy": CopyLoader}
+
+
+def make_loader(name: str, chunk_size: Optional[int] = None) -> Loader:
+    assert name in LOADERS, f"Unknown loader: {name!r}, expected one of {sorted(LOADERS)}"
+    factory = LOADERS[name]
+    return factory() if chunk_size is None else factory(chunk_size)
@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_METRICS_DIR: str = os.path.join(os.path.expanduser("~"), ".cache", "fantasy-ml", "metrics")
+
+SECONDS_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+HELP: Dict[str, str] = {
+    "nfl_requests_total": "Pages requested, by where the body came from",
+    "nfl_request_seconds": "HTTP request latency",
+    "nfl_response_bytes_total": "Response body bytes downloaded",
+    "nfl_parse_seconds": "HTML parse time per page",
+    "nfl_rows_total": "Rows emitted by the parsers",
+    "nfl_db_write_seconds": "Time spent writing rows to the database",
+    "predict_requests_total": "Prediction requests served, by HTTP status",
+    "predict_request_seconds": "Prediction request latency, queueing included",
+    "predict_batches_total": "Batched scoring calls",
+    "predict_batch_rows_total": "Matchups scored across all batches",
+    "predict_score_seconds": "Time spent in one batched scoring call",
+    "pipeline_stages_total": "Pipeline stages, by whether they ran or were skipped",
+    "pipeline_stage_seconds": "Time spent in a pipeline stage, fingerprinting included",
+}
+
+
+def make_labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, "" if value is None else str(value)) for key, value in labels.items()))
+
+
+def format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+@dataclass
+class Histogram:
+    buckets: Tuple[float, ...] = SECONDS_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        # upper bound of the bucket holding the quantile, None when it falls past the last bucket
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+
+class Metrics:
+    def __init__(self, buckets: Optional[Dict[str, Tuple[float, ...]]] = None) -> None:
+        self.lock = threading.Lock()
+        self.buckets = buckets or {}
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.started_at = time.time()
+            self.counters: Dict[str, Dict[Labels, float]] = {}
+            self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = make_labels(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = make_labels(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(self.buckets.get(name, SECONDS_BUCKETS))
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            for name, counters in sorted(self.counters.items()):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+                for labels, value in sorted(counters.items()):
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+            for name, histograms in sorted(self.histograms.items()):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                for labels, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket{format_labels(labels, (('le', f'{bound:g}'),))} {cumulative}"
+                        )
+                    lines.append(
+                        f"{name}_bucket{format_labels(labels, (('le', '+Inf'),))} {histogram.count}"
+                    )
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram.total:g}")
+                    lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            duration = time.time() - self.started_at
+            rows = self.counters.get("nfl_rows_total", {})
+            writes = self.histograms.get("nfl_db_write_seconds", {})
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": duration,
+                "rows_per_second": sum(rows.values()) / duration if duration > 0 else 0.0,
+                "counters": {
+                    name: [
+                        {"labels": dict(labels), "value": value}
+                        for labels, value in sorted(series.items())
+                    ]
+                    for name, series in sorted(self.counters.items())
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(labels),
+                            "count": histogram.count,
+                            "sum": histogram.total,
+                            "p50": histogram.quantile(0.5),
+                            "p99": histogram.quantile(0.99),
+                        }
+                        for labels, histogram in sorted(series.items())
+                    ]
+                    for name, series in sorted(self.histograms.items())
+                },
+                "db_rows_per_second": [
+                    {"labels": dict(labels), "value": rows.get(labels, 0) / histogram.total}
+                    for labels, histogram in sorted(writes.items())
+                    if histogram.total > 0
+                ],
+            }
+
+    def write(self, directory: str, name: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, name + ".prom"), "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        with open(os.path.join(directory, name + "_summary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+metrics = Metrics()
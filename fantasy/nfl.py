@@ -1,8 +1,19 @@
 import logging
 import sys
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 
+from categories import CATEGORIES, PLAYER, StatCategory
+from db import db
+from etl_state import Watermarks
+from fetcher import DEFAULT_MAX_PER_HOST, DEFAULT_REQUESTS_PER_SECOND, Fetcher
+from http_cache import DEFAULT_CACHE_DIR, ResponseCache
+from loader import Loader, make_loader
+from metrics import DEFAULT_METRICS_DIR, metrics
+from parsing import DEFAULT_PARSE_WORKERS, PageParser
 from player_info import PlayerService
+from player_queue import DEFAULT_WORKERS, PlayerQueue
 from season_stats import SeasonStatsService
 from team_stats import TeamService
 
@@ -14,20 +25,117 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_MAX_JOBS: int = 4
+DEFAULT_ROOT_URL: str = "https://www.nfl.com"
+
+
+@dataclass(order=True, frozen=True)
+class Job:
+    priority: Tuple[int, int]
+    year: int = field(compare=False)
+    category: StatCategory = field(compare=False)
+
+
 @dataclass
 class NFLStatsEtl:
+    fetcher: Fetcher
+    loader: Loader
+    watermarks: Watermarks
+    players: PlayerQueue
     season_stats: SeasonStatsService
     team_stats: TeamService
-    root_url: str = "https://www.nfl.com"
+    root_url: str
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        cache_only: bool = False,
+        loader: str = "upsert",
+        chunk_size: Optional[int] = None,
+        detail_workers: int = DEFAULT_WORKERS,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+        metrics_dir: Optional[str] = DEFAULT_METRICS_DIR,
+        root_url: str = DEFAULT_ROOT_URL,
+        parse_workers: int = DEFAULT_PARSE_WORKERS,
+    ) -> None:
+        self.root_url = root_url
+        cache = None if cache_dir is None else ResponseCache(cache_dir, cache_only)
+        self.fetcher = Fetcher(max_per_host, cache, requests_per_second)
+        self.max_jobs = max_jobs
+        self.metrics_dir = metrics_dir
+        self.loader = make_loader(loader, chunk_size)
+        self.watermarks = Watermarks()
+        # the fetch threads are the I/O stage, the parser's worker processes the CPU stage; every
+        # service shares this one pool and run() shuts it down
+        self.parser = PageParser(parse_workers)
+        self.player_info = PlayerService(
+            self.root_url, self.fetcher, self.parser, self.loader, watermarks=self.watermarks
+        )
+        self.players = PlayerQueue(self.player_info, detail_workers)
+        self.season_stats = SeasonStatsService(
+            self.root_url, self.fetcher, self.players, self.loader, self.watermarks, self.parser
+        )
+        self.team_stats = TeamService(
+            self.root_url, self.fetcher, self.loader, self.watermarks, self.parser
+        )
+
+    def jobs(self, start_yr: int, end_yr: int, categories: Optional[List[str]] = None) -> List[Job]:
+        # the current season goes first, then the most recent seasons
+        return sorted(
+            Job((0 if year >= self.watermarks.season else 1, -year), year, category)
+            for year in range(start_yr, end_yr)
+            for category in CATEGORIES.values()
+            if categories is None or category.key in categories
+        )
+
+    def run_job(self, job: Job) -> None:
+        # hand the pooled connection back when the job thread is done with it
+        with db.connection_context():
+            if job.category.side == PLAYER:
+                self.season_stats.run_category(job.category, job.year)
+            else:
+                self.team_stats.run_category(job.category, job.year)
+
+    def run(
+        self,
+        start_yr: int,
+        end_yr: int,
+        categories: Optional[List[str]] = None,
+        gamelogs: bool = False,
+    ) -> None:
+        metrics.reset()
+        self.player_info.index.load()
+        jobs = self.jobs(start_yr, end_yr, categories)
+        logging.info(f"Scheduling {len(jobs)} jobs with up to {self.max_jobs} running at once")
 
-    def __init__(self) -> None:
-        self.season_stats = SeasonStatsService(self.root_url)
-        self.player_info = PlayerService(self.root_url)
-        self.team_stats = TeamService(self.root_url)
+        failed: List[Job] = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="job") as pool:
+                futures = {pool.submit(self.run_job, job): job for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        future.result()
+                    except Exception:
+                        logging.exception(f"Failed NFL {job.year} {job.category.key}")
+                        failed.append(job)
+            if gamelogs:
+                self.player_info.refresh_gamelogs()
+        finally:
+            self.players.close()
+            self.parser.close()
+            if self.metrics_dir is not None:
+                metrics.write(self.metrics_dir, "nfl_etl")
+                logging.info(f"Wrote scrape metrics to {self.metrics_dir}")
+        assert not failed, f"{len(failed)} of {len(jobs)} jobs failed: " + ", ".join(
+            f"{job.year} {job.category.key}" for job in failed
+        )
 
-    def run(self, start_yr: int, end_yr: int) -> None:
-        self.season_stats.run_pass(start_yr, end_yr)
-        self.team_stats.run_pass(start_yr, end_yr)
+    def refresh(self) -> None:
+        season = self.watermarks.season
+        self.run(season, season + 1, gamelogs=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import lxml.html
+from tables import Schema, Table, extract_table
+
+CORES: int = os.cpu_count() or 1
+# with a single core, shipping pages to another process only adds the pickling
+DEFAULT_PARSE_WORKERS: int = CORES if CORES > 1 else 0
+
+# class token of each player page element that is read, -> the key it is stored under
+PLAYER_FIELDS: Dict[str, str] = {
+    "nfl-c-player-header__title": "name",
+    "nfl-c-player-header__position": "position",
+    "nfl-c-player-header__roster-status--act": "status",
+    "nfl-c-player-header__team": "team",
+    "nfl-c-player-info__key": "key",
+    "nfl-c-player-info__value": "value",
+}
+
+TEAM_LINK = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' nfl-o-cta--link ')]"
+
+
+def to_inches(text: str) -> int:
+    feet, inches = text.split("-")
+    return int(feet) * 12 + int(inches)
+
+
+def to_fraction(text: str) -> float:
+    # e.g. "32 3/4"
+    parts = text.split(" ")
+    if len(parts) > 1:
+        numerator, denominator = parts[1].split("/")
+        return float(parts[0]) + float(numerator) / float(denominator)
+    return float(parts[0])
+
+
+def parse_player_page(html: str) -> Dict[str, Any]:
+    # one walk over the document instead of a find per field, no database or network access so it can run
+    # in a worker process
+    header: Dict[str, str] = {}
+    info: Dict[str, str] = {}
+    key = None
+    for element in lxml.html.fromstring(html).iter("h1", "h3", "span", "div"):
+        classes = element.get("class")
+        if not classes:
+            continue
+        for token in classes.split():
+            field = PLAYER_FIELDS.get(token)
+            if field == "key":
+                key = element.text_content()
+            elif field == "value":
+                if key is not None:
+                    info[key] = element.text_content()
+                key = None
+            elif field == "team":
+                links = element.xpath(TEAM_LINK)
+                if links:
+                    header.setdefault("team", links[0].text_content())
+            elif field is not None:
+                header.setdefault(field, element.text_content())
+
+    assert "name" in header, "No player name on the page"
+    active = header.get("status") == "active"
+    values = {name: value for name, value in info.items() if value != ""}
+    return {
+        "name": header["name"],
+        "position": header.get("position", "").replace(" ", ""),
+        "active": active,
+        "team": header.get("team") if active else None,
+        "height": to_inches(values["Height"]) if "Height" in values else None,
+        "weight": int(values["Weight"]) if "Weight" in values else None,
+        "arms": to_fraction(values["Arms"]) if "Arms" in values else None,
+        "hands": to_fraction(values["Hands"]) if "Hands" in values else None,
+        "experience": int(values["Experience"]) if "Experience" in values else None,
+        "college": values.get("College"),
+        "age": int(values["Age"]) if "Age" in values else None,
+        "hometown": values.get("Hometown"),
+    }
+
+
+class PageParser:
+    # fetch threads hand their pages to worker processes, parsing runs on every core instead of
+    # queueing on the GIL; only the parsed columns and dicts travel back
+    def __init__(self, workers: int = DEFAULT_PARSE_WORKERS) -> None:
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        # 0 workers parses in the calling thread
+        if self.workers <= 0:
+            return None
+        with self.lock:
+            if self.pool is None:
+                # forking a process that has fetch threads running can copy their held locks
+                context = multiprocessing.get_context("spawn")
+                self.pool = ProcessPoolExecutor(self.workers, mp_context=context)
+            return self.pool
+
+    def table(self, html: str, schema: Schema) -> Table:
+        pool = self.executor()
+        if pool is None:
+            return extract_table(html, schema)
+        return pool.submit(extract_table, html, schema).result()
+
+    def players(self, pages: List[str]) -> List[Dict[str, Any]]:
+        pool = self.executor()
+        if pool is None:
+            return [parse_player_page(html) for html in pages]
+        chunksize = max(1, len(pages) // (self.workers * 4))
+        return list(pool.map(parse_player_page, pages, chunksize=chunksize))
+
+    def close(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
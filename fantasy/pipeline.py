@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from graphlib import TopologicalSorter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from db import PipelineState, db
+from factory import MainFactory
+from metrics import DEFAULT_METRICS_DIR, Metrics
+from seasons import last_completed_season
+
+RAN: str = "ran"
+SKIPPED: str = "skipped"
+FAILED: str = "failed"
+
+# the tables features and predictions are computed from
+SOURCE_TABLES: List[str] = ["players", "active_stats", "passing_stats", "defense_passing_stats"]
+
+
+def table_hash(table: str) -> str:
+    # order independent, adding, changing or removing any row changes it
+    with db.execute_sql(
+        f"SELECT count(*), coalesce(sum(hashtext(t::TEXT)::BIGINT), 0) FROM public.{table} t"
+    ) as cursor:
+        count, total = cursor.fetchone()
+    return f"{count}:{total}"
+
+
+def fingerprint(inputs: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[], Any]
+    # stages without inputs always run, e.g. the scrape whose inputs live on nfl.com
+    inputs: Optional[Callable[[], Dict[str, Any]]] = None
+    after: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageRun:
+    stage: str
+    status: str
+    seconds: float
+    fingerprint: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"{self.stage:<10}{self.status:<9}{self.seconds:>9.2f}s"
+
+
+class Pipeline:
+    def __init__(
+        self, stages: Sequence[Stage], metrics_dir: Optional[str] = DEFAULT_METRICS_DIR
+    ) -> None:
+        self.stages = {stage.name: stage for stage in stages}
+        self.metrics_dir = metrics_dir
+        self.metrics = Metrics()
+        self.runs: List[StageRun] = []
+
+    def order(self) -> List[str]:
+        graph = {name: stage.after for name, stage in self.stages.items()}
+        return list(TopologicalSorter(graph).static_order())
+
+    def run(self, force: Sequence[str] = ()) -> List[StageRun]:
+        unknown = set(force) - set(self.stages)
+        assert not unknown, f"Unknown stages: {sorted(unknown)}, expected some of {sorted(self.stages)}"
+        self.metrics.reset()
+        self.runs = []
+        try:
+            for name in self.order():
+                self.run_stage(self.stages[name], name in force)
+        finally:
+            self.report()
+        return self.runs
+
+    def run_stage(self, stage: Stage, force: bool) -> None:
+        start = time.perf_counter()
+        # upstream stages have already run, so their output is part of the fingerprint
+        digest = None if stage.inputs is None else fingerprint(stage.inputs())
+        if not force and digest is not None and self.last_fingerprint(stage.name) == digest:
+            self.finish(StageRun(stage.name, SKIPPED, time.perf_counter() - start, digest))
+            return
+
+        try:
+            stage.run()
+        except Exception:
+            self.finish(StageRun(stage.name, FAILED, time.perf_counter() - start, digest))
+            raise
+        run = StageRun(stage.name, RAN, time.perf_counter() - start, digest)
+        self.record(run)
+        self.finish(run)
+
+    def last_fingerprint(self, stage: str) -> Optional[str]:
+        state = PipelineState.get_or_none(PipelineState.stage == stage)
+        return None if state is None else state.fingerprint
+
+    def record(self, run: StageRun) -> None:
+        PipelineState.insert(
+            stage=run.stage,
+            fingerprint=run.fingerprint,
+            seconds=run.seconds,
+            completed_at=datetime.now(),
+        ).on_conflict(
+            conflict_target=[PipelineState.stage],
+            preserve=[PipelineState.fingerprint, PipelineState.seconds, PipelineState.completed_at],
+        ).execute()
+
+    def finish(self, run: StageRun) -> None:
+        self.runs.append(run)
+        self.metrics.inc("pipeline_stages_total", stage=run.stage, status=run.status)
+        self.metrics.observe("pipeline_stage_seconds", run.seconds, stage=run.stage)
+        logging.info(f"Pipeline stage {run}")
+
+    def report(self) -> None:
+        logging.info("Pipeline report:\n" + "\n".join(str(run) for run in self.runs))
+        if self.metrics_dir is not None:
+            self.metrics.write(self.metrics_dir, "pipeline")
+
+
+def nightly(factory: MainFactory, backend: str = "pgml", scrape: bool = True) -> Pipeline:
+    predictor = factory.predictor(backend)
+    season = last_completed_season()
+
+    def sources() -> Dict[str, Any]:
+        return {table: table_hash(table) for table in SOURCE_TABLES}
+
+    def features() -> None:
+        from feature_store import FeatureStore
+
+        FeatureStore().refresh()
+
+    def predict() -> None:
+        # predictions of an older model or older stats are stale, score the whole grid again
+        predictor.replace_predictions(season)
+
+    stages = [
+        Stage("features", features, sources, after=("scrape",) if scrape else ()),
+        Stage(
+            "train",
+            lambda: predictor.backend.train(force=True),
+            lambda: {"backend": backend, "feature_rows": table_hash("feature_rows")},
+            after=("features",),
+        ),
+        Stage(
+            "predict",
+            predict,
+            lambda: {"season": season, "model": predictor.backend.version(), **sources()},
+            after=("train",),
+        ),
+    ]
+    if scrape:
+        stages.insert(0, Stage("scrape", lambda: factory.nfl_etl().refresh()))
+    return Pipeline(stages)
@@ -0,0 +1,51 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from db import PlayerInfo
+
+
+def player_slug(player_url: str) -> str:
+    return player_url.split("/")[2]
+
+
+@dataclass
+class PlayerIndex:
+    names: Dict[str, str]
+    ingested: Set[Tuple[str, str]]
+    loaded: bool
+
+    def __init__(self) -> None:
+        self.names = {}
+        self.ingested = set()
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        query = PlayerInfo.select(PlayerInfo.slug, PlayerInfo.name, PlayerInfo.position).tuples()
+        with self.lock:
+            for slug, name, position in query:
+                if slug is not None:
+                    self.names[slug] = name
+                self.ingested.add((name, position))
+            self.loaded = True
+        logging.info(f"Loaded {len(self.ingested)} known players")
+
+    def ensure_loaded(self) -> None:
+        if not self.loaded:
+            self.load()
+
+    def is_known(self, slug: str) -> bool:
+        with self.lock:
+            return slug in self.names
+
+    def is_ingested(self, name: str, position: str) -> bool:
+        with self.lock:
+            return (name, position) in self.ingested
+
+    def add(self, slug: Optional[str], name: str, position: str) -> None:
+        with self.lock:
+            if slug is not None:
+                self.names[slug] = name
+            self.ingested.add((name, position))
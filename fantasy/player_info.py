@@ -1,175 +1,112 @@
 import logging
-from dataclasses import dataclass
-from typing import Iterable, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 from db import ActiveStats, PlayerInfo
+from etl_state import Watermarks
+from fetcher import Fetcher
+from gamelogs import GameLogStore
+from loader import Loader, UpsertLoader
+from metrics import metrics
+from parsing import PageParser
+from player_index import PlayerIndex, player_slug
+from records import Records
+from tables import GAMELOG
 
 
 @dataclass
 class PlayerService:
     root_url: str
+    fetcher: Fetcher
+    # owned by the caller, which shuts its worker processes down
+    parser: PageParser
+    loader: Loader = field(default_factory=UpsertLoader)
+    index: PlayerIndex = field(default_factory=PlayerIndex)
+    watermarks: Watermarks = field(default_factory=Watermarks)
+    gamelogs: GameLogStore = field(default_factory=GameLogStore)
 
     def run(self, player_urls: List[str]) -> None:
+        self.index.ensure_loaded()
         to_create = list(self.fetch_players(player_urls))
-        PlayerInfo.bulk_create(to_create)
-
-    def fetch_players(self, player_urls: List[str]) -> Iterable[PlayerInfo]:
-        for player in player_urls:
-            info = self.fetch_player_info(player)
-            if info is not None:
-                yield info
-
-    def fetch_player_info(self, player_url: str) -> PlayerInfo:
-        player = player_url.split("/")[2]
-        logging.info(f"Fetching NFL Player info for: {player}")
-        url = self.root_url + player_url
-        resp = requests.get(url)
-        assert resp.ok, f"Request error: {resp.status_code!r} - {resp.content!r}"
-        soup = BeautifulSoup(resp.text, features="html.parser")
-
-        name = soup.find("h1", class_="nfl-c-player-header__title").text
-        if not PlayerInfo.select().where(PlayerInfo.name == name).exists():
-            position = soup.find("span", class_="nfl-c-player-header__position").text.replace(" ", "")
-
-            active = soup.find(
-                "h3",
-                class_="nfl-c-player-header__roster-status "
-                + "nfl-c-player-header__roster-status--act nfl-u-hide-empty",
-            )
-
-            physical_data = {
-                val.find("div", class_="nfl-c-player-info__key")
-                .text: val.find("div", class_="nfl-c-player-info__value")
-                .text
-                for val in soup.find("ul", class_="d3-o-list nfl-c-player-info__physical-data").find_all(
-                    "li", class_="d3-o-list__item"
-                )
-            }
-
-            career_data = {
-                val.find("div", class_="nfl-c-player-info__key")
-                .text: val.find("div", class_="nfl-c-player-info__value")
-                .text
-                for val in soup.find("ul", class_="d3-o-list nfl-c-player-info__career-data").find_all(
-                    "li", class_="d3-o-list__item"
-                )
-            }
-
-            height = None
-            if "Height" in physical_data and physical_data["Height"] != "":
-                height = physical_data["Height"].split("-")
-                height = int(height[0]) * 12 + int(height[1])
-
-            weight = None
-            if "Weight" in physical_data and physical_data["Weight"] != "":
-                weight = int(physical_data["Weight"])
-
-            arms = None
-            if "Arms" in physical_data and physical_data["Arms"] != "":
-                arms = physical_data["Arms"].split(" ")
-                if len(arms) > 1:
-                    arms = float(arms[0]) + float(arms[1].split("/")[0]) / float(arms[1].split("/")[1])
-                else:
-                    arms = float(arms[0])
-
-            hands = None
-            if "Hands" in physical_data and physical_data["Hands"] != "":
-                hands = physical_data["Arms"].split(" ")
-                if len(hands) > 1:
-                    hands = float(hands[0]) + float(hands[1].split("/")[0]) / float(
-                        hands[1].split("/")[1]
-                    )
-                else:
-                    hands = float(hands[0])
-
-            experience = None
-            if "Experience" in career_data and career_data["Experience"] != "":
-                experience = int(career_data["Experience"])
-
-            college = None
-            if "College" in career_data and career_data["College"] != "":
-                college = career_data["College"]
-
-            hometown = None
-            if "Hometown" in career_data and career_data["Hometown"] != "":
-                hometown = career_data["Hometown"]
-
-            age = None
-            if "Age" in career_data and career_data["Age"] != "":
-                age = int(career_data["Age"])
-
-            team = None
-
-            if active is not None and active.text == "active":
-                active = True
-
-                if position == "QB":
-                    to_create = self.fetch_active_stats(name, player_url)
-                    ActiveStats.bulk_create(to_create)
-
-                team = (
-                    soup.find("div", class_="nfl-c-player-header__team nfl-u-hide-empty")
-                    .find("a", class_="nfl-o-cta--link")
-                    .text
-                )
-            else:
-                active = False
-
-            return PlayerInfo(
-                name=name,
-                position=position,
-                active=active,
-                team=team,
-                height=height,
-                weight=weight,
-                arms=arms,
-                hands=hands,
-                experience=experience,
-                college=college,
-                age=age,
-                hometown=hometown,
-            )
-
-    def fetch_active_stats(self, player_name: str, player_url: str) -> Iterable[ActiveStats]:
-        player = player_url.split("/")[2]
-        logging.info(f"Fetching NFL Player Recent Game Stats for: {player}")
+        metrics.inc("nfl_rows_total", len(to_create), category="player", season=None)
+        with metrics.timer("nfl_db_write_seconds", category="player", season=None):
+            self.loader.load(PlayerInfo, Records.from_dicts(PlayerInfo, to_create))
+        for info in to_create:
+            self.index.add(info["slug"], info["name"], info["position"])
+
+    def fetch_players(self, player_urls: List[str]) -> Iterable[Dict[str, Any]]:
+        unknown = {}
+        for player_url in player_urls:
+            if not self.index.is_known(player_slug(player_url)):
+                unknown[player_slug(player_url)] = player_url
+        player_urls = list(unknown.values())
+        for player_url in player_urls:
+            logging.info(f"Fetching NFL Player info for: {player_slug(player_url)}")
+        pages = self.fetcher.get_all(self.root_url + player_url for player_url in player_urls)
+        with metrics.timer("nfl_parse_seconds", category="player", season=None):
+            parsed = self.parser.players(pages)
+        for player_url, info in zip(player_urls, parsed):
+            player = self.ingest_player(player_url, info)
+            if player is not None:
+                yield player
+
+    def fetch_player_info(self, player_url: str) -> Optional[Dict[str, Any]]:
+        logging.info(f"Fetching NFL Player info for: {player_slug(player_url)}")
+        html = self.fetcher.get(self.root_url + player_url)
+        return self.ingest_player(player_url, self.parser.players([html])[0])
+
+    def ingest_player(self, player_url: str, info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        slug = player_slug(player_url)
+        name, position = info["name"], info["position"]
+        if self.index.is_ingested(name, position):
+            # ingested before slugs were tracked, remember it so the page is skipped next time
+            PlayerInfo.update(slug=slug).where(
+                (PlayerInfo.name == name) & (PlayerInfo.position == position)
+            ).execute()
+            self.index.add(slug, name, position)
+            return None
+
+        if info["active"] and position == "QB":
+            self.run_gamelog(name, player_url)
+        return {"slug": slug, **info}
+
+    def refresh_gamelogs(self) -> None:
+        query = (
+            PlayerInfo.select(PlayerInfo.slug, PlayerInfo.name)
+            .where(PlayerInfo.position == "QB")
+            .where(PlayerInfo.active)
+            .where(PlayerInfo.slug.is_null(False))
+        )
+        for player in query:
+            self.run_gamelog(player.name, f"/players/{player.slug}/")
+
+    def run_gamelog(self, player_name: str, player_url: str) -> None:
+        slug = player_slug(player_url)
+        season = self.watermarks.season
+        if self.watermarks.is_done("gamelog", slug, season):
+            return
+        stats = self.fetch_active_stats(player_name, player_url)
+        with metrics.timer("nfl_db_write_seconds", category="gamelog", season=season):
+            appended = self.gamelogs.append(self.loader, player_name, season, stats)
+        metrics.inc("nfl_rows_total", appended, category="gamelog", season=season)
+        self.watermarks.complete("gamelog", slug, season)
+
+    def fetch_active_stats(self, player_name: str, player_url: str) -> Records:
+        logging.info(f"Fetching NFL Player Recent Game Stats for: {player_slug(player_url)}")
         url = self.root_url + player_url + "/stats/"
-        resp = requests.get(url)
-        assert resp.ok, f"Request error: {resp.status_code!r} - {resp.content!r}"
-        soup = BeautifulSoup(resp.text, features="html.parser")
-
-        table = soup.find("table")
-        if table is not None:
-            df = pd.read_html(str(table))[0]
-            df = df.fillna(0)
-            for row in df.values.tolist():
-                yield ActiveStats(
-                    name=player_name,
-                    week=row[0],
-                    opponent=row[1].replace("@", ""),
-                    home=False if row[1].__contains__("@") else True,
-                    game_result=row[2].split(" ")[0],
-                    pass_completions=row[3],
-                    pass_attempts=row[4],
-                    pass_yards=row[5],
-                    pass_avg=row[6],
-                    pass_touchdowns=row[7],
-                    interceptions=row[8],
-                    sacks=row[9],
-                    sack_yards=row[10],
-                    rating=row[11],
-                    rush_attempts=row[12],
-                    rush_yards=row[13],
-                    rush_avg=row[14],
-                    rush_touchdowns=row[15],
-                    fumbles=row[16],
-                    fumbles_lost=row[17],
-                )
+        html = self.fetcher.get(url)
+        with metrics.timer("nfl_parse_seconds", category="gamelog", season=self.watermarks.season):
+            stats = self.parser.table(html, GAMELOG)
+        opponents = stats.columns["opponent"]
+        columns = {
+            **stats.columns,
+            "opponent": [opponent.replace("@", "") for opponent in opponents],
+            "home": ["@" not in opponent for opponent in opponents],
+            "game_result": [result.split(" ")[0] for result in stats.columns["game_result"]],
+        }
+        return Records(ActiveStats, columns, {"name": player_name, "season": self.watermarks.season})
 
 
 if __name__ == "__main__":
-    service = PlayerService("https://www.nfl.com")
+    service = PlayerService("https://www.nfl.com", Fetcher(), PageParser(0))
     service.fetch_player_info("/players/patrick-mahomes")
@@ -0,0 +1,112 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from db import db
+from player_index import player_slug
+from player_info import PlayerService
+
+DEFAULT_WORKERS: int = 4
+DEFAULT_QUEUE_SIZE: int = 512
+DEFAULT_BATCH_SIZE: int = 25
+
+
+@dataclass
+class PlayerQueue:
+    player_service: PlayerService
+    workers: int
+    batch_size: int
+
+    def __init__(
+        self,
+        player_service: PlayerService,
+        workers: int = DEFAULT_WORKERS,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        self.player_service = player_service
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize)
+        # one future per player slug queued this run, done once its batch is loaded or has failed
+        self.pending: Dict[str, "Future[None]"] = {}
+        self.threads: List[threading.Thread] = []
+        self.lock = threading.Lock()
+
+    def put(self, player_urls: List[str]) -> None:
+        self.start()
+        for player_url in player_urls:
+            slug = player_slug(player_url)
+            if self.player_service.index.is_known(slug):
+                continue
+            with self.lock:
+                if slug in self.pending:
+                    continue
+                self.pending[slug] = Future()
+            self.queue.put(player_url)
+
+    def start(self) -> None:
+        # producers racing to queue the first players start the pool once, the others wait for it
+        with self.lock:
+            if self.threads:
+                return
+            self.player_service.index.ensure_loaded()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self.work, name=f"players-{i}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def work(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            player_urls = [player_url for player_url in batch if player_url is not None]
+            error: Optional[BaseException] = None
+            try:
+                if player_urls:
+                    with db.connection_context():
+                        self.player_service.run(player_urls)
+            except Exception as err:
+                logging.exception(f"Failed to load players: {player_urls}")
+                error = err
+            for future in self.futures(player_urls):
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+            if len(player_urls) < len(batch):
+                return
+
+    def futures(self, player_urls: List[str]) -> List["Future[None]"]:
+        # players already in the index were never queued and have nothing to wait for
+        with self.lock:
+            slugs = [player_slug(player_url) for player_url in player_urls]
+            return [self.pending[slug] for slug in slugs if slug in self.pending]
+
+    def loaded(self, player_urls: List[str]) -> bool:
+        # without waiting, True once every batch holding one of the players has finished
+        return all(future.done() for future in self.futures(player_urls))
+
+    def drain(self, player_urls: List[str]) -> None:
+        # waits for the given players only, the ones other jobs queued keep loading meanwhile
+        for future in self.futures(player_urls):
+            future.result()
+
+    def close(self) -> None:
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        # the next run asks the player index again, players that failed this time are retried
+        with self.lock:
+            self.pending = {}
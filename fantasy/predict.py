@@ -1,14 +1,80 @@
-from datetime import datetime
-from typing import List, Optional
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, TypeVar
 
+import numpy as np
+from backends import PgmlBackend, PredictorBackend
+from columns import PREDICTION_COLUMNS
 from daos import Dao
 from db import db
+from feature_cache import feature_cache
 from peewee import IntegrityError
+from seasons import last_completed_season
+
+DEFAULT_WORKERS: int = 4
+DEFAULT_WRITE_BATCH_SIZE: int = 100
+
+T = TypeVar("T")
+
+
+def round_robin(items: List[T], workers: int) -> List[List[T]]:
+    # every worker takes every n-th item, neighbouring QBs don't all land on one worker
+    return [items[i::workers] for i in range(workers) if items[i::workers]]
+
+
+@dataclass
+class RunSummary:
+    predicted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: "RunSummary") -> None:
+        self.predicted += other.predicted
+        self.skipped += other.skipped
+        self.failed += other.failed
+        # partitions run side by side, the slowest one bounds the run
+        self.seconds = max(self.seconds, other.seconds)
+
+    def __str__(self) -> str:
+        rate = self.predicted / self.seconds if self.seconds > 0 else 0.0
+        return (
+            f"{self.predicted} predicted, {self.skipped} skipped, {self.failed} failed "
+            f"in {self.seconds:.2f}s ({rate:,.0f}/sec)"
+        )
 
 
 class PassingPredictor:
-    def __init__(self, dao: Dao) -> None:
+    def __init__(
+        self,
+        dao: Dao,
+        backend: Optional[PredictorBackend] = None,
+        write_batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+    ) -> None:
         self.dao = dao
+        self.backend = PgmlBackend(dao) if backend is None else backend
+        self.write_batch_size = write_batch_size
+
+    def features(self, name: str, opponent: str, is_home_game: bool, year: int) -> List[float]:
+        player_info = self.dao.get_player_info(name, year)
+        active_stats = self.dao.get_player_active_stats(name, year)
+        defense_stats = self.dao.get_defense_stats(opponent, year)
+        return [
+            player_info["age"],
+            player_info["experience"],
+            active_stats["pass_attempts"],
+            active_stats["pass_completions"],
+            active_stats["pass_avg"],
+            active_stats["rating"],
+            1 if is_home_game else 0,
+            0 if is_home_game else 1,
+            defense_stats["avg_pass_att_against"],
+            defense_stats["avg_completions_against"],
+            defense_stats["avg_yds_att_against"],
+            defense_stats["avg_sacks"],
+        ]
 
     def predict(
         self,
@@ -17,69 +83,147 @@ class PassingPredictor:
         is_home_game: bool,
         year: int,
     ) -> float:
-        player_info = self.dao.get_player_info(name, year)
-        active_stats = self.dao.get_player_active_stats(name, year)
-        defense_stats = self.dao.get_defense_stats(opponent, year)
-
-        with db.execute_sql(
-            sql="""SELECT pgml.predict(
-                    'nfl_passing_yards'::TEXT,
-                    ARRAY[
-                        %s::INT4,      -- Age
-                        %s::INT4,      -- Experience
-                        %s::FLOAT4,    -- Avg Pass Attempts
-                        %s::FLOAT4,    -- Avg Pass Completions
-                        %s::FLOAT4,    -- Avg Yards per Attempt
-                        %s::FLOAT4,    -- Ovr Passer Rating
-                        %s::INT4,      -- Is Home
-                        %s::INT4,      -- IS Away
-                        %s::FLOAT4,    -- Defense Average Pass Attempts Against
-                        %s::FLOAT4,    -- Defense Average Completions Against
-                        %s::FLOAT4,    -- Defense Average Yards per Attempts Against
-                        %s::FLOAT4     -- Defense Average Sacks
-                    ]
-                ) AS prediction;""",
-            params=[
-                player_info["age"],
-                player_info["experience"],
-                active_stats["pass_attempts"],
-                active_stats["pass_completions"],
-                active_stats["pass_avg"],
-                active_stats["rating"],
-                1 if is_home_game else 0,
-                0 if is_home_game else 1,
-                defense_stats["avg_pass_att_against"],
-                defense_stats["avg_completions_against"],
-                defense_stats["avg_yds_att_against"],
-                defense_stats["avg_sacks"],
-            ],
-        ) as cursor:
-            return float(cursor.fetchall()[0][0])
+        features = np.array([self.features(name, opponent, is_home_game, year)], dtype=np.float32)
+        return float(self.backend.predict(features)[0])
 
     def run(  # type: ignore
         self,
         persist: Optional[bool] = True,
+        batch: bool = False,
+        workers: int = DEFAULT_WORKERS,
+        preload: bool = True,
     ):
+        year = last_completed_season()
         names = self.dao.get_player_names()
+        if batch:
+            self.batch_run(bool(persist), year, names, workers)
+            return
+
         teams = self.dao.get_team_names()
-        year = datetime.now().year - 1
+        grid = [
+            (name, opponent, is_home_game)
+            for is_home_game in (True, False)
+            for name in names
+            for opponent in teams
+        ]
+        skipped = 0
+        if persist and preload:
+            # one query for every key already predicted, the grid is filtered in memory
+            existing = self.dao.get_prediction_keys(year)
+            remaining = [key for key in grid if key not in existing]
+            skipped = len(grid) - len(remaining)
+            grid = remaining
+
+        summary = self.parallel(round_robin(grid, workers), bool(persist), year, lookup=not preload)
+        summary.skipped += skipped
+        logging.info(f"Feature cache: {feature_cache.stats()}")
+        logging.info(f"Prediction run for {year}: {summary}")
 
-        self.prediction_run(persist, names, teams, True, year)  # type: ignore
-        self.prediction_run(persist, names, teams, False, year)  # type: ignore
+    def parallel(
+        self, partitions: List[List[Tuple[str, str, bool]]], persist: bool, year: int, lookup: bool
+    ) -> RunSummary:
+        summary = RunSummary()
+        with ThreadPoolExecutor(
+            max_workers=max(len(partitions), 1), thread_name_prefix="predict"
+        ) as pool:
+            futures = [
+                pool.submit(self.prediction_run, persist, partition, year, lookup)
+                for partition in partitions
+            ]
+            for future in futures:
+                summary.merge(future.result())
+        return summary
 
     def prediction_run(
-        self, persist: bool, names: List[str], teams: List[str], is_home_game: bool, year: int
-    ) -> None:
-        for name in names:
-            for opponent in teams:
-                existing = self.dao.get_prediction(name, opponent, is_home_game, year)
-                if persist and existing:
+        self, persist: bool, grid: List[Tuple[str, str, bool]], year: int, lookup: bool = False
+    ) -> RunSummary:
+        summary = RunSummary()
+        start = time.perf_counter()
+        pending: List[Tuple[str, str, bool, float]] = []
+        # each worker thread holds one pooled connection for its whole partition
+        with db.connection_context():
+            for name, opponent, is_home_game in grid:
+                if persist and lookup and self.dao.get_prediction(name, opponent, is_home_game, year):
+                    summary.skipped += 1
                     continue
 
-                prediction = self.predict(name, opponent, is_home_game, year)
+                pending.append(
+                    (name, opponent, is_home_game, self.predict(name, opponent, is_home_game, year))
+                )
+                summary.predicted += 1
+                if persist and len(pending) >= self.write_batch_size:
+                    summary.failed += self.flush(year, pending)
+                    pending = []
+
+            if persist and pending:
+                summary.failed += self.flush(year, pending)
+        summary.seconds = time.perf_counter() - start
+        return summary
+
+    def flush(self, year: int, predictions: List[Tuple[str, str, bool, float]]) -> int:
+        try:
+            self.dao.save_predictions(year, predictions)
+            return 0
+        except IntegrityError as err:
+            print(err)
+            return len(predictions)
+
+    def replace_predictions(self, year: int, workers: int = DEFAULT_WORKERS) -> int:
+        # the grid is scored without writing, then swapped in with one transaction: readers never see the
+        # season without predictions and a failed run keeps the previous ones
+        predictions = self.batch_run(False, year, self.dao.get_player_names(), workers)
+        with db.atomic():
+            deleted = self.dao.delete_predictions(year)
+            self.dao.save_predictions(year, predictions)
+        logging.info(f"Replaced {deleted} predictions for {year} with {len(predictions)}")
+        return len(predictions)
+
+    def batch_run(
+        self, persist: bool, year: int, names: List[str], workers: int
+    ) -> List[Tuple[str, str, bool, float]]:
+        start = time.perf_counter()
+        if isinstance(self.backend, PgmlBackend):
+            # scoring inside postgres keeps each partition of QBs in one statement
+            partitions = round_robin(names, workers)
+            with ThreadPoolExecutor(
+                max_workers=max(len(partitions), 1), thread_name_prefix="predict"
+            ) as pool:
+                predictions = [
+                    prediction
+                    for partition in pool.map(
+                        lambda names: self.batch_partition(year, persist, names), partitions
+                    )
+                    for prediction in partition
+                ]
+        else:
+            predictions = self.score_grid(persist, year)
+        elapsed = time.perf_counter() - start
+        logging.info(f"Predicted {len(predictions)} passing runs for {year} in {elapsed:.2f}s")
+        return predictions
+
+    def batch_partition(
+        self, year: int, persist: bool, names: List[str]
+    ) -> List[Tuple[str, str, bool, float]]:
+        with db.connection_context():
+            return self.dao.predict_passing_yds_batch(year, persist, names)
+
+    def score_grid(self, persist: bool, year: int) -> List[Tuple[str, str, bool, float]]:
+        # pandas is only loaded by the local backend path
+        from features import FeatureBuilder, to_matrix
+
+        grid = FeatureBuilder.load([year]).prediction_frame(year)
+        if persist:
+            existing = self.dao.get_prediction_keys(year)
+            keys = zip(grid["name"], grid["opponent"], grid["is_home_game"])
+            grid = grid[[key not in existing for key in keys]]
 
-                if persist:
-                    try:
-                        self.dao.save_prediction(name, opponent, is_home_game, year, prediction)
-                    except IntegrityError as err:
-                        print(err)
+        passing_yards = self.backend.predict(to_matrix(grid, PREDICTION_COLUMNS))
+        predictions = [
+            (name, opponent, bool(is_home_game), float(yards))
+            for name, opponent, is_home_game, yards in zip(
+                grid["name"], grid["opponent"], grid["is_home_game"], passing_yards
+            )
+        ]
+        if persist:
+            self.dao.save_predictions(year, predictions)
+        return predictions
@@ -0,0 +1,50 @@
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, MutableSequence, Sequence, Tuple, Type
+
+from peewee import Model
+
+
+@dataclass
+class Records:
+    # rows of one model held as columns, e.g. the typed arrays of a parsed Table, plus values shared by
+    # every row such as the season; loaders turn them into row tuples without building Model instances
+    model: Type[Model]
+    # read only, so any mapping of sequences will do, e.g. a Table's arrays or plain lists
+    columns: Mapping[str, Sequence[Any]]
+    constants: Mapping[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        assert self.columns, f"{self.model.__name__} records need at least one column"
+        unknown = (set(self.columns) | set(self.constants)) - set(self.model._meta.fields)
+        assert not unknown, f"Unknown {self.model.__name__} fields: {sorted(unknown)}"
+
+    @classmethod
+    def from_dicts(cls, model: Type[Model], rows: Iterable[Dict[str, Any]]) -> "Records":
+        names = [f.name for f in model._meta.sorted_fields]
+        columns: Dict[str, MutableSequence[Any]] = {name: [] for name in names}
+        for row in rows:
+            for name in names:
+                columns[name].append(row.get(name))
+        return cls(model, dict(columns))
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        # one tuple per row in the model's field order, fields not given are left null
+        return zip(
+            *(
+                self.columns[f.name] if f.name in self.columns else repeat(self.constants.get(f.name))
+                for f in self.model._meta.sorted_fields
+            )
+        )
+
+    def take(self, indexes: List[int]) -> "Records":
+        columns = {name: [values[i] for i in indexes] for name, values in self.columns.items()}
+        return Records(self.model, columns, self.constants)
+
+    def column(self, name: str) -> Sequence[Any]:
+        if name in self.columns:
+            return self.columns[name]
+        return [self.constants.get(name)] * len(self)
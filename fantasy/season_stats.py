@@ -1,169 +1,99 @@
 import logging
 from dataclasses import dataclass
-from typing import Dict, Iterable
+from typing import Iterator, List, Optional, Tuple
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from db import FieldGoalStats, PassingStats, ReceivingStats, RushingStats
-from player_info import PlayerService
+from categories import CATEGORIES, PLAYER, StatCategory
+from etl_state import Watermarks
+from fetcher import Fetcher
+from loader import Loader
+from metrics import metrics
+from parsing import PageParser
+from player_queue import PlayerQueue
+from records import Records
+from tables import Table
 
 
 @dataclass
 class SeasonStatsService:
     root_url: str
-    player_service: PlayerService
-
-    def __init__(self, root_url: str) -> None:
+    fetcher: Fetcher
+    players: PlayerQueue
+    loader: Loader
+    watermarks: Watermarks
+    parser: PageParser
+
+    def __init__(
+        self,
+        root_url: str,
+        fetcher: Fetcher,
+        players: PlayerQueue,
+        loader: Loader,
+        watermarks: Watermarks,
+        parser: PageParser,
+    ) -> None:
         self.root_url = root_url
-        self.player_service = PlayerService(root_url)
-        self.categories: Dict[str, str] = {
-            "passing": "passingyards",
-            "rushing": "rushingyards",
-            "receiving": "receivingreceptions",
-            "fumbles": "defensiveforcedfumble",
-            "tackles": "defensivecombinetackles",
-            "interceptions": "defensiveinterceptions",
-            "field-goals": "kickingfgmade",
-            "kickoffs": "kickofftotal",
-            "kickoff-returns": "kickreturnsaverageyards",
-            "punts": "puntingaverageyards",
-            "punt-returns": "puntreturnsaverageyards",
-        }
+        self.fetcher = fetcher
+        self.players = players
+        self.loader = loader
+        self.watermarks = watermarks
+        self.parser = parser
 
     def run_pass(self, start_yr: int, end_yr: int) -> None:
-        to_create = list(self.fetch_passing(start_yr, end_yr))
-        PassingStats.bulk_create(to_create)
+        self.run_years(CATEGORIES[(PLAYER, "passing")], start_yr, end_yr)
 
     def run_rush(self, start_yr: int, end_yr: int) -> None:
-        to_create = list(self.fetch_rushing(start_yr, end_yr))
-        RushingStats.bulk_create(to_create)
+        self.run_years(CATEGORIES[(PLAYER, "rushing")], start_yr, end_yr)
 
     def run_rec(self, start_yr: int, end_yr: int) -> None:
-        to_create = list(self.fetch_receiving(start_yr, end_yr))
-        ReceivingStats.bulk_create(to_create)
+        self.run_years(CATEGORIES[(PLAYER, "receiving")], start_yr, end_yr)
 
     def run_fg(self, start_yr: int, end_yr: int) -> None:
-        to_create = list(self.fetch_field_goal_stats(start_yr, end_yr))
-        FieldGoalStats.bulk_create(to_create)
-
-    def fetch_passing(self, start_yr: int, end_yr: int) -> Iterable[PassingStats]:
-        for year in range(start_yr, end_yr):
-            stats = self.fetch_player_stats("passing", year)
-            for row in stats.values.tolist():
-                yield PassingStats(
-                    year=year,
-                    player=row[0],
-                    pass_yds=row[1],
-                    yds_att=row[2],
-                    att=row[3],
-                    cmp=row[4],
-                    cmp_pct=row[5],
-                    td=row[6],
-                    int=row[7],
-                    rate=row[8],
-                    first=row[9],
-                    first_pct=row[10],
-                    twenty_plus=row[11],
-                    forty_plus=row[12],
-                    lng=row[13],
-                    sck=row[14],
-                    scky=row[15],
-                )
-
-    def fetch_rushing(self, start_yr: int, end_yr: int) -> Iterable[RushingStats]:
-        for year in range(start_yr, end_yr):
-            stats = self.fetch_player_stats("rushing", year)
-            for row in stats.values.tolist():
-                yield RushingStats(
-                    year=year,
-                    player=row[0],
-                    rush_yds=row[1],
-                    att=row[2],
-                    td=row[3],
-                    twenty_plus=row[4],
-                    forty_plus=row[5],
-                    lng=row[6],
-                    rush_first=row[7],
-                    rush_first_pct=row[8],
-                    rush_fum=row[9],
-                )
-
-    def fetch_receiving(self, start_yr: int, end_yr: int) -> Iterable[ReceivingStats]:
-        for year in range(start_yr, end_yr):
-            stats = self.fetch_player_stats("receiving", year)
-            for row in stats.values.tolist():
-                yield ReceivingStats(
-                    year=year,
-                    player=row[0],
-                    rec=row[1],
-                    yds=row[2],
-                    td=row[3],
-                    twenty_plus=row[4],
-                    forty_plus=row[5],
-                    lng=row[6],
-                    rec_first=row[7],
-                    first_pct=row[8],
-                    rec_fum=row[9],
-                    rec_yac_r=row[10],
-                    tgts=row[11],
-                )
+        self.run_years(CATEGORIES[(PLAYER, "field-goals")], start_yr, end_yr)
 
-    def fetch_field_goal_stats(self, start_yr: int, end_yr: int) -> Iterable[FieldGoalStats]:
+    def run_years(self, category: StatCategory, start_yr: int, end_yr: int) -> None:
         for year in range(start_yr, end_yr):
-            stats = self.fetch_player_stats("field-goals", year)
-            for row in stats.values.tolist():
-                yield FieldGoalStats(
-                    year=year,
-                    player=row[0],
-                    fgm=row[1],
-                    att=row[2],
-                    fg_pct=row[3],
-                    one_nineteen_a_m=row[4],
-                    twenty_twentynine_a_m=row[5],
-                    thirty_thirtynine_a_m=row[6],
-                    forty_fortynine_a_m=row[7],
-                    fifty_fiftynine_a_m=row[8],
-                    sixty_plus_a_m=row[9],
-                    lng=row[10],
-                    fg_blk=row[11],
-                )
-
-    def fetch_player_stats(self, category: str, year: int) -> pd.DataFrame:
-        logging.info(f"Fetching NFL {year} Player Stats for category: {category}")
-        url = (
-            self.root_url
-            + "/stats/player-stats/category/"
-            + category
-            + "/"
-            + str(year)
-            + "/reg/all/"
-            + self.categories[category]
-            + "/desc"
-        )
-        resp = requests.get(url)
-        assert resp.ok, f"Request error: {resp.status_code!r} - {resp.content!r}"
-        soup = BeautifulSoup(resp.text, features="html.parser")
-
-        table = soup.find("table")
-
-        player_rows = table.find_all("a", href=True, class_="d3-o-player-fullname nfl-o-cta--link")
-        self.player_service.run([player["href"] for player in player_rows])
-
-        df = pd.read_html(str(table))[0]
-        next = soup.find("a", href=True, class_="nfl-o-table-pagination__next")
-        while next is not None:
-            url = self.root_url + next["href"]
-            resp = requests.get(url)
-            assert resp.ok, f"Request error: {resp.status_code!r} - {resp.content!r}"
-            soup = BeautifulSoup(resp.text, features="html.parser")
-
-            table = soup.find("table")
-
-            player_rows = table.find_all("a", href=True, class_="d3-o-player-fullname nfl-o-cta--link")
-            self.player_service.run([player["href"] for player in player_rows])
-
-            df = pd.concat([df, pd.read_html(str(table))[0]], ignore_index=True)
-            next = soup.find("a", href=True, class_="nfl-o-table-pagination__next")
-
-        return df[df["Player"].notna()]
+            self.run_category(category, year)
+
+    def run_category(self, category: StatCategory, year: int) -> None:
+        # pages are written and watermarked in order as soon as the players they link to are loaded,
+        # the crawl keeps going meanwhile and an interrupted run resumes after the last of them
+        pending: List[Tuple[int, Table]] = []
+        for page in self.fetch_player_stats(category, year):
+            pending.append(page)
+            ready = 0
+            while ready < len(pending) and self.players.loaded(pending[ready][1].player_urls):
+                ready += 1
+            self.load_pages(category, year, pending[:ready])
+            del pending[:ready]
+        self.load_pages(category, year, pending)
+
+    def load_pages(self, category: StatCategory, year: int, pages: List[Tuple[int, Table]]) -> None:
+        if not pages:
+            return
+        # a page only counts as done once the players it links to are loaded as well
+        for _, page in pages:
+            self.players.drain(page.player_urls)
+        stats = Table.concat(category.schema, (page for _, page in pages))
+        metrics.inc("nfl_rows_total", len(stats), category=category.key, season=year)
+        with metrics.timer("nfl_db_write_seconds", category=category.key, season=year):
+            self.loader.load(category.model, Records(category.model, stats.columns, {"year": year}))
+        for page_no, page in pages:
+            self.watermarks.complete(category.key, str(page_no), year, page.next_url)
+
+    def fetch_player_stats(self, category: StatCategory, year: int) -> Iterator[Tuple[int, Table]]:
+        page_no, next_url, finished = self.watermarks.resume_point(category.key, year)
+        if finished:
+            return
+        logging.info(f"Fetching NFL {year} Player Stats for category: {category.name}")
+        url: Optional[str] = category.url(self.root_url, year)
+        if next_url is not None:
+            url = self.root_url + next_url
+
+        while url is not None:
+            html = self.fetcher.get(url)
+            with metrics.timer("nfl_parse_seconds", category=category.key, season=year):
+                page = self.parser.table(html, category.schema)
+            self.players.put(page.player_urls)
+            yield page_no, page
+            page_no += 1
+            url = None if page.next_url is None else self.root_url + page.next_url
@@ -0,0 +1,18 @@
+from datetime import date
+from typing import Optional
+
+# a season is named after the year its regular season kicks off, in September
+SEASON_START_MONTH: int = 9
+
+
+def current_season(today: Optional[date] = None) -> int:
+    # the season in progress, or the one just played until the next kicks off; its game logs and
+    # listings are still changing
+    today = today or date.today()
+    return today.year if today.month >= SEASON_START_MONTH else today.year - 1
+
+
+def last_completed_season(today: Optional[date] = None) -> int:
+    # the latest season with every week played, the one training and predictions use
+    today = today or date.today()
+    return today.year - 1
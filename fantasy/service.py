@@ -0,0 +1,209 @@
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from daos import Dao
+from db import db
+from feature_cache import feature_cache
+from metrics import LATENCY_BUCKETS, Metrics
+from predict import PassingPredictor
+from seasons import last_completed_season
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8080
+DEFAULT_MAX_BATCH: int = 64
+DEFAULT_MAX_WAIT: float = 0.005
+
+Matchup = Tuple[str, str, bool, int]
+
+
+@dataclass
+class PendingPrediction:
+    matchup: Matchup
+    future: "Future[float]" = field(default_factory=Future)
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predictor: PassingPredictor,
+        metrics: Metrics,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ) -> None:
+        self.predictor = predictor
+        self.metrics = metrics
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: "queue.Queue[Optional[PendingPrediction]]" = queue.Queue()
+        self.thread = threading.Thread(target=self.work, name="predict-batcher", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def submit(self, matchup: Matchup) -> "Future[float]":
+        pending = PendingPrediction(matchup)
+        self.queue.put(pending)
+        return pending.future
+
+    def work(self) -> None:
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    self.queue.put(None)
+                    break
+                batch.append(pending)
+            # a pooled connection per batch, handed back while the server is idle and replaced if it
+            # went stale in the meantime
+            with db.connection_context():
+                self.score(batch)
+
+    def score(self, batch: List[PendingPrediction]) -> None:
+        rows = []
+        scored = []
+        for pending in batch:
+            try:
+                rows.append(self.predictor.features(*pending.matchup))
+                scored.append(pending)
+            except Exception as err:
+                pending.future.set_exception(err)
+        if not scored:
+            return
+
+        self.metrics.inc("predict_batches_total")
+        self.metrics.inc("predict_batch_rows_total", len(scored))
+        try:
+            with self.metrics.timer("predict_score_seconds"):
+                passing_yards = self.predictor.backend.predict(np.array(rows, dtype=np.float32))
+        except Exception as err:
+            logging.exception(f"Failed to score {len(scored)} matchups")
+            for pending in scored:
+                pending.future.set_exception(err)
+            return
+        for pending, yards in zip(scored, passing_yards):
+            pending.future.set_result(float(yards))
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.thread.join()
+
+
+def parse_matchup(query: Dict[str, List[str]]) -> Matchup:
+    assert "name" in query and "opponent" in query, "name and opponent are required"
+    home = query.get("home", ["1"])[0].lower() in ("1", "true", "yes", "home")
+    year = int(query["year"][0]) if "year" in query else last_completed_season()
+    return query["name"][0], query["opponent"][0], home, year
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    server: "PredictionServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        if url.path == "/predict":
+            self.predict(parse_qs(url.query))
+        elif url.path == "/metrics":
+            self.respond(200, self.server.metrics.to_prometheus(), "text/plain; version=0.0.4")
+        elif url.path == "/stats":
+            stats = {"cache": feature_cache.stats(), **self.server.metrics.summary()}
+            self.respond(200, json.dumps(stats), "application/json")
+        elif url.path == "/healthz":
+            self.respond(200, "ok", "text/plain")
+        else:
+            self.respond(404, json.dumps({"error": f"No route for {url.path}"}), "application/json")
+
+    def predict(self, query: Dict[str, List[str]]) -> None:
+        start = time.perf_counter()
+        status = 200
+        try:
+            name, opponent, home, year = parse_matchup(query)
+            passing_yards = self.server.batcher.submit((name, opponent, home, year)).result()
+            body: Dict[str, Any] = {
+                "name": name,
+                "opponent": opponent,
+                "is_home_game": home,
+                "year": year,
+                "passing_yards": passing_yards,
+            }
+        except (AssertionError, ValueError, IndexError) as err:
+            # unknown players or teams surface as failed lookups in the Dao
+            status = 404 if isinstance(err, IndexError) else 400
+            body = {"error": str(err) or type(err).__name__}
+        except Exception as err:
+            logging.exception(f"Failed to predict {query}")
+            status = 500
+            body = {"error": str(err) or type(err).__name__}
+        self.server.metrics.observe("predict_request_seconds", time.perf_counter() - start)
+        self.server.metrics.inc("predict_requests_total", status=status)
+        self.respond(status, json.dumps(body), "application/json")
+
+    def respond(self, status: int, body: str, content_type: str) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug(format % args)
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        predictor: PassingPredictor,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ) -> None:
+        super().__init__((host, port), PredictionHandler)
+        self.predictor = predictor
+        self.metrics = Metrics(
+            {"predict_request_seconds": LATENCY_BUCKETS, "predict_score_seconds": LATENCY_BUCKETS}
+        )
+        self.batcher = MicroBatcher(predictor, self.metrics, max_batch, max_wait)
+
+    def warm(self, year: int) -> None:
+        with db.connection_context():
+            players = self.predictor.dao.load_player_active_stats(year)
+            defenses = self.predictor.dao.load_defense_stats(year)
+        logging.info(f"Warmed feature cache with {len(players)} players and {len(defenses)} defenses")
+
+    def serve(self) -> None:
+        self.warm(last_completed_season())
+        self.batcher.start()
+        logging.info(f"Serving predictions on http://{self.server_name}:{self.server_port}")
+        try:
+            self.serve_forever()
+        finally:
+            self.batcher.close()
+            self.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    PredictionServer(PassingPredictor(Dao())).serve()
@@ -0,0 +1,221 @@
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, MutableSequence, Optional, Tuple
+
+import lxml.html
+
+WHITESPACE = re.compile(r"\s+")
+
+PLAYER_LINK = (
+    ".//a[@href][contains(concat(' ', normalize-space(@class), ' '), ' d3-o-player-fullname ')]"
+)
+NEXT_LINK = (
+    "//a[@href][contains(concat(' ', normalize-space(@class), ' '), ' nfl-o-table-pagination__next ')]"
+)
+
+
+def to_int(text: str) -> int:
+    text = text.replace(",", "").rstrip("T")
+    return int(float(text)) if text else 0
+
+
+def to_float(text: str) -> float:
+    text = text.replace(",", "").rstrip("%")
+    return float(text) if text else 0.0
+
+
+def to_str(text: str) -> str:
+    return text
+
+
+# array typecodes for the numeric column types, anything else is kept in a list
+TYPECODES: Dict[Callable[[str], Any], str] = {to_int: "q", to_float: "d"}
+
+
+@dataclass(frozen=True)
+class Schema:
+    name: str
+    columns: List[Tuple[str, Callable[[str], Any]]]
+    drop_blank: bool = True
+
+    @property
+    def fields(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+    def empty(self) -> Dict[str, MutableSequence[Any]]:
+        return {
+            name: array(TYPECODES[convert]) if convert in TYPECODES else []
+            for name, convert in self.columns
+        }
+
+
+@dataclass
+class Table:
+    schema: Schema
+    columns: Dict[str, MutableSequence[Any]]
+    player_urls: List[str] = field(default_factory=list)
+    next_url: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.columns[self.schema.columns[0][0]])
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        fields = self.schema.fields
+        for values in zip(*(self.columns[name] for name in fields)):
+            yield dict(zip(fields, values))
+
+    @staticmethod
+    def concat(schema: Schema, tables: Iterable["Table"]) -> "Table":
+        result = Table(schema, schema.empty())
+        for table in tables:
+            for name, values in table.columns.items():
+                result.columns[name].extend(values)
+            result.player_urls.extend(table.player_urls)
+            result.next_url = table.next_url
+        return result
+
+
+def cell_text(cell: lxml.html.HtmlElement) -> str:
+    return WHITESPACE.sub(" ", cell.text_content()).strip()
+
+
+def extract_table(html: str, schema: Schema) -> Table:
+    result = Table(schema, schema.empty())
+    doc = lxml.html.fromstring(html)
+
+    next_link = doc.xpath(NEXT_LINK)
+    if next_link:
+        result.next_url = next_link[0].get("href")
+
+    tables = doc.xpath("//table")
+    if not tables:
+        return result
+    table = tables[0]
+
+    result.player_urls = [link.get("href") for link in table.xpath(PLAYER_LINK)]
+    for tr in table.xpath(".//tr[td]"):
+        cells = [cell_text(td) for td in tr.xpath("./td")]
+        if schema.drop_blank and not cells[0]:
+            continue
+        for (name, convert), text in zip(schema.columns, cells):
+            result.columns[name].append(convert(text))
+    return result
+
+
+PASSING = Schema(
+    "passing",
+    [
+        ("player", to_str),
+        ("pass_yds", to_int),
+        ("yds_att", to_float),
+        ("att", to_int),
+        ("cmp", to_int),
+        ("cmp_pct", to_float),
+        ("td", to_int),
+        ("int", to_int),
+        ("rate", to_float),
+        ("first", to_int),
+        ("first_pct", to_float),
+        ("twenty_plus", to_int),
+        ("forty_plus", to_int),
+        ("lng", to_int),
+        ("sck", to_int),
+        ("scky", to_int),
+    ],
+)
+
+RUSHING = Schema(
+    "rushing",
+    [
+        ("player", to_str),
+        ("rush_yds", to_int),
+        ("att", to_int),
+        ("td", to_int),
+        ("twenty_plus", to_int),
+        ("forty_plus", to_int),
+        ("lng", to_int),
+        ("rush_first", to_int),
+        ("rush_first_pct", to_float),
+        ("rush_fum", to_int),
+    ],
+)
+
+RECEIVING = Schema(
+    "receiving",
+    [
+        ("player", to_str),
+        ("rec", to_int),
+        ("yds", to_int),
+        ("td", to_int),
+        ("twenty_plus", to_int),
+        ("forty_plus", to_int),
+        ("lng", to_int),
+        ("rec_first", to_int),
+        ("first_pct", to_float),
+        ("rec_fum", to_int),
+        ("rec_yac_r", to_int),
+        ("tgts", to_int),
+    ],
+)
+
+FIELD_GOALS = Schema(
+    "field-goals",
+    [
+        ("player", to_str),
+        ("fgm", to_int),
+        ("att", to_int),
+        ("fg_pct", to_float),
+        ("one_nineteen_a_m", to_str),
+        ("twenty_twentynine_a_m", to_str),
+        ("thirty_thirtynine_a_m", to_str),
+        ("forty_fortynine_a_m", to_str),
+        ("fifty_fiftynine_a_m", to_str),
+        ("sixty_plus_a_m", to_str),
+        ("lng", to_int),
+        ("fg_blk", to_int),
+    ],
+)
+
+DEFENSE_PASSING = Schema(
+    "defense-passing",
+    [
+        ("team", to_str),
+        ("attempts", to_int),
+        ("completions", to_int),
+        ("completion_percentage", to_float),
+        ("yds_att", to_float),
+        ("yards", to_int),
+        ("touchdowns", to_int),
+        ("interceptions", to_int),
+        ("first_downs", to_int),
+        ("first_down_percentage", to_float),
+        ("sacks", to_int),
+    ],
+    drop_blank=False,
+)
+
+GAMELOG = Schema(
+    "gamelog",
+    [
+        ("week", to_int),
+        ("opponent", to_str),
+        ("game_result", to_str),
+        ("pass_completions", to_int),
+        ("pass_attempts", to_int),
+        ("pass_yards", to_int),
+        ("pass_avg", to_float),
+        ("pass_touchdowns", to_int),
+        ("interceptions", to_int),
+        ("sacks", to_int),
+        ("sack_yards", to_int),
+        ("rating", to_float),
+        ("rush_attempts", to_int),
+        ("rush_yards", to_int),
+        ("rush_avg", to_float),
+        ("rush_touchdowns", to_int),
+        ("fumbles", to_int),
+        ("fumbles_lost", to_int),
+    ],
+    drop_blank=False,
+)
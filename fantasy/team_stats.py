@@ -1,55 +1,63 @@
 import logging
 from dataclasses import dataclass
-from typing import Iterable
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from db import DefensePassingStats
+from categories import CATEGORIES, DEFENSE, StatCategory
+from etl_state import Watermarks
+from fetcher import Fetcher
+from loader import Loader, UpsertLoader
+from metrics import metrics
+from parsing import PageParser
+from records import Records
+from tables import Table
 
 
 @dataclass
 class TeamService:
     root_url: str
-
-    def __init__(self, root_url: str) -> None:
+    fetcher: Fetcher
+    loader: Loader
+    watermarks: Watermarks
+    parser: PageParser
+
+    def __init__(
+        self,
+        root_url: str,
+        fetcher: Fetcher,
+        loader: Loader,
+        watermarks: Watermarks,
+        parser: PageParser,
+    ) -> None:
         self.root_url = root_url
+        self.fetcher = fetcher
+        self.loader = loader
+        self.watermarks = watermarks
+        self.parser = parser
 
     def run_pass(self, start_yr: int, end_yr: int) -> None:
-        to_create = list(self.fetch_passing(start_yr, end_yr))
-        DefensePassingStats.bulk_create(to_create)
-
-    def fetch_passing(self, start_yr: int, end_yr: int) -> Iterable[DefensePassingStats]:
         for year in range(start_yr, end_yr):
-            stats = self.fetch_defense_stats("passing", year)
-            for row in stats.values.tolist():
-                yield DefensePassingStats(
-                    team=row[0][: int(len(row[0]) / 2)],
-                    year=year,
-                    attempts=row[1],
-                    completions=row[2],
-                    completion_percentage=row[3],
-                    yds_att=row[4],
-                    yards=row[5],
-                    touchdowns=row[6],
-                    interceptions=row[7],
-                    first_downs=row[8],
-                    first_down_percentage=row[9],
-                    sacks=row[10],
-                )
-
-    def fetch_defense_stats(self, category: str, year: int) -> pd.DataFrame:
-        logging.info(f"Fetching NFL {year} Team Stats for category: {category}")
-        url = self.root_url + "/stats/team-stats/defense/" + category + "/" + str(year) + "/reg/all"
-        resp = requests.get(url)
-        assert resp.ok, f"Request error: {resp.status_code!r} - {resp.content!r}"
-        soup = BeautifulSoup(resp.text, features="html.parser")
-
-        table = soup.find("table")
-        df = pd.read_html(str(table))[0]
-        df = df.fillna(0)
-        return df
+            self.run_category(CATEGORIES[(DEFENSE, "passing")], year)
+
+    def run_category(self, category: StatCategory, year: int) -> None:
+        if self.watermarks.is_done(category.key, "0", year):
+            return
+        stats = self.fetch_defense_stats(category, year)
+        metrics.inc("nfl_rows_total", len(stats), category=category.key, season=year)
+        with metrics.timer("nfl_db_write_seconds", category=category.key, season=year):
+            self.loader.load(category.model, self.team_stats(category, stats, year))
+        self.watermarks.complete(category.key, "0", year)
+
+    def team_stats(self, category: StatCategory, stats: Table, year: int) -> Records:
+        # the team cell repeats the team name
+        teams = [team[: len(team) // 2] for team in stats.columns["team"]]
+        return Records(category.model, {**stats.columns, "team": teams}, {"year": year})
+
+    def fetch_defense_stats(self, category: StatCategory, year: int) -> Table:
+        logging.info(f"Fetching NFL {year} Team Stats for category: {category.side} {category.name}")
+        html = self.fetcher.get(category.url(self.root_url, year))
+        with metrics.timer("nfl_parse_seconds", category=category.key, season=year):
+            return self.parser.table(html, category.schema)
 
 
 if __name__ == "__main__":
-    TeamService("https://www.nfl.com").run_pass(2022, 2023)
+    service = TeamService("https://www.nfl.com", Fetcher(), UpsertLoader(), Watermarks(), PageParser(0))
+    service.run_pass(2022, 2023)
@@ -0,0 +1,85 @@
+import os
+import sys
+from datetime import date
+from typing import Callable
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# the fantasy modules import each other by their top-level names, as when run from fantasy/, and the
+# benchmarks keep the legacy implementations the tests compare against
+sys.path.insert(0, os.path.join(ROOT, "fantasy"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import seasons  # noqa: E402
+from features import FeatureBuilder  # noqa: E402
+
+
+@pytest.fixture
+def feature_builder() -> FeatureBuilder:
+    # a few games, players and defenses covering the joins and filters of the feature queries
+    return FeatureBuilder(
+        active=pd.DataFrame.from_records(
+            [
+                ("A", 2022, "X", True, 20, 30, 250, 8.3, 100.0),
+                ("A", 2022, "Y", False, 25, 35, 300, 8.6, 110.0),
+                ("A", 2021, "X", None, 15, 25, 200, 8.0, 90.0),
+                # no attempts: not a training row, still part of the season averages
+                ("B", 2022, "Y", True, 10, 0, 0, 0.0, 0.0),
+                ("B", 2022, "X", False, 18, 28, 210, 7.5, 95.0),
+                # not a quarterback, unknown experience, no defense for the season
+                ("C", 2022, "X", True, 5, 6, 70, 11.7, 90.0),
+                ("E", 2022, "X", True, 19, 29, 220, 7.6, 92.0),
+                ("D", 2021, "Y", True, 22, 33, 280, 8.5, 105.0),
+            ],
+            columns=[
+                "name",
+                "season",
+                "opponent",
+                "home",
+                "pass_completions",
+                "pass_attempts",
+                "pass_yards",
+                "pass_avg",
+                "rating",
+            ],
+        ),
+        players=pd.DataFrame.from_records(
+            [
+                ("A", "QB", True, 5, 28),
+                ("B", "QB", True, 2, 24),
+                ("C", "WR", True, 3, 25),
+                ("D", "QB", False, 10, 35),
+                ("E", "QB", True, None, 30),
+            ],
+            columns=["name", "position", "active", "experience", "age"],
+        ),
+        defense=pd.DataFrame.from_records(
+            [
+                ("X", 2022, 544, 340, 6.5, 34),
+                ("Y", 2022, 510, 306, 7.0, 51),
+                ("X", 2021, 527, 357, 6.0, 17),
+            ],
+            columns=["team", "year", "attempts", "completions", "yds_att", "sacks"],
+        ),
+        passing=pd.DataFrame.from_records(
+            [("A", 2022, 105.5), ("A", 2022, 99.0), ("B", 2022, 88.0), ("D", 2022, 70.0)],
+            columns=["player", "year", "rate"],
+        ),
+    )
+
+
+@pytest.fixture
+def pin_today(monkeypatch: pytest.MonkeyPatch) -> Callable[[date], None]:
+    # the date the season helpers see, e.g. during the season or the offseason
+    def pin(day: date) -> None:
+        class Today(date):
+            @classmethod
+            def today(cls) -> "Today":
+                return cls(day.year, day.month, day.day)
+
+        monkeypatch.setattr(seasons, "date", Today)
+
+    return pin
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import features
+import numpy as np
+import pytest
+from backends import FEATURE_COLUMNS, LocalBackend
+from features import FeatureBuilder, to_matrix
+
+
+def test_local_backend_round_trip(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, feature_builder: FeatureBuilder
+) -> None:
+    # trains on the in-memory frames instead of reading the database
+    monkeypatch.setattr(
+        features.FeatureBuilder, "load", classmethod(lambda cls, years=None: feature_builder)
+    )
+    rows = to_matrix(feature_builder.training_frame(), FEATURE_COLUMNS)
+    assert len(rows)
+
+    trained = LocalBackend(str(tmp_path))
+    assert trained.version() is None
+    trained.train()
+    version = trained.version()
+    assert version is not None and len(version) == 32
+
+    loaded = LocalBackend(str(tmp_path))
+    assert loaded.version() == version
+    expected = trained.predict(rows)
+    assert np.isfinite(expected).all()
+    np.testing.assert_allclose(loaded.predict(rows), expected)
+
+
+def test_local_backend_needs_a_model(tmp_path: Path) -> None:
+    with pytest.raises(AssertionError, match="train the local backend first"):
+        LocalBackend(str(tmp_path)).predict(np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32))
@@ -0,0 +1,110 @@
+import contextlib
+from typing import Any, Dict, Iterator, List, Tuple
+
+import daos
+import pytest
+from daos import Dao
+from feature_cache import FeatureCache
+from feature_store import RefreshResult
+
+
+class StubCursor:
+    def fetchall(self) -> List[Tuple[str]]:
+        return [("nfl_passing_yards",)]
+
+
+class StubDatabase:
+    # feature hashes written inside a transaction are rolled back with it, as in Postgres
+    def __init__(self) -> None:
+        self.hashes: Dict[str, str] = {}
+        self.features = "v1"
+        self.failures = 0
+        self.trained = 0
+
+    @contextlib.contextmanager
+    def atomic(self) -> Iterator[None]:
+        saved = dict(self.hashes)
+        try:
+            yield
+        except Exception:
+            self.hashes = saved
+            raise
+
+    @contextlib.contextmanager
+    def execute_sql(self, sql: str, params: Any = None) -> Iterator[StubCursor]:
+        assert "pgml.train" in sql
+        if self.failures:
+            self.failures -= 1
+            raise TimeoutError("canceling statement due to statement timeout")
+        self.trained += 1
+        yield StubCursor()
+
+    def refresh(self) -> RefreshResult:
+        changed = self.hashes.get("A") != self.features
+        self.hashes["A"] = self.features
+        return RefreshResult(players=int(changed))
+
+
+@pytest.fixture
+def database(monkeypatch: pytest.MonkeyPatch) -> StubDatabase:
+    database = StubDatabase()
+    monkeypatch.setattr(daos, "FeatureStore", lambda: database)
+    monkeypatch.setattr(daos.db, "atomic", database.atomic)
+    monkeypatch.setattr(daos.db, "execute_sql", database.execute_sql)
+    return database
+
+
+def test_training_is_skipped_until_features_change(database: StubDatabase) -> None:
+    dao = Dao()
+    dao.train_passing_yds()
+    dao.train_passing_yds()
+    assert database.trained == 1
+    database.features = "v2"
+    dao.train_passing_yds()
+    assert database.trained == 2
+
+
+def test_force_trains_on_unchanged_features(database: StubDatabase) -> None:
+    dao = Dao()
+    dao.train_passing_yds()
+    dao.train_passing_yds(force=True)
+    assert database.trained == 2
+
+
+def test_a_failed_training_run_is_retried(database: StubDatabase) -> None:
+    dao = Dao()
+    database.failures = 1
+    with pytest.raises(TimeoutError):
+        dao.train_passing_yds()
+    # the refreshed hashes were rolled back with the failed run
+    assert database.hashes == {}
+    dao.train_passing_yds()
+    assert database.trained == 1
+    assert database.hashes == {"A": "v1"}
+
+
+class CountingDao(Dao):
+    def __init__(self) -> None:
+        self.loads: List[int] = []
+
+    def load_player_active_stats(self, year: int) -> Dict[str, Dict[str, Any]]:
+        self.loads.append(year)
+        stats = {"A": {"name": "A", "year": year, "pass_attempts": 30.0}}
+        daos.feature_cache.put_all(daos.PLAYER, year, stats)
+        return stats
+
+
+def test_unknown_players_are_looked_up_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(daos, "feature_cache", FeatureCache())
+    dao = CountingDao()
+    for _ in range(3):
+        with pytest.raises(AssertionError, match="No active stats for Nobody in 2023"):
+            dao.get_player_active_stats("Nobody", 2023)
+    assert dao.get_player_active_stats("A", 2023)["pass_attempts"] == 30.0
+    assert dao.loads == [2023]
+
+    # loading the table again forgets the miss
+    daos.feature_cache.invalidate("active_stats")
+    with pytest.raises(AssertionError):
+        dao.get_player_active_stats("Nobody", 2023)
+    assert dao.loads == [2023, 2023]
@@ -0,0 +1,29 @@
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+from db import EtlState
+from etl_state import Watermarks
+
+
+def state(year: int, age: timedelta) -> EtlState:
+    return EtlState(category="passing", key="0", year=year, completed_at=datetime.now() - age)
+
+
+def test_the_season_in_progress_is_live(pin_today: Callable[[date], None]) -> None:
+    pin_today(date(2024, 10, 1))
+    watermarks = Watermarks()
+    assert watermarks.season == 2024
+    assert not watermarks.is_final(2024) and watermarks.is_final(2023)
+    # units of the live season go stale, the finished ones never do
+    assert watermarks.is_fresh(state(2024, timedelta(hours=1)))
+    assert not watermarks.is_fresh(state(2024, timedelta(days=1)))
+    assert watermarks.is_fresh(state(2023, timedelta(days=365)))
+
+
+def test_the_season_just_played_stays_live_until_the_next_kicks_off(
+    pin_today: Callable[[date], None],
+) -> None:
+    pin_today(date(2025, 8, 31))
+    watermarks = Watermarks()
+    assert watermarks.season == 2024
+    assert not watermarks.is_fresh(state(2024, timedelta(days=1)))
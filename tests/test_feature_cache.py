@@ -0,0 +1,81 @@
+import feature_cache
+import pytest
+from feature_cache import DEFENSE, INFO, MISSING, PLAYER, FeatureCache
+
+
+def filled() -> FeatureCache:
+    cache = FeatureCache()
+    cache.put_all(PLAYER, 2023, {"A": {"pass_attempts": 30.0}, "B": {"pass_attempts": 25.0}})
+    cache.put_all(DEFENSE, 2023, {"KC": {"avg_sacks": 2.0}})
+    cache.put_all(INFO, 2023, {"A": {"age": 27}})
+    return cache
+
+
+def test_hits_and_misses() -> None:
+    cache = filled()
+    assert cache.get(PLAYER, "A", 2023) == {"pass_attempts": 30.0}
+    assert cache.get(PLAYER, "A", 2022) is None
+    assert cache.stats() == {"entries": 4, "hits": 1, "misses": 1}
+
+
+def test_writes_invalidate_only_the_entities_they_feed() -> None:
+    cache = filled()
+    cache.invalidate("active_stats")
+    assert cache.get(PLAYER, "A", 2023) is None and cache.get(PLAYER, "B", 2023) is None
+    assert cache.get(DEFENSE, "KC", 2023) is not None
+    assert cache.get(INFO, "A", 2023) is not None
+
+    cache.invalidate("defense_passing_stats")
+    assert cache.get(DEFENSE, "KC", 2023) is None
+    cache.invalidate("players")
+    assert cache.get(INFO, "A", 2023) is None
+
+
+def test_unrelated_tables_keep_the_cache() -> None:
+    cache = filled()
+    cache.invalidate("rushing_stats")
+    assert cache.stats()["entries"] == 4
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache = FeatureCache(max_entries=2)
+    cache.put_all(PLAYER, 2023, {"A": {}, "B": {}})
+    cache.get(PLAYER, "A", 2023)
+    cache.put_all(PLAYER, 2023, {"C": {}})
+    assert cache.get(PLAYER, "B", 2023) is None
+    assert cache.get(PLAYER, "A", 2023) == {} and cache.get(PLAYER, "C", 2023) == {}
+
+
+def test_clear() -> None:
+    cache = filled()
+    cache.get(PLAYER, "A", 2023)
+    cache.clear()
+    assert cache.stats() == {"entries": 0, "hits": 0, "misses": 0}
+
+
+def test_entries_expire_after_the_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    # another process loading the tables can't invalidate this cache, old entries are reloaded instead
+    now = [1000.0]
+    monkeypatch.setattr(feature_cache.time, "monotonic", lambda: now[0])
+    cache = FeatureCache(ttl=60)
+    cache.put_all(PLAYER, 2023, {"A": {"pass_attempts": 30.0}})
+    now[0] += 59
+    assert cache.get(PLAYER, "A", 2023) == {"pass_attempts": 30.0}
+    now[0] += 2
+    assert cache.get(PLAYER, "A", 2023) is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1}
+
+    forever = FeatureCache(ttl=None)
+    forever.put_all(PLAYER, 2023, {"A": {}})
+    now[0] += 365 * 24 * 60 * 60
+    assert forever.get(PLAYER, "A", 2023) == {}
+
+
+def test_unknown_names_are_cached_as_missing() -> None:
+    cache = filled()
+    cache.put_missing(PLAYER, 2023, "Nobody")
+    assert cache.get(PLAYER, "Nobody", 2023) is MISSING
+    assert cache.stats() == {"entries": 5, "hits": 1, "misses": 0}
+    # the player's rows may have just been loaded
+    cache.invalidate("active_stats")
+    assert cache.get(PLAYER, "Nobody", 2023) is None
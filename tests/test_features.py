@@ -0,0 +1,53 @@
+from typing import Any, List
+
+import numpy as np
+from columns import PREDICTION_COLUMNS, TRAINING_COLUMNS
+from features import FeatureBuilder
+from seasons import last_completed_season
+
+
+def assert_same_rows(actual: np.ndarray, expected: List[List[Any]]) -> None:
+    # merges don't keep row order, compare the rows sorted
+    assert actual.dtype == np.float32 and actual.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(sorted(actual.tolist()), sorted(expected), rtol=1e-6)
+
+
+def test_training_matrix(feature_builder: FeatureBuilder) -> None:
+    matrix = feature_builder.training_matrix()
+    assert matrix.shape == (4, len(TRAINING_COLUMNS))
+    # each game with the defense of its own season, per game averages over 17 games
+    assert_same_rows(
+        matrix,
+        [
+            [28, 5, 30, 20, 250, 8.3, 100, 1, 0, 32, 20, 6.5, 2],
+            [28, 5, 35, 25, 300, 8.6, 110, 0, 1, 30, 18, 7.0, 3],
+            [28, 5, 25, 15, 200, 8.0, 90, 0, 1, 31, 21, 6.0, 1],
+            [24, 2, 28, 18, 210, 7.5, 95, 0, 1, 32, 20, 6.5, 2],
+        ],
+    )
+
+
+def test_prediction_matrix(feature_builder: FeatureBuilder) -> None:
+    frame = feature_builder.prediction_frame(2022)
+    assert sorted(map(tuple, frame[["name", "opponent", "is_home_game"]].values.tolist())) == sorted(
+        (name, team, home) for name in "AB" for team in "XY" for home in (True, False)
+    )
+
+    # ages and experience are rolled back to the predicted season
+    diff = last_completed_season() - 2022
+    expected = []
+    for age, experience, attempts, completions, avg, rating in [
+        (28, 5, 32.5, 22.5, 8.45, 105.5),
+        (24, 2, 14.0, 14.0, 3.75, 88.0),
+    ]:
+        for defense in ([32, 20, 6.5, 2], [30, 18, 7.0, 3]):
+            for home in (1, 0):
+                row = [age - diff, experience - diff, attempts, completions, avg, rating, home, 1 - home]
+                expected.append(row + defense)
+    matrix = feature_builder.prediction_matrix(2022)
+    assert matrix.shape == (8, len(PREDICTION_COLUMNS))
+    assert_same_rows(matrix, expected)
+
+
+def test_no_games_no_rows(feature_builder: FeatureBuilder) -> None:
+    assert feature_builder.prediction_matrix(2019).shape == (0, len(PREDICTION_COLUMNS))
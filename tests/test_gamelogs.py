@@ -0,0 +1,99 @@
+from datetime import date
+from typing import Any, Callable, Dict, List, Tuple
+
+import etl_state
+import gamelogs
+import pytest
+from db import ActiveStats
+from gamelogs import GameLogStore
+from parsing import PageParser
+from player_info import PlayerService
+from records import Records
+from tables import GAMELOG
+
+
+def gamelog(weeks: List[int]) -> str:
+    # the /stats/ page of a quarterback, one row per game
+    rows = "".join(
+        f"<tr><td>{week}</td><td>@KC</td><td>W 27-20</td>"
+        + "".join("<td>1</td>" for _ in GAMELOG.columns[3:])
+        + "</tr>"
+        for week in weeks
+    )
+    return f"<table>{rows}</table>"
+
+
+class StubFetcher:
+    def __init__(self, html: str) -> None:
+        self.html = html
+        self.urls: List[str] = []
+
+    def get(self, url: str) -> str:
+        self.urls.append(url)
+        return self.html
+
+
+class StubLoader:
+    def __init__(self) -> None:
+        self.loaded: List[Records] = []
+
+    def load(self, model: Any, records: Records) -> int:
+        self.loaded.append(records)
+        return len(records)
+
+
+@pytest.fixture
+def partitions(monkeypatch: pytest.MonkeyPatch) -> List[int]:
+    created: List[int] = []
+    monkeypatch.setattr(gamelogs.ActiveStats, "ensure_partition", created.append)
+    monkeypatch.setattr(etl_state.Watermarks, "is_done", lambda self, category, key, year: False)
+    monkeypatch.setattr(etl_state.Watermarks, "complete", lambda self, category, key, year: None)
+    return created
+
+
+def run_gamelog(
+    latest: Dict[str, Tuple[int, int]], weeks: List[int]
+) -> Tuple[StubFetcher, StubLoader, GameLogStore]:
+    store = GameLogStore()
+    store.latest, store.loaded = dict(latest), True
+    fetcher, loader = StubFetcher(gamelog(weeks)), StubLoader()
+    service = PlayerService("", fetcher, PageParser(0), loader, gamelogs=store)  # type: ignore[arg-type]
+    service.run_gamelog("A", "/players/a/")
+    return fetcher, loader, store
+
+
+def test_the_season_in_progress_is_appended(
+    pin_today: Callable[[date], None], partitions: List[int]
+) -> None:
+    # a week into the 2024 season, only the 2023 season is loaded
+    pin_today(date(2024, 9, 12))
+    fetcher, loader, store = run_gamelog({"A": (2023, 18)}, [1])
+    assert fetcher.urls[0].endswith("/stats/")
+    [records] = loader.loaded
+    assert records.model is ActiveStats
+    assert list(records.column("season")) == [2024] and list(records.column("week")) == [1]
+    assert partitions == [2024]
+    assert store.latest["A"] == (2024, 1)
+
+
+def test_only_weeks_after_the_latest_loaded_are_appended(
+    pin_today: Callable[[date], None], partitions: List[int]
+) -> None:
+    pin_today(date(2024, 9, 30))
+    _, loader, store = run_gamelog({"A": (2024, 2)}, [1, 2, 3, 4])
+    [records] = loader.loaded
+    assert list(records.column("week")) == [3, 4]
+    assert set(records.column("season")) == {2024}
+    assert store.latest["A"] == (2024, 4)
+
+    _, loader, _ = run_gamelog({"A": (2024, 4)}, [1, 2, 3, 4])
+    assert loader.loaded == []
+
+
+def test_the_offseason_belongs_to_the_season_just_played(
+    pin_today: Callable[[date], None], partitions: List[int]
+) -> None:
+    pin_today(date(2025, 2, 1))
+    _, loader, _ = run_gamelog({}, [17, 18])
+    [records] = loader.loaded
+    assert set(records.column("season")) == {2024}
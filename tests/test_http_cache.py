@@ -0,0 +1,80 @@
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import pytest
+from http_cache import DEFAULT_PLAYER_TTL, CachedResponse, ResponseCache, classify
+
+ROOT = "https://www.nfl.com"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            ROOT + "/stats/player-stats/category/passing/2021/reg/all/passingyards/desc",
+            ("listing", 2021),
+        ),
+        (ROOT + "/stats/team-stats/defense/passing/2023/reg/all", ("listing", 2023)),
+        (
+            ROOT + "/stats/player-stats/category/passing/2021/reg/all/passingyards/desc?aftercursor=x",
+            ("listing", 2021),
+        ),
+        (ROOT + "/players/patrick-mahomes/", ("player", None)),
+        (ROOT + "/players/patrick-mahomes", ("player", None)),
+        # the scraper appends /stats/ to a player url that already ends in a slash
+        (ROOT + "/players/patrick-mahomes//stats/", ("gamelog", None)),
+        (ROOT + "/players/patrick-mahomes/stats/", ("gamelog", None)),
+        (ROOT + "/teams/kansas-city-chiefs/", ("other", None)),
+    ],
+)
+def test_classify(url: str, expected: Tuple[str, Optional[int]]) -> None:
+    assert classify(url) == expected
+
+
+def test_ttls(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path), season=2023)
+    # finished seasons never change, the current one, game logs and anything else always revalidate
+    assert (
+        cache.ttl(ROOT + "/stats/player-stats/category/passing/2022/reg/all/passingyards/desc") is None
+    )
+    assert cache.ttl(ROOT + "/stats/player-stats/category/passing/2023/reg/all/passingyards/desc") == 0
+    assert cache.ttl(ROOT + "/players/patrick-mahomes/") == DEFAULT_PLAYER_TTL
+    assert cache.ttl(ROOT + "/players/patrick-mahomes//stats/") == 0
+    assert cache.ttl(ROOT + "/teams/kansas-city-chiefs/") == 0
+
+
+def test_ttls_in_season(tmp_path: Path, pin_today: Callable[[date], None]) -> None:
+    # from the September kickoff the new season's listings change daily, last season's are final
+    pin_today(date(2024, 10, 6))
+    cache = ResponseCache(str(tmp_path))
+    assert cache.ttl(ROOT + "/stats/team-stats/defense/passing/2024/reg/all") == 0
+    assert cache.ttl(ROOT + "/stats/team-stats/defense/passing/2023/reg/all") is None
+
+    pin_today(date(2025, 3, 1))
+    cache = ResponseCache(str(tmp_path))
+    assert cache.ttl(ROOT + "/stats/team-stats/defense/passing/2024/reg/all") == 0
+
+
+def test_freshness(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path), player_ttl=60, season=2023)
+    old = time.time() - 120
+    final = CachedResponse(ROOT + "/stats/team-stats/defense/passing/2022/reg/all", "", None, None, old)
+    player = CachedResponse(ROOT + "/players/patrick-mahomes/", "", None, None, old)
+    gamelog = CachedResponse(ROOT + "/players/patrick-mahomes//stats/", "", None, None, time.time())
+    assert cache.is_fresh(final)
+    assert not cache.is_fresh(player)
+    cache.touch(player)
+    assert cache.is_fresh(player)
+    assert not cache.is_fresh(gamelog)
+
+
+def test_store_and_load(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path))
+    url = ROOT + "/players/patrick-mahomes/"
+    assert cache.load(url) is None
+    cache.store(url, "<html></html>", '"abc"', None)
+    entry = cache.load(url)
+    assert entry is not None and entry.body == "<html></html>"
+    assert cache.validators(entry) == {"If-None-Match": '"abc"'}
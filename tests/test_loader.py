@@ -0,0 +1,103 @@
+import os
+from typing import Any, Dict, Iterator
+
+import pytest
+from db import DefensePassingStats, db
+from db.migrations import migrate
+from feature_cache import DEFENSE, feature_cache
+from loader import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_COPY_CHUNK_SIZE,
+    CopyLoader,
+    Loader,
+    UpsertLoader,
+    chunks,
+    make_loader,
+    unique_values,
+)
+from records import Records
+
+# a scratch database, every test's rows are rolled back
+TEST_DATABASE_URL_ENV: str = "FANTASY_TEST_DATABASE_URL"
+DSN = os.environ.get(TEST_DATABASE_URL_ENV)
+
+needs_database = pytest.mark.skipif(DSN is None, reason=f"${TEST_DATABASE_URL_ENV} is not set")
+
+
+def defense(team: str, year: int, sacks: int) -> Dict[str, Any]:
+    return {
+        "team": team,
+        "year": year,
+        "attempts": 500,
+        "completions": 320,
+        "completion_percentage": 64.0,
+        "yds_att": 6.5,
+        "yards": 3250,
+        "touchdowns": 20,
+        "interceptions": 12,
+        "first_downs": 180,
+        "first_down_percentage": 36.0,
+        "sacks": sacks,
+    }
+
+
+def test_chunks() -> None:
+    assert list(chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunks([], 2)) == []
+
+
+def test_the_last_row_of_a_key_wins() -> None:
+    rows = list(
+        Records.from_dicts(DefensePassingStats, [defense("X", 2022, 30), defense("X", 2022, 40)])
+    )
+    [row] = unique_values(DefensePassingStats, rows)
+    assert row == rows[1]
+
+
+def test_make_loader() -> None:
+    assert make_loader("upsert") == UpsertLoader(DEFAULT_CHUNK_SIZE)
+    assert make_loader("copy") == CopyLoader(DEFAULT_COPY_CHUNK_SIZE)
+    assert make_loader("copy", 10) == CopyLoader(10)
+    with pytest.raises(AssertionError, match="Unknown loader"):
+        make_loader("insert")
+
+
+@pytest.fixture
+def database() -> Iterator[None]:
+    db.configure(DSN)
+    migrate()
+    with db.atomic() as txn:
+        yield
+        txn.rollback()
+    db.close()
+
+
+def stored_sacks() -> Dict[str, int]:
+    query = DefensePassingStats.select().where(DefensePassingStats.year == 1900)
+    return {row.team: row.sacks for row in query}
+
+
+def round_trip(loader: Loader) -> None:
+    # more rows than a chunk, a key repeated within a chunk, then the same keys loaded again
+    teams = [f"Team {i}" for i in range(5)]
+    first = [defense("Team 0", 1900, 11)] + [defense(team, 1900, 10) for team in teams]
+    assert loader.load(DefensePassingStats, Records.from_dicts(DefensePassingStats, first)) == 5
+    assert stored_sacks() == {team: 10 for team in teams}
+
+    feature_cache.put_all(DEFENSE, 1900, {"Team 0": {"avg_sacks": 0.6}})
+    second = [defense(team, 1900, 20) for team in teams[:3]]
+    assert loader.load(DefensePassingStats, Records.from_dicts(DefensePassingStats, second)) == 3
+    assert stored_sacks() == {**{team: 20 for team in teams[:3]}, **{team: 10 for team in teams[3:]}}
+    # the write made the cached defense features stale
+    assert feature_cache.get(DEFENSE, "Team 0", 1900) is None
+
+
+@needs_database
+def test_upsert_loader_round_trip(database: None) -> None:
+    round_trip(UpsertLoader(chunk_size=2))
+
+
+@needs_database
+def test_copy_loader_round_trip(database: None) -> None:
+    # the chunks share the staging table inside the test's transaction, where ON COMMIT never fires
+    round_trip(CopyLoader(chunk_size=2))
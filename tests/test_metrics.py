@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+from metrics import Histogram, Metrics
+
+
+def test_counters_render_with_sorted_labels() -> None:
+    metrics = Metrics()
+    metrics.inc("nfl_requests_total", source="network", cached=False)
+    metrics.inc("nfl_requests_total", 2, source="network", cached=False)
+    metrics.inc("nfl_requests_total", source=None)
+    lines = metrics.to_prometheus().splitlines()
+    assert lines == [
+        "# HELP nfl_requests_total Pages requested, by where the body came from",
+        "# TYPE nfl_requests_total counter",
+        'nfl_requests_total{cached="False",source="network"} 3',
+        'nfl_requests_total{source=""} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    metrics = Metrics({"nfl_parse_seconds": (0.1, 1.0)})
+    for value in (0.05, 0.1, 0.5, 2.0):
+        metrics.observe("nfl_parse_seconds", value, page="team")
+    lines = metrics.to_prometheus().splitlines()
+    assert lines[1] == "# TYPE nfl_parse_seconds histogram"
+    assert lines[2:] == [
+        'nfl_parse_seconds_bucket{page="team",le="0.1"} 2',
+        'nfl_parse_seconds_bucket{page="team",le="1"} 3',
+        'nfl_parse_seconds_bucket{page="team",le="+Inf"} 4',
+        'nfl_parse_seconds_sum{page="team"} 2.65',
+        'nfl_parse_seconds_count{page="team"} 4',
+    ]
+
+
+def test_quantile_is_the_bucket_upper_bound() -> None:
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(0.99) is None
+
+
+def test_summary_and_write(tmp_path: Path) -> None:
+    metrics = Metrics()
+    metrics.inc("nfl_rows_total", 100, table="passing")
+    metrics.observe("nfl_db_write_seconds", 0.5, table="passing")
+    with metrics.timer("nfl_parse_seconds"):
+        pass
+    summary = metrics.summary()
+    assert summary["counters"]["nfl_rows_total"] == [{"labels": {"table": "passing"}, "value": 100}]
+    assert summary["histograms"]["nfl_parse_seconds"][0]["count"] == 1
+    assert summary["db_rows_per_second"] == [{"labels": {"table": "passing"}, "value": 200.0}]
+
+    metrics.write(str(tmp_path / "metrics"), "scrape")
+    assert (tmp_path / "metrics" / "scrape.prom").read_text() == metrics.to_prometheus()
+    written = json.loads((tmp_path / "metrics" / "scrape_summary.json").read_text())
+    assert written["counters"] == summary["counters"]
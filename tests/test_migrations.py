@@ -0,0 +1,43 @@
+import os
+import re
+
+import pytest
+from db import migrations
+
+SCHEMA_PATH = os.path.join(os.path.dirname(migrations.__file__), "schema.sql")
+
+# the last migration to create each relation, a fully migrated database must match a fresh install
+LATEST = {
+    "etl_state": migrations.ETL_STATE_V3,
+    "nfl_features": migrations.NFL_FEATURES_V4,
+    "feature_hashes": migrations.FEATURE_HASHES_V4,
+    "features": migrations.FEATURES_V4,
+    "pipeline_state": migrations.PIPELINE_STATE_V5,
+    "active_stats": migrations.ACTIVE_STATS_V6,
+    "nfl_feature_rows": migrations.NFL_FEATURE_ROWS_V6,
+    "feature_rows": migrations.FEATURE_ROWS_V6,
+}
+
+
+def schema_section(name: str) -> str:
+    # the DDL under a "-- Name: <name>;" header in schema.sql
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        schema = f.read()
+    match = re.search(rf"^-- Name: {re.escape(name)};.*?\n--\n(.*?)(?=^--\n|\Z)", schema, re.M | re.S)
+    assert match is not None, f"No {name} section in {SCHEMA_PATH}"
+    return match.group(1)
+
+
+def normalized(ddl: str) -> str:
+    return " ".join(ddl.split())
+
+
+@pytest.mark.parametrize("name", sorted(LATEST))
+def test_latest_migration_matches_schema(name: str) -> None:
+    assert normalized(LATEST[name]) == normalized(schema_section(name))
+
+
+def test_game_logs_keep_their_seasons() -> None:
+    # only season_game_logs may key active_stats, by then every game log has its season
+    assert "active_stats" not in [table for table, _, _ in migrations.PRIMARY_KEYS]
+    assert "season" not in migrations.GAME_LOG_COLUMNS_V6
@@ -0,0 +1,23 @@
+from datetime import date
+from typing import Any, Callable, List, Tuple
+
+import pytest
+from nfl import NFLStatsEtl
+
+
+def test_refresh_runs_the_season_in_progress(
+    pin_today: Callable[[date], None], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pin_today(date(2024, 9, 15))
+    runs: List[Tuple[Any, ...]] = []
+    etl = NFLStatsEtl(cache_dir=None, metrics_dir=None, parse_workers=0)
+    monkeypatch.setattr(etl, "run", lambda *args, **kwargs: runs.append((*args, kwargs)))
+    etl.refresh()
+    assert runs == [(2024, 2025, {"gamelogs": True})]
+
+
+def test_the_season_in_progress_is_scheduled_first(pin_today: Callable[[date], None]) -> None:
+    pin_today(date(2024, 11, 1))
+    etl = NFLStatsEtl(cache_dir=None, metrics_dir=None, parse_workers=0)
+    years = [job.year for job in etl.jobs(2022, 2025, ["passing"])]
+    assert years == [2024, 2023, 2022]
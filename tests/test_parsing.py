@@ -0,0 +1,70 @@
+import os
+from typing import Any, Dict
+
+import pytest
+from bench_parse import legacy_player
+from bench_tables import FIXTURES
+from db import PlayerInfo
+from pages import player_page
+from parsing import PageParser, parse_player_page, to_fraction, to_inches
+from synthetic import generate
+from tables import PASSING, extract_table
+
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name + ".html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def legacy_fields(html: str) -> Dict[str, Any]:
+    # the fields the bs4 parser read, arms and hands were added with the lxml one
+    expected = legacy_player(html)
+    actual = parse_player_page(html)
+    return {key: actual[key] for key in expected}
+
+
+@pytest.mark.parametrize("name", ["player", "player-retired"])
+def test_player_page_matches_legacy(name: str) -> None:
+    html = fixture(name)
+    assert legacy_fields(html) == legacy_player(html)
+
+
+def test_player_page_values() -> None:
+    active = parse_player_page(fixture("player"))
+    # the team link carries more than one class
+    assert active["team"] == "Kansas City Chiefs"
+    assert (active["position"], active["height"], active["arms"], active["hands"]) == (
+        "QB",
+        74,
+        33.25,
+        9.25,
+    )
+
+    retired = parse_player_page(fixture("player-retired"))
+    assert (retired["active"], retired["team"]) == (False, None)
+    assert (retired["arms"], retired["age"]) == (None, None)
+
+
+def test_synthetic_player_pages_match_legacy() -> None:
+    players = list(generate(1).rows(PlayerInfo))[:200]
+    assert {player["active"] for player in players} == {True, False}
+    for html in map(player_page, players):
+        assert legacy_fields(html) == legacy_player(html)
+
+
+def test_conversions() -> None:
+    assert to_inches("6-2") == 74
+    assert to_fraction("32 3/4") == 32.75
+    assert to_fraction("9") == 9.0
+
+
+def test_worker_processes_parse_like_the_calling_thread() -> None:
+    pages = [fixture("player"), fixture("player-retired")]
+    table = fixture(PASSING.name)
+    parser = PageParser(1)
+    try:
+        assert parser.players(pages) == [parse_player_page(html) for html in pages]
+        assert parser.table(table, PASSING).columns == extract_table(table, PASSING).columns
+    finally:
+        parser.close()
+    assert parser.pool is None
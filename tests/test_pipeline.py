@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Sequence
+
+import pytest
+from pipeline import FAILED, RAN, SKIPPED, Pipeline, Stage, StageRun
+
+
+class MemoryPipeline(Pipeline):
+    # keeps the fingerprints of the last runs in memory instead of pipeline_state
+    def __init__(self, stages: List[Stage]) -> None:
+        super().__init__(stages, metrics_dir=None)
+        self.fingerprints: Dict[str, Optional[str]] = {}
+
+    def last_fingerprint(self, stage: str) -> Optional[str]:
+        return self.fingerprints.get(stage)
+
+    def record(self, run: StageRun) -> None:
+        self.fingerprints[run.stage] = run.fingerprint
+
+
+class Dag:
+    # scrape -> features -> train, each stage's inputs are what the stage before it produced
+    def __init__(self) -> None:
+        self.source = 1
+        self.rows = 0
+        self.model = 0
+        self.broken = False
+        self.ran: List[str] = []
+        self.pipeline = MemoryPipeline(
+            [
+                Stage("train", self.train, lambda: {"rows": self.rows}, after=("features",)),
+                Stage("features", self.features, lambda: {"source": self.source}, after=("scrape",)),
+                Stage("scrape", lambda: self.ran.append("scrape")),
+            ]
+        )
+
+    def features(self) -> None:
+        self.ran.append("features")
+        self.rows = self.source * 10
+
+    def train(self) -> None:
+        self.ran.append("train")
+        if self.broken:
+            raise RuntimeError("training failed")
+        self.model += 1
+
+    def run(self, force: Sequence[str] = ()) -> Dict[str, str]:
+        self.ran = []
+        return {run.stage: run.status for run in self.pipeline.run(force)}
+
+
+def test_unchanged_stages_are_skipped() -> None:
+    dag = Dag()
+    assert dag.pipeline.order() == ["scrape", "features", "train"]
+    assert dag.run() == {"scrape": RAN, "features": RAN, "train": RAN}
+    # stages without inputs always run, the rest see the same inputs as last time
+    assert dag.run() == {"scrape": RAN, "features": SKIPPED, "train": SKIPPED}
+    assert dag.ran == ["scrape"] and dag.model == 1
+
+
+def test_changed_inputs_run_downstream_stages() -> None:
+    dag = Dag()
+    dag.run()
+    dag.source = 2
+    assert dag.run() == {"scrape": RAN, "features": RAN, "train": RAN}
+    assert dag.model == 2
+
+
+def test_forced_stages_run() -> None:
+    dag = Dag()
+    dag.run()
+    assert dag.run(force=["train"]) == {"scrape": RAN, "features": SKIPPED, "train": RAN}
+
+
+def test_failed_stages_run_again() -> None:
+    dag = Dag()
+    dag.broken = True
+    with pytest.raises(RuntimeError):
+        dag.run()
+    assert [(run.stage, run.status) for run in dag.pipeline.runs][-1] == ("train", FAILED)
+    dag.broken = False
+    assert dag.run() == {"scrape": RAN, "features": SKIPPED, "train": RAN}
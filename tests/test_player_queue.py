@@ -0,0 +1,104 @@
+import contextlib
+import threading
+import time
+from typing import Dict, List, Set
+
+import player_queue
+import pytest
+from player_queue import PlayerQueue
+
+
+class StubIndex:
+    def __init__(self, known: Set[str]) -> None:
+        self.known = known
+        self.loads = 0
+
+    def ensure_loaded(self) -> None:
+        # slow enough for every producer to reach start() while the first is still loading
+        time.sleep(0.05)
+        self.loads += 1
+
+    def is_known(self, slug: str) -> bool:
+        return slug in self.known
+
+
+class StubPlayerService:
+    # loads nothing, players whose gate is closed wait for it and "broken" players fail
+    def __init__(self, known: Set[str] = set()) -> None:
+        self.index = StubIndex(known)
+        self.gates: Dict[str, threading.Event] = {}
+        self.loaded: List[str] = []
+
+    def run(self, player_urls: List[str]) -> None:
+        for player_url in player_urls:
+            if player_url in self.gates:
+                self.gates[player_url].wait()
+            if "broken" in player_url:
+                raise ValueError(player_url)
+            self.loaded.append(player_url)
+
+
+@pytest.fixture(autouse=True)
+def no_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(player_queue.db, "connection_context", contextlib.nullcontext)
+
+
+def test_drain_waits_for_the_callers_players_only() -> None:
+    service = StubPlayerService()
+    gate = service.gates["/players/slow/"] = threading.Event()
+    players = PlayerQueue(service, workers=2, batch_size=1)  # type: ignore
+    try:
+        players.put(["/players/slow/"])
+        players.put(["/players/a/", "/players/b/"])
+        players.drain(["/players/a/", "/players/b/"])
+        assert sorted(service.loaded) == ["/players/a/", "/players/b/"]
+    finally:
+        gate.set()
+        players.close()
+    assert "/players/slow/" in service.loaded
+
+
+def test_known_and_repeated_players_are_queued_once() -> None:
+    service = StubPlayerService(known={"known"})
+    players = PlayerQueue(service, workers=1)  # type: ignore
+    try:
+        players.put(["/players/known/", "/players/a/"])
+        players.put(["/players/a/"])
+        players.drain(["/players/known/", "/players/a/"])
+    finally:
+        players.close()
+    assert service.loaded == ["/players/a/"]
+
+
+def test_failures_reach_their_callers_until_the_next_run() -> None:
+    service = StubPlayerService()
+    players = PlayerQueue(service, workers=1, batch_size=1)  # type: ignore
+    players.put(["/players/broken/", "/players/a/"])
+    with pytest.raises(ValueError):
+        players.drain(["/players/a/", "/players/broken/"])
+    players.drain(["/players/a/"])
+    players.close()
+
+    # a new run retries the player that failed
+    players.put(["/players/broken/"])
+    with pytest.raises(ValueError):
+        players.drain(["/players/broken/"])
+    players.close()
+    assert service.loaded == ["/players/a/"]
+
+
+def test_racing_producers_start_the_pool_once() -> None:
+    service = StubPlayerService()
+    players = PlayerQueue(service, workers=2)  # type: ignore
+    producers = [threading.Thread(target=players.put, args=([f"/players/{i}/"],)) for i in range(4)]
+    try:
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        assert service.index.loads == 1
+        assert len(players.threads) == 2
+        players.drain([f"/players/{i}/" for i in range(4)])
+    finally:
+        players.close()
+    assert sorted(service.loaded) == [f"/players/{i}/" for i in range(4)]
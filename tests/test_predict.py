@@ -0,0 +1,141 @@
+import contextlib
+import threading
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+import numpy as np
+import predict
+import pytest
+from predict import PassingPredictor, RunSummary, round_robin
+
+Matchup = Tuple[str, str, bool]
+
+
+def test_round_robin() -> None:
+    assert round_robin(list(range(7)), 3) == [[0, 3, 6], [1, 4], [2, 5]]
+    # no empty partitions when there are more workers than items
+    assert round_robin(["A"], 4) == [["A"]]
+    assert round_robin([], 4) == []
+
+
+def test_merge() -> None:
+    summary = RunSummary(predicted=3, skipped=1, seconds=2.0)
+    summary.merge(RunSummary(predicted=5, failed=2, seconds=1.5))
+    assert summary == RunSummary(predicted=8, skipped=1, failed=2, seconds=2.0)
+    assert str(summary) == "8 predicted, 1 skipped, 2 failed in 2.00s (4/sec)"
+
+
+class StubDao:
+    def __init__(self) -> None:
+        self.saved: List[Tuple[str, str, bool, float]] = []
+
+    def get_player_info(self, name: str, year: int) -> Dict[str, Any]:
+        return {"age": 30, "experience": 8}
+
+    def get_player_active_stats(self, name: str, year: int) -> Dict[str, Any]:
+        return {"pass_attempts": 30, "pass_completions": 20, "pass_avg": 7.5, "rating": 95.0}
+
+    def get_defense_stats(self, team: str, year: int) -> Dict[str, Any]:
+        return {
+            "avg_pass_att_against": 32,
+            "avg_completions_against": 20,
+            "avg_yds_att_against": 6.5,
+            "avg_sacks": 2,
+        }
+
+    def save_predictions(self, year: int, predictions: List[Tuple[str, str, bool, float]]) -> None:
+        self.saved.extend(predictions)
+
+    def get_player_names(self) -> List[str]:
+        return ["QB 0", "QB 1"]
+
+    def delete_predictions(self, year: int) -> int:
+        deleted = len(self.saved)
+        self.saved = []
+        return deleted
+
+
+class StubBackend:
+    # every partition's thread waits for the others, the run only finishes if they run side by side
+    def __init__(self, partitions: int) -> None:
+        self.threads: Set[str] = set()
+        self.lock = threading.Lock()
+        self.started = threading.Barrier(partitions)
+
+    def predict(self, features: Any) -> Any:
+        name = threading.current_thread().name
+        with self.lock:
+            first = name not in self.threads
+            self.threads.add(name)
+        if first:
+            self.started.wait(timeout=5)
+        return np.full(len(features), 250.0)
+
+
+def test_partitions_run_side_by_side(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(predict.db, "connection_context", contextlib.nullcontext)
+    dao, backend = StubDao(), StubBackend(3)
+    predictor = PassingPredictor(dao, backend, write_batch_size=4)  # type: ignore[arg-type]
+    grid: List[Matchup] = [
+        (f"QB {i}", team, home) for i in range(5) for team in "XY" for home in (True, False)
+    ]
+    summary = predictor.parallel(round_robin(grid, 3), True, 2023, lookup=False)
+    assert (summary.predicted, summary.skipped, summary.failed) == (20, 0, 0)
+    assert sorted(saved[:3] for saved in dao.saved) == sorted(grid)
+    assert len(backend.threads) == 3
+
+
+class Transactions:
+    # records which dao calls ran inside db.atomic()
+    def __init__(self) -> None:
+        self.open = False
+        self.calls: List[str] = []
+
+    @contextlib.contextmanager
+    def atomic(self) -> Iterator[None]:
+        self.open = True
+        try:
+            yield
+        finally:
+            self.open = False
+
+
+def test_predictions_are_replaced_in_one_transaction(monkeypatch: pytest.MonkeyPatch) -> None:
+    dao = StubDao()
+    dao.saved = [("QB 0", "X", True, 100.0)]
+    transactions = Transactions()
+    monkeypatch.setattr(predict.db, "atomic", transactions.atomic)
+    predictor = PassingPredictor(dao)  # type: ignore[arg-type]
+
+    def batch_run(persist: bool, year: int, names: List[str], workers: int) -> List[Any]:
+        # scored without writing and before the transaction starts
+        assert not persist and not transactions.open
+        return [(name, "X", True, 250.0) for name in names]
+
+    for method in ("delete_predictions", "save_predictions"):
+        original = getattr(dao, method)
+
+        def in_transaction(*args: Any, original: Any = original, method: str = method) -> Any:
+            assert transactions.open, f"{method} ran outside the transaction"
+            transactions.calls.append(method)
+            return original(*args)
+
+        monkeypatch.setattr(dao, method, in_transaction)
+    monkeypatch.setattr(predictor, "batch_run", batch_run)
+
+    assert predictor.replace_predictions(2023) == 2
+    assert transactions.calls == ["delete_predictions", "save_predictions"]
+    assert dao.saved == [("QB 0", "X", True, 250.0), ("QB 1", "X", True, 250.0)]
+
+
+def test_a_failed_scoring_run_keeps_the_predictions(monkeypatch: pytest.MonkeyPatch) -> None:
+    dao = StubDao()
+    dao.saved = [("QB 0", "X", True, 100.0)]
+    predictor = PassingPredictor(dao)  # type: ignore[arg-type]
+
+    def batch_run(persist: bool, year: int, names: List[str], workers: int) -> List[Any]:
+        raise TimeoutError("canceling statement due to statement timeout")
+
+    monkeypatch.setattr(predictor, "batch_run", batch_run)
+    with pytest.raises(TimeoutError):
+        predictor.replace_predictions(2023)
+    assert dao.saved == [("QB 0", "X", True, 100.0)]
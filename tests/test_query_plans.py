@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import random
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+import pytest
+from daos import Dao
+from db import ActiveStats, DefensePassingStats, EtlState, PassingRun, PassingStats, PlayerInfo, db
+from db.migrations import migrate
+from etl_state import Watermarks
+from peewee import DatabaseError, chunked
+from seasons import last_completed_season
+
+# a scratch database, the synthetic rows are loaded in a transaction that is rolled back
+TEST_DATABASE_URL_ENV: str = "FANTASY_TEST_DATABASE_URL"
+DSN = os.environ.get(TEST_DATABASE_URL_ENV)
+
+pytestmark = pytest.mark.skipif(DSN is None, reason=f"${TEST_DATABASE_URL_ENV} is not set")
+
+SCALE: int = 4
+
+TEAMS: List[str] = [f"Team {i}" for i in range(32)]
+
+# queries that aggregate a whole table or season partition, where a seq scan is the right plan
+FULL_SCANS: Dict[str, Set[str]] = {
+    "load_player_active_stats": {"active_stats"},
+    # every prediction of a season, a fifth of the synthetic passing_run
+    "get_prediction_keys": {"passing_run"},
+    "delete_predictions": {"passing_run"},
+}
+
+# reading a handful of pages sequentially beats any index, only flag tables larger than this
+MIN_PAGES: int = 16
+
+
+class QueryLog(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.label = ""
+        self.queries: List[Tuple[str, str, Any]] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if isinstance(record.msg, tuple) and len(record.msg) == 2:
+            sql, params = record.msg
+            if sql.lstrip().upper().startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")):
+                self.queries.append((self.label, sql, params))
+
+
+def insert(model: Any, rows: Iterable[Dict[str, Any]]) -> None:
+    for chunk in chunked(rows, 1000):
+        model.insert_many(chunk).execute()
+
+
+def load_synthetic(scale: int, season: int) -> None:
+    rng = random.Random(scale)
+    years = range(season - 25 * scale + 1, season + 1)
+    players = 20000 * scale
+    qbs = [f"Player {i}" for i in range(0, players, 20)]
+
+    insert(
+        PlayerInfo,
+        (
+            {
+                "name": f"Player {i}",
+                "position": "QB" if i % 20 == 0 else "WR",
+                "active": i % 40 == 0,
+                "experience": rng.randint(0, 20),
+                "age": rng.randint(21, 42),
+            }
+            for i in range(players)
+        ),
+    )
+    for year in years[-3:]:
+        ActiveStats.ensure_partition(year)
+    insert(
+        ActiveStats,
+        (
+            {
+                "name": name,
+                "season": year,
+                "week": week,
+                "opponent": rng.choice(TEAMS),
+                "home": week % 2 == 0,
+                "game_result": "W",
+                "pass_completions": rng.randint(10, 35),
+                "pass_attempts": rng.randint(15, 50),
+                "pass_yards": rng.randint(100, 450),
+                "pass_avg": rng.uniform(4, 10),
+                "rating": rng.uniform(50, 130),
+            }
+            for name in qbs
+            for year in years[-3:]
+            for week in range(1, 18)
+        ),
+    )
+    insert(
+        DefensePassingStats,
+        (
+            {
+                "team": team,
+                "year": year,
+                "attempts": rng.randint(450, 650),
+                "completions": rng.randint(280, 420),
+                "yds_att": rng.uniform(5, 8),
+                "sacks": rng.randint(20, 60),
+            }
+            for team in TEAMS
+            for year in years
+        ),
+    )
+    insert(
+        PassingStats,
+        ({"player": name, "year": year, "rate": rng.uniform(50, 120)} for name in qbs for year in years),
+    )
+    insert(
+        PassingRun,
+        (
+            {
+                "name": name,
+                "opponent": team,
+                "is_home_game": home,
+                "year": year,
+                "passing_yards": rng.uniform(100, 400),
+            }
+            for name in qbs[:200]
+            for team in TEAMS
+            for home in (True, False)
+            for year in years[-5:]
+        ),
+    )
+    insert(
+        EtlState,
+        (
+            {"category": "passing", "key": str(page), "year": year, "completed_at": datetime.now()}
+            for year in years
+            for page in range(40)
+        ),
+    )
+    for model in (PlayerInfo, ActiveStats, DefensePassingStats, PassingStats, PassingRun, EtlState):
+        db.execute_sql(f"ANALYZE public.{model._meta.table_name}")
+
+
+def table_pages() -> Dict[str, int]:
+    with db.execute_sql(
+        "SELECT relname, relpages FROM pg_class WHERE relnamespace = 'public'::regnamespace"
+    ) as cursor:
+        return dict(cursor.fetchall())
+
+
+def parent_table(relation: str) -> str:
+    # season partitions are scanned under their own name, e.g. active_stats_2024
+    return re.sub(r"_\d{4}$", "", relation)
+
+
+def seq_scans(plan: Dict[str, Any]) -> List[str]:
+    found = [plan["Relation Name"]] if plan.get("Node Type") == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+def has_pgml() -> bool:
+    with db.execute_sql("SELECT to_regnamespace('pgml') IS NOT NULL") as cursor:
+        return bool(cursor.fetchone()[0])
+
+
+def checks(season: int) -> List[Tuple[str, Callable[[], Any]]]:
+    dao = Dao()
+    watermarks = Watermarks(season)
+    prediction = ("Player 0", TEAMS[0], True, 250.0)
+    return [
+        ("get_prediction", lambda: dao.get_prediction("Player 0", TEAMS[0], True, season)),
+        ("get_prediction_keys", lambda: dao.get_prediction_keys(season)),
+        ("get_player_info", lambda: dao.get_player_info("Player 0", season)),
+        ("load_player_active_stats", lambda: dao.load_player_active_stats(season)),
+        ("load_defense_stats", lambda: dao.load_defense_stats(season)),
+        ("get_player_names", dao.get_player_names),
+        ("get_team_names", dao.get_team_names),
+        ("etl_is_done", lambda: watermarks.is_done("passing", "0", season)),
+        ("etl_resume_point", lambda: watermarks.resume_point("passing", season)),
+        # the hot write paths of a prediction run
+        ("predict_passing_yds_batch", lambda: dao.predict_passing_yds_batch(season, persist=True)),
+        ("save_predictions", lambda: dao.save_predictions(season + 1, [prediction])),
+        ("delete_predictions", lambda: dao.delete_predictions(season)),
+    ]
+
+
+LABELS: List[str] = [label for label, _ in checks(0)]
+NEEDS_PGML: Set[str] = {"predict_passing_yds_batch"}
+
+
+def run_checks(log: QueryLog, season: int, pgml: bool) -> None:
+    for label, check in checks(season):
+        if label in NEEDS_PGML and not pgml:
+            continue
+        log.label = label
+        try:
+            with db.atomic():
+                check()
+        except DatabaseError:
+            # only the plan matters, e.g. pgml.predict fails to run before a model is deployed; the
+            # statement was logged before it ran
+            logging.exception(f"{label} failed, explaining its statement anyway")
+
+
+@pytest.fixture(scope="module")
+def plans() -> Iterator[Tuple[Dict[str, List[Tuple[str, List[str]]]], bool]]:
+    # label -> (statement, seq scanned tables) of every statement the check ran, and whether pgml exists
+    db.configure(DSN)
+    migrate()
+    season = last_completed_season()
+    log = QueryLog()
+    peewee_logger = logging.getLogger("peewee")
+    level = peewee_logger.level
+
+    found: Dict[str, List[Tuple[str, List[str]]]] = {label: [] for label in LABELS}
+    with db.atomic() as txn:
+        pgml = has_pgml()
+        load_synthetic(SCALE, season)
+        peewee_logger.addHandler(log)
+        peewee_logger.setLevel(logging.DEBUG)
+        try:
+            run_checks(log, season, pgml)
+        finally:
+            peewee_logger.removeHandler(log)
+            peewee_logger.setLevel(level)
+        pages = table_pages()
+
+        for label, sql, params in log.queries:
+            with db.execute_sql("EXPLAIN (FORMAT JSON) " + sql, params) as cursor:
+                plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            scans = [
+                table
+                for table in seq_scans(plan[0]["Plan"])
+                if parent_table(table) not in FULL_SCANS.get(label, set())
+                and pages.get(table, 0) >= MIN_PAGES
+            ]
+            found[label].append((sql, scans))
+        txn.rollback()
+    yield found, pgml
+    db.close()
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_no_seq_scans(plans: Tuple[Dict[str, List[Tuple[str, List[str]]]], bool], label: str) -> None:
+    found, pgml = plans
+    if label in NEEDS_PGML and not pgml:
+        pytest.skip("the pgml extension is not installed")
+    assert found[label], f"{label} ran no statement"
+    for sql, scans in found[label]:
+        assert not scans, f"{label} seq scans {', '.join(scans)}:\n{sql}"
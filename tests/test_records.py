@@ -0,0 +1,52 @@
+from array import array
+
+import pytest
+from db import ActiveStats, PlayerInfo
+from records import Records
+
+
+def game_logs() -> Records:
+    return Records(
+        ActiveStats,
+        {
+            "week": array("q", [1, 2, 3]),
+            "opponent": ["KC", "@BUF", "DEN"],
+            "pass_yards": array("q", [250, 310, 0]),
+        },
+        {"name": "Patrick Mahomes", "season": 2023},
+    )
+
+
+def test_rows_follow_the_model_field_order() -> None:
+    records = game_logs()
+    assert len(records) == 3
+    fields = [field.name for field in ActiveStats._meta.sorted_fields]
+    rows = [dict(zip(fields, row)) for row in records]
+    assert [len(row) for row in records] == [len(fields)] * 3
+    assert rows[1]["name"] == "Patrick Mahomes" and rows[1]["season"] == 2023
+    assert (rows[1]["week"], rows[1]["opponent"], rows[1]["pass_yards"]) == (2, "@BUF", 310)
+    # fields that are neither a column nor a constant are null
+    assert rows[1]["rating"] is None
+
+
+def test_take_and_column() -> None:
+    records = game_logs().take([0, 2])
+    assert list(records.column("week")) == [1, 3]
+    assert records.column("season") == [2023, 2023]
+    assert records.column("rating") == [None, None]
+    assert records.constants == {"name": "Patrick Mahomes", "season": 2023}
+
+
+def test_from_dicts() -> None:
+    records = Records.from_dicts(
+        PlayerInfo, [{"name": "A", "position": "QB", "age": 27}, {"name": "B", "position": "WR"}]
+    )
+    assert records.column("name") == ["A", "B"]
+    assert records.column("age") == [27, None]
+
+
+def test_unknown_fields_are_rejected() -> None:
+    with pytest.raises(AssertionError):
+        Records(ActiveStats, {"week": [1]}, {"year": 2023})
+    with pytest.raises(AssertionError):
+        Records(ActiveStats, {})
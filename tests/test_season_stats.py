@@ -0,0 +1,96 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pytest
+from categories import CATEGORIES, PLAYER
+from parsing import PageParser
+from player_index import player_slug
+from season_stats import SeasonStatsService
+
+PASSING = CATEGORIES[(PLAYER, "passing")]
+
+
+def listing(page_no: int, slug: str, last: bool) -> str:
+    cells = "".join("<td>1</td>" for _ in PASSING.schema.columns[1:])
+    link = "" if last else f'<a class="nfl-o-table-pagination__next" href="/page/{page_no + 1}">Next</a>'
+    return (
+        f'<table><tr><td><a class="d3-o-player-fullname" href="/players/{slug}/">{slug}</a></td>'
+        f"{cells}</tr></table>{link}"
+    )
+
+
+class StubFetcher:
+    # one listing page per slug, remembers which pages were watermarked before each fetch
+    def __init__(self, slugs: List[str], watermarks: "StubWatermarks") -> None:
+        self.pages = {
+            f"/page/{i}": listing(i, slug, i == len(slugs) - 1) for i, slug in enumerate(slugs)
+        }
+        self.watermarks = watermarks
+        self.done_before: List[List[str]] = []
+
+    def get(self, url: str) -> str:
+        self.done_before.append(sorted(self.watermarks.completed))
+        return self.pages["/page/0" if "/stats/" in url else url]
+
+
+class StubPlayers:
+    # players in slow are still loading until the crawl ends, players in broken fail
+    def __init__(self, slow: Set[str] = set(), broken: Set[str] = set()) -> None:
+        self.slow = slow
+        self.broken = broken
+
+    def put(self, player_urls: List[str]) -> None:
+        pass
+
+    def loaded(self, player_urls: List[str]) -> bool:
+        return not any(player_slug(url) in self.slow for url in player_urls)
+
+    def drain(self, player_urls: List[str]) -> None:
+        for url in player_urls:
+            if player_slug(url) in self.broken:
+                raise ValueError(url)
+
+
+class StubLoader:
+    def __init__(self) -> None:
+        self.rows: List[Tuple[Any, ...]] = []
+
+    def load(self, model: Any, rows: Any) -> int:
+        self.rows.extend(rows)
+        return len(self.rows)
+
+
+class StubWatermarks:
+    def __init__(self) -> None:
+        self.completed: Dict[str, Optional[str]] = {}
+
+    def resume_point(self, category: str, year: int) -> Tuple[int, Optional[str], bool]:
+        return 0, None, False
+
+    def complete(self, category: str, key: str, year: int, next_url: Optional[str] = None) -> None:
+        self.completed[key] = next_url
+
+
+def run(
+    slugs: List[str], players: StubPlayers, watermarks: StubWatermarks
+) -> Tuple[StubFetcher, StubLoader]:
+    loader = StubLoader()
+    fetcher = StubFetcher(slugs, watermarks)
+    service = SeasonStatsService("", fetcher, players, loader, watermarks, PageParser(0))  # type: ignore
+    service.run_category(PASSING, 2022)
+    return fetcher, loader
+
+
+def test_pages_are_watermarked_once_their_players_are_loaded() -> None:
+    watermarks = StubWatermarks()
+    fetcher, loader = run(["a", "slow", "b"], StubPlayers(slow={"slow"}), watermarks)
+    # page 0 is done before page 1 is fetched, page 1 waits for its player and page 2 for page 1
+    assert fetcher.done_before == [[], ["0"], ["0"]]
+    assert watermarks.completed == {"0": "/page/1", "1": "/page/2", "2": None}
+    assert len(loader.rows) == 3
+
+
+def test_pages_after_a_failed_player_are_not_watermarked() -> None:
+    watermarks = StubWatermarks()
+    with pytest.raises(ValueError):
+        run(["a", "broken", "b"], StubPlayers(broken={"broken"}), watermarks)
+    assert watermarks.completed == {"0": "/page/1"}
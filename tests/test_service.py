@@ -0,0 +1,83 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import numpy as np
+import pytest
+import service
+from metrics import Metrics
+from service import MicroBatcher
+
+
+class StubBackend:
+    # scores a matchup as the sum of its features, remembers the size of every batch
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.batches: List[int] = []
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        self.batches.append(len(features))
+        if self.fail:
+            raise RuntimeError("scoring failed")
+        return features.sum(axis=1)
+
+
+class StubPredictor:
+    def __init__(self, backend: StubBackend) -> None:
+        self.backend = backend
+
+    def features(self, name: str, opponent: str, is_home_game: bool, year: int) -> List[float]:
+        assert name != "unknown", f"No features for {name}"
+        return [float(len(name)), 1.0 if is_home_game else 0.0, float(year)]
+
+
+@pytest.fixture
+def connections(monkeypatch: pytest.MonkeyPatch) -> List[int]:
+    opened: List[int] = []
+
+    @contextmanager
+    def connection_context() -> Iterator[None]:
+        opened.append(1)
+        yield
+
+    monkeypatch.setattr(service.db, "connection_context", connection_context)
+    return opened
+
+
+def run(batcher: MicroBatcher, names: List[str]) -> List["Future[float]"]:
+    # everything is queued before the worker starts, so batching doesn't depend on timing
+    futures = [batcher.submit((name, "KC", True, 2023)) for name in names]
+    batcher.start()
+    for future in futures:
+        future.exception(timeout=5)
+    batcher.close()
+    return futures
+
+
+def test_matchups_are_scored_in_batches(connections: List[int]) -> None:
+    backend, metrics = StubBackend(), Metrics()
+    batcher = MicroBatcher(StubPredictor(backend), metrics, max_batch=2, max_wait=0.05)  # type: ignore
+    futures = run(batcher, ["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert [future.result() for future in futures] == [2025.0, 2026.0, 2027.0, 2028.0, 2029.0]
+    assert backend.batches == [2, 2, 1]
+    # one pooled connection per batch, none held while idle
+    assert len(connections) == 3
+    assert metrics.counters["predict_batches_total"][()] == 3
+    assert metrics.counters["predict_batch_rows_total"][()] == 5
+
+
+def test_feature_errors_fail_only_their_matchup(connections: List[int]) -> None:
+    backend = StubBackend()
+    batcher = MicroBatcher(StubPredictor(backend), Metrics(), max_wait=0.05)  # type: ignore
+    known, unknown = run(batcher, ["a", "unknown"])
+    assert known.result() == 2025.0
+    assert isinstance(unknown.exception(), AssertionError)
+    assert backend.batches == [1]
+
+
+def test_scoring_errors_fail_the_whole_batch(connections: List[int]) -> None:
+    backend = StubBackend(fail=True)
+    batcher = MicroBatcher(StubPredictor(backend), Metrics(), max_wait=0.05)  # type: ignore
+    futures = run(batcher, ["a", "bb"])
+    assert all(isinstance(future.exception(), RuntimeError) for future in futures)
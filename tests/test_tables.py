@@ -0,0 +1,77 @@
+import os
+from typing import Any, List
+
+import lxml.html
+import pytest
+from bench_tables import FIXTURES, SCHEMAS, legacy
+from bs4 import BeautifulSoup
+from categories import CATEGORIES, DEFENSE
+from etl_state import Watermarks
+from fetcher import Fetcher
+from loader import UpsertLoader
+from parsing import PageParser
+from tables import DEFENSE_PASSING, PASSING, Schema, Table, cell_text, extract_table
+from team_stats import TeamService
+
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name + ".html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def legacy_rows(html: str, schema: Schema) -> List[List[Any]]:
+    # what pd.read_html gave the services, with their fillna(0) and each column's conversion applied
+    return [
+        [
+            convert("0" if value != value else str(value))
+            for (_, convert), value in zip(schema.columns, row)
+        ]
+        for row in legacy(html)
+    ]
+
+
+@pytest.mark.parametrize("name", sorted(SCHEMAS))
+def test_extract_table_matches_legacy(name: str) -> None:
+    html, schema = fixture(name), SCHEMAS[name]
+    table = extract_table(html, schema)
+    assert [list(row.values()) for row in table.rows()] == legacy_rows(html, schema)
+
+    soup = BeautifulSoup(html, features="html.parser")
+    links = soup.find("table").find_all("a", href=True, class_="d3-o-player-fullname")
+    assert table.player_urls == [link["href"] for link in links]
+    next_link = soup.find("a", href=True, class_="nfl-o-table-pagination__next")
+    assert table.next_url == (next_link["href"] if next_link else None)
+
+
+def test_team_cell_collapses_whitespace() -> None:
+    cell = lxml.html.fromstring(
+        "<table><tr><td>\n  <div>Cardinals</div>\n  <div>Cardinals</div>\n</td></tr></table>"
+    ).xpath("//td")[0]
+    assert cell_text(cell) == "Cardinals Cardinals"
+
+    # the team cell repeats the name, TeamService keeps the first half
+    category = CATEGORIES[(DEFENSE, "passing")]
+    table = extract_table(fixture(DEFENSE_PASSING.name), DEFENSE_PASSING)
+    service = TeamService("", Fetcher(), UpsertLoader(), Watermarks(), PageParser(0))
+    teams = service.team_stats(category, table, 2022).column("team")
+    assert teams[:3] == ["Cardinals", "Falcons", "Ravens"]
+
+
+def test_concat_keeps_columns_urls_and_last_page() -> None:
+    first = extract_table(fixture(PASSING.name), PASSING)
+    second = Table(PASSING, PASSING.empty(), ["/players/a/"], None)
+    for name, values in first.columns.items():
+        second.columns[name].extend(values[:2])  # type: ignore
+
+    table = Table.concat(PASSING, [first, second])
+    assert len(table) == len(first) + 2
+    assert list(table.rows())[-2:] == list(first.rows())[:2]
+    assert table.player_urls == first.player_urls + ["/players/a/"]
+    assert table.next_url is None
+    assert type(table.columns["pass_yds"]) is type(first.columns["pass_yds"])
+
+
+def test_extract_table_without_table() -> None:
+    table = extract_table("<html><body><p>No stats</p></body></html>", PASSING)
+    assert len(table) == 0
+    assert table.player_urls == [] and table.next_url is None
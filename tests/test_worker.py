@@ -0,0 +1,152 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+from typing import Any, Callable, List, Sequence, Tuple
+
+import db.migrations
+import pipeline
+import pytest
+import service
+import worker
+
+Call = Tuple[Any, ...]
+
+
+class StubEtl:
+    def __init__(self, calls: List[Call]) -> None:
+        self.calls = calls
+
+    def run(self, *args: Any) -> None:
+        self.calls.append(("run", *args))
+
+    def refresh(self) -> None:
+        self.calls.append(("refresh",))
+
+
+class StubPredictor:
+    def __init__(self, calls: List[Call]) -> None:
+        self.calls = calls
+        self.backend = self
+
+    def run(self, **options: Any) -> None:
+        self.calls.append(("predict", options))
+
+    def train(self) -> None:
+        self.calls.append(("train",))
+
+
+class StubFactory:
+    # records what each command builds and runs, nothing is scraped, trained or served
+    def __init__(self) -> None:
+        self.calls: List[Call] = []
+
+    def nfl_etl(self, **options: Any) -> StubEtl:
+        self.calls.append(("nfl_etl", options))
+        return StubEtl(self.calls)
+
+    def predictor(self, backend: str = "pgml") -> StubPredictor:
+        self.calls.append(("predictor", backend))
+        return StubPredictor(self.calls)
+
+
+@pytest.fixture
+def run(monkeypatch: pytest.MonkeyPatch) -> Callable[[str], List[Call]]:
+    factory = StubFactory()
+    monkeypatch.setattr(worker, "main_factory", lambda: factory)
+
+    class StubServer:
+        def __init__(self, predictor: StubPredictor, **options: Any) -> None:
+            factory.calls.append(("server", options))
+
+        def serve(self) -> None:
+            factory.calls.append(("serve",))
+
+    class StubPipeline:
+        def run(self, force: Sequence[str]) -> None:
+            factory.calls.append(("pipeline", force))
+
+    def nightly(fac: StubFactory, backend: str, scrape: bool) -> StubPipeline:
+        factory.calls.append(("nightly", backend, scrape))
+        return StubPipeline()
+
+    monkeypatch.setattr(service, "PredictionServer", StubServer)
+    monkeypatch.setattr(pipeline, "nightly", nightly)
+    monkeypatch.setattr(db.migrations, "migrate", lambda: factory.calls.append(("migrate",)))
+    monkeypatch.setattr(worker.db, "configure", lambda url: factory.calls.append(("configure", url)))
+
+    def main(command: str) -> List[Call]:
+        worker.main(command.split())
+        return factory.calls
+
+    return main
+
+
+@pytest.mark.parametrize(
+    "command, calls",
+    [
+        ("scrape", [("nfl_etl", {}), ("run", 2024, 2025, None, False)]),
+        (
+            "scrape --start 2020 --end 2021 --categories passing rushing --gamelogs --max-jobs 2",
+            [("nfl_etl", {"max_jobs": 2}), ("run", 2020, 2022, ["passing", "rushing"], True)],
+        ),
+        (
+            "scrape --refresh --cache-only --requests-per-second 0.5 --parse-workers 0",
+            [
+                ("nfl_etl", {"cache_only": True, "requests_per_second": 0.5, "parse_workers": 0}),
+                ("refresh",),
+            ],
+        ),
+        ("train", [("predictor", "pgml"), ("train",)]),
+        ("train --backend local", [("predictor", "local"), ("train",)]),
+        ("predict", [("predictor", "pgml"), ("predict", {"batch": True})]),
+        ("predict --workers 8", [("predictor", "pgml"), ("predict", {"batch": True, "workers": 8})]),
+        ("serve", [("predictor", "pgml"), ("server", {}), ("serve",)]),
+        (
+            "serve --backend local --port 8080",
+            [("predictor", "local"), ("server", {"port": 8080}), ("serve",)],
+        ),
+        ("nightly", [("nightly", "pgml", True), ("pipeline", [])]),
+        (
+            "nightly --no-scrape --force train predict",
+            [("nightly", "pgml", False), ("pipeline", ["train", "predict"])],
+        ),
+        ("migrate", [("migrate",)]),
+        (
+            "--database-url postgres://localhost/nfl migrate",
+            [("configure", "postgres://localhost/nfl"), ("migrate",)],
+        ),
+    ],
+)
+def test_commands(
+    run: Callable[[str], List[Call]],
+    pin_today: Callable[[date], None],
+    command: str,
+    calls: List[Call],
+) -> None:
+    # the scrape defaults are the season in progress
+    pin_today(date(2024, 10, 1))
+    assert run(command) == calls
+
+
+def test_a_command_is_required(run: Callable[[str], List[Call]]) -> None:
+    with pytest.raises(SystemExit):
+        run("")
+
+
+def test_importing_the_worker_loads_no_heavy_modules() -> None:
+    # a fresh interpreter, this one already imported everything the other tests use
+    code = "import json, sys, worker; print(json.dumps([sorted(sys.modules), worker.db.is_closed()]))"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.join(os.path.dirname(__file__), "..", "fantasy"),
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    modules, closed = json.loads(output)
+    heavy = {"numpy", "pandas", "requests", "lxml", "daos", "predict", "nfl", "service", "backends"}
+    assert heavy.isdisjoint(modules)
+    # the database is configured lazily and not connected until a command runs
+    assert "db.migrations" not in modules and closed